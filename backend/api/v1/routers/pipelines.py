@@ -1,29 +1,69 @@
 # api/v1/routers/pipelines.py — All pipeline endpoints
+import hashlib
+import json
 import uuid
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import StreamingResponse
+from contextlib import aclosing
+from datetime import timezone
+from typing import Optional
+from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from domain import pipeline_ir
 from domain.schemas import (
     PipelineData, ParseResponse, ValidateResponse, NodeTypesResponse,
-    AutoLayoutResponse, ExecuteRequest,
-    SavePipelineRequest, SavedPipelineInfo, SavedPipelineDetail,
+    AutoLayoutResponse, AnalyzeResponse, ExecuteRequest, SavedExecuteRequest, ResumeRunRequest,
+    IncrementalLayoutRequest, IncrementalLayoutResponse,
+    GraphDelta, GraphDeltaResponse, GraphSessionSnapshot,
+    SavePipelineRequest, SavedPipelineInfo, SavedPipelineDetail, SavedPipelinePage,
+    PipelineSearchResponse, PipelineRevisionPage, PipelineRevisionDetail,
+    PipelineExportRecord, PipelineImportResult, RunTimeline, RunList, PipelineRunStats,
 )
-from services.graph_service import (
-    calculate_pipeline_metrics,
-    validate_pipeline,
-    get_node_types,
-    compute_auto_layout,
+from services.graph_service import get_node_types
+from services.layout import DEFAULT_TIME_BUDGET_MS, HEURISTICS as LAYOUT_HEURISTICS
+from services.graph_session import (
+    SessionError, VersionConflict, open_session, get_session, apply_delta, close_session,
 )
-from services.execution_service import execute_dag_stream
+from services.execution_service import PlanError, execute_dag_stream, get_paused
+from services import analysis_cache, compute_pool, plan_cache, run_history, semantic_cache
+from services.model_catalog import fetch_models
 from services.pipeline_store import (
-    save_pipeline, list_pipelines, get_pipeline, delete_pipeline,
+    save_pipeline, iter_pipelines, delete_pipeline, encode_cursor, decode_cursor,
+    search_pipelines, load_pipeline, list_revisions, get_revision,
+    export_pipelines, import_pipelines, CONFLICT_POLICIES, IMPORT_BATCH,
 )
-import httpx
+
+
+
+class _FastJSONRequest(Request):
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = pipeline_ir.loads(await self.body())
+        return self._json
+
+
+class _FastJSONRoute(APIRoute):
+    """Decodes request bodies with orjson (when installed) instead of the stdlib parser."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            return await handler(_FastJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
 
 limiter = Limiter(key_func=get_remote_address)
-router = APIRouter()
+router = APIRouter(route_class=_FastJSONRoute)
+
+ANALYZE_SECTIONS = ("metrics", "validation", "layout")
+IMPORT_MAX_LINE_BYTES = 16 * 1024 * 1024
+IMPORT_MAX_ERRORS = 50          # failed lines listed in the import report
 
 
 # ─── GET /models ──────────────────────────────────────────────────────────────
@@ -36,15 +76,8 @@ router = APIRouter()
 @limiter.limit("30/minute")
 async def get_free_models(request: Request, api_key: str = ""):
     """Returns the list of free OpenRouter models, sorted by name."""
-    headers = {"Content-Type": "application/json"}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            r = await client.get("https://openrouter.ai/api/v1/models", headers=headers)
-            r.raise_for_status()
-            all_models = r.json().get("data", [])
+        all_models = await fetch_models(api_key)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"OpenRouter API error: {exc}")
 
@@ -70,19 +103,53 @@ async def get_free_models(request: Request, api_key: str = ""):
 
 
 
+# ─── Cached JSON responses with ETags ─────────────────────────────────────────
+
+async def _etag_response(request: Request, kind: str, digest: str, compute) -> Response:
+    """
+    Serve a memoised result as JSON, or 304 when the client already holds this
+    ETag. `compute` is an async callable, awaited only on a cache miss.
+    """
+    tag = analysis_cache.etag(kind, digest)
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if analysis_cache.etag_matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+    body = analysis_cache.lookup_json(kind, digest)
+    if body is None:
+        body = analysis_cache.store(kind, digest, await compute())
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _offload(kind: str, nodes, edges, *args, **kwargs):
+    """compute_pool.run, with a full pool surfaced as 503 + Retry-After."""
+    try:
+        return await compute_pool.run(kind, nodes, edges, *args, **kwargs)
+    except compute_pool.PoolBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+
+
+async def _pipeline_hash(nodes, edges) -> str:
+    # ~5 ms at the 5k-edge limit; keep it off the event loop
+    return await run_in_threadpool(analysis_cache.pipeline_hash, nodes, edges)
+
+
 # ─── POST /parse ──────────────────────────────────────────────────────────────
 
 @router.post(
     "/parse",
     response_model=ParseResponse,
     summary="Analyse a pipeline graph",
+    description="Results are memoised by a hash of the semantic graph (UI-only fields ignored) and carry an ETag; send `If-None-Match` to get 304.",
 )
 @limiter.limit("30/minute")
-def parse_pipeline(request: Request, pipeline: PipelineData):
+async def parse_pipeline(request: Request, pipeline: PipelineData):
     if not pipeline.nodes:
         raise HTTPException(status_code=422, detail="Pipeline must contain at least one node.")
-    result = calculate_pipeline_metrics(pipeline.nodes, pipeline.edges)
-    return result
+    digest = await _pipeline_hash(pipeline.nodes, pipeline.edges)
+    return await _etag_response(
+        request, "parse", digest,
+        lambda: _offload("parse", pipeline.nodes, pipeline.edges),
+    )
 
 
 # ─── POST /validate ───────────────────────────────────────────────────────────
@@ -91,24 +158,40 @@ def parse_pipeline(request: Request, pipeline: PipelineData):
     "/validate",
     response_model=ValidateResponse,
     summary="Deep-validate a pipeline",
+    description="Memoised and ETag-tagged like /parse.",
 )
 @limiter.limit("30/minute")
-def validate_pipeline_endpoint(request: Request, pipeline: PipelineData):
-    result = validate_pipeline(pipeline.nodes, pipeline.edges)
-    return result
+async def validate_pipeline_endpoint(request: Request, pipeline: PipelineData):
+    digest = await _pipeline_hash(pipeline.nodes, pipeline.edges)
+    return await _etag_response(
+        request, "validate", digest,
+        lambda: _offload("validate", pipeline.nodes, pipeline.edges),
+    )
 
 
 # ─── GET /node-types ─────────────────────────────────────────────────────────
 
+_NODE_TYPES_DIGEST = None
+
+
 @router.get(
     "/node-types",
     response_model=NodeTypesResponse,
     summary="Get all supported node types",
 )
 @limiter.limit("60/minute")
-def node_types_endpoint(request: Request):
-    types = get_node_types()
-    return {"node_types": types}
+async def node_types_endpoint(request: Request):
+    global _NODE_TYPES_DIGEST
+    if _NODE_TYPES_DIGEST is None:
+        # The registry is static for the life of the process
+        _NODE_TYPES_DIGEST = hashlib.blake2b(
+            json.dumps(get_node_types(), sort_keys=True).encode("utf-8"), digest_size=16,
+        ).hexdigest()
+
+    async def compute():
+        return {"node_types": get_node_types()}
+
+    return await _etag_response(request, "node-types", _NODE_TYPES_DIGEST, compute)
 
 
 # ─── POST /auto-layout ────────────────────────────────────────────────────────
@@ -117,15 +200,171 @@ def node_types_endpoint(request: Request):
     "/auto-layout",
     response_model=AutoLayoutResponse,
     summary="Compute an automatic graph layout",
+    description=(
+        "Layered layout: cycle breaking, longest-path layers, barycenter or median crossing "
+        "reduction within `budget_ms`, and compaction using each node's width/height."
+    ),
 )
 @limiter.limit("20/minute")
-def auto_layout_endpoint(request: Request, pipeline: PipelineData, direction: str = "LR"):
+async def auto_layout_endpoint(
+    request: Request,
+    pipeline: PipelineData,
+    direction: str = "LR",
+    heuristic: str = "barycenter",
+    budget_ms: int = Query(DEFAULT_TIME_BUDGET_MS, ge=10, le=2000, description="Crossing-reduction time budget"),
+):
     if direction not in ("LR", "TB"):
         raise HTTPException(status_code=422, detail="direction must be 'LR' or 'TB'.")
-    positioned = compute_auto_layout(pipeline.nodes, pipeline.edges, direction)
+    if heuristic not in LAYOUT_HEURISTICS:
+        raise HTTPException(status_code=422, detail=f"heuristic must be one of {', '.join(LAYOUT_HEURISTICS)}.")
+    positioned = await _offload("layout", pipeline.nodes, pipeline.edges, direction,
+                                heuristic=heuristic, time_budget_ms=budget_ms)
     return {"nodes": positioned}
 
 
+# ─── POST /auto-layout/incremental ────────────────────────────────────────────
+
+@router.post(
+    "/auto-layout/incremental",
+    response_model=IncrementalLayoutResponse,
+    summary="Place new or edited nodes without moving the rest",
+    description=(
+        "Send current positions plus the `changed` node IDs. Unchanged nodes stay pinned; "
+        "only nodes that moved are returned."
+    ),
+)
+@limiter.limit("60/minute")
+async def incremental_layout_endpoint(request: Request, payload: IncrementalLayoutRequest, direction: str = "LR"):
+    if direction not in ("LR", "TB"):
+        raise HTTPException(status_code=422, detail="direction must be 'LR' or 'TB'.")
+    mode, moved = await _offload("incremental_layout", payload.nodes, payload.edges, payload.changed, direction)
+    return {"mode": mode, "nodes": moved}
+
+
+# ─── POST /analyze ────────────────────────────────────────────────────────────
+
+@router.post(
+    "/analyze",
+    response_model=AnalyzeResponse,
+    response_model_exclude_none=True,
+    summary="Parse, validate and lay out a pipeline in one round-trip",
+    description=(
+        "Runs the graph analysis once and returns the requested sections. "
+        "`include` is a comma-separated subset of metrics, validation, layout "
+        "(default: metrics,validation)."
+    ),
+)
+@limiter.limit("30/minute")
+async def analyze_endpoint(
+    request: Request,
+    pipeline: PipelineData,
+    include: str = "metrics,validation",
+    direction: str = "LR",
+):
+    sections = {s.strip() for s in include.split(",") if s.strip()}
+    unknown = sections.difference(ANALYZE_SECTIONS)
+    if unknown or not sections:
+        raise HTTPException(
+            status_code=422,
+            detail=f"include must be a comma-separated subset of {', '.join(ANALYZE_SECTIONS)}.",
+        )
+    if "metrics" in sections and not pipeline.nodes:
+        raise HTTPException(status_code=422, detail="Pipeline must contain at least one node.")
+    if "layout" in sections and direction not in ("LR", "TB"):
+        raise HTTPException(status_code=422, detail="direction must be 'LR' or 'TB'.")
+
+    # Metrics and validation share the /parse and /validate memo; whatever
+    # misses is computed in one job over a single graph analysis.
+    digest = await _pipeline_hash(pipeline.nodes, pipeline.edges)
+    result = {}
+    missing = set()
+    for section, kind in (("metrics", "parse"), ("validation", "validate")):
+        if section in sections:
+            cached = analysis_cache.lookup(kind, digest)
+            if cached is None:
+                missing.add(section)
+            else:
+                result[section] = cached
+    if "layout" in sections:
+        missing.add("layout")
+
+    if missing:
+        computed = await _offload("analyze", pipeline.nodes, pipeline.edges, missing, direction)
+        for section, kind in (("metrics", "parse"), ("validation", "validate")):
+            if section in computed:
+                analysis_cache.store(kind, digest, computed[section])
+        result.update(computed)
+    return result
+
+
+# ─── Graph sessions (incremental analysis) ────────────────────────────────────
+
+def _require_session(session_id: str):
+    session = get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Graph session not found or expired.")
+    return session
+
+
+@router.post(
+    "/sessions",
+    response_model=GraphSessionSnapshot,
+    summary="Open an incremental graph session",
+    description="Uploads the full graph once; follow-up edits are sent as deltas to /sessions/{id}/delta.",
+)
+@limiter.limit("30/minute")
+def open_session_endpoint(request: Request, pipeline: PipelineData):
+    try:
+        session = open_session(pipeline.nodes, pipeline.edges)
+    except SessionError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return session.snapshot()
+
+
+@router.get(
+    "/sessions/{session_id}",
+    response_model=GraphSessionSnapshot,
+    summary="Full analysis of a graph session",
+)
+@limiter.limit("60/minute")
+def get_session_endpoint(request: Request, session_id: str):
+    session = _require_session(session_id)
+    with session.lock:
+        return session.snapshot()
+
+
+@router.post(
+    "/sessions/{session_id}/delta",
+    response_model=GraphDeltaResponse,
+    response_model_by_alias=True,
+    summary="Apply node/edge changes to a graph session",
+    description=(
+        "Applies add/update/remove operations atomically and returns only what changed: "
+        "degrees and issues of affected nodes, moved topological ranks, cycle and component status."
+    ),
+)
+@limiter.limit("600/minute")
+def session_delta_endpoint(request: Request, session_id: str, delta: GraphDelta):
+    session = _require_session(session_id)
+    try:
+        return apply_delta(session, delta)
+    except VersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except SessionError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@router.delete(
+    "/sessions/{session_id}",
+    summary="Close a graph session",
+)
+@limiter.limit("60/minute")
+def close_session_endpoint(request: Request, session_id: str):
+    if not close_session(session_id):
+        raise HTTPException(status_code=404, detail="Graph session not found or expired.")
+    return {"closed": session_id}
+
+
 # ─── POST /execute ────────────────────────────────────────────────────────────
 
 @router.post(
@@ -146,37 +385,203 @@ async def execute_pipeline(request: Request, payload: ExecuteRequest):
             resume_node_id=payload.resume_node_id,
             user_input=payload.user_input,
             env=payload.env,
+            saved_pipeline_id=payload.saved_pipeline_id,
+        ),
+        media_type="text/event-stream",
+    )
+
+
+@router.post(
+    "/saved/{pipeline_id}/execute",
+    summary="Execute a saved pipeline via Server-Sent Events",
+    description=(
+        "Runs the stored graph; send only `inputs` (values for Input nodes, by input name or node ID) "
+        "and `env` secrets. The pipeline is compiled once per saved version and reused across runs. "
+        "The run ID is the `pipeline_id` of the `pipeline_start` event; resume a paused run with "
+        "`POST /runs/{run_id}/resume`."
+    ),
+)
+@limiter.limit("30/minute")
+async def execute_saved_pipeline(request: Request, pipeline_id: str, payload: SavedExecuteRequest):
+    try:
+        plan = await plan_cache.get_plan(pipeline_id)
+    except PlanError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found.")
+    return StreamingResponse(
+        execute_dag_stream(plan=plan, saved_pipeline_id=pipeline_id, inputs=payload.inputs, env=payload.env),
+        media_type="text/event-stream",
+    )
+
+
+@router.post(
+    "/runs/{run_id}/resume",
+    summary="Resume a paused run via Server-Sent Events",
+    description="Continues after the node awaiting approval, with `user_input` as that node's result. No graph is re-sent.",
+)
+@limiter.limit("30/minute")
+async def resume_run(request: Request, run_id: str, payload: ResumeRunRequest):
+    state = get_paused(run_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' is not paused.")
+    return StreamingResponse(
+        execute_dag_stream(
+            pipeline_id=run_id,
+            resume_node_id=state["node_id"],
+            user_input=payload.user_input,
+            env=payload.env,
+            saved_pipeline_id=state["saved_pipeline_id"],
+            plan=state["plan"],
         ),
         media_type="text/event-stream",
     )
 
 
+# ─── Run history ──────────────────────────────────────────────────────────────
+
+@router.get(
+    "/runs/{run_id}",
+    response_model=RunTimeline,
+    summary="A run's status, totals and node event timeline",
+    description="`run_id` is the `pipeline_id` reported by the `pipeline_start` event of `/execute`.",
+)
+@limiter.limit("60/minute")
+async def get_run_timeline(request: Request, run_id: str):
+    run = await run_history.get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found.")
+    return run
+
+
+@router.get(
+    "/saved/{pipeline_id}/runs",
+    response_model=RunList,
+    summary="Recent runs of a saved pipeline, newest first",
+)
+@limiter.limit("60/minute")
+async def list_pipeline_runs(request: Request, pipeline_id: str, limit: int = Query(50, ge=1, le=500)):
+    return {"runs": await run_history.list_runs(pipeline_id, limit)}
+
+
+@router.get(
+    "/saved/{pipeline_id}/runs/stats",
+    response_model=PipelineRunStats,
+    summary="Per-node latency and cost percentiles over recent runs",
+)
+@limiter.limit("30/minute")
+async def pipeline_run_stats(
+    request: Request,
+    pipeline_id: str,
+    last: int = Query(100, ge=1, le=run_history.STATS_MAX_RUNS, description="Number of most recent runs to include"),
+):
+    return {"pipeline_id": pipeline_id, "nodes": await run_history.node_stats(pipeline_id, last)}
+
+
+# ─── GET /cache/stats ─────────────────────────────────────────────────────────
+
+@router.get(
+    "/cache/stats",
+    summary="Semantic response cache metrics",
+    description="Per-node hit/miss counters for LLM, Summarizer and Classifier nodes that enable `semanticCache`.",
+)
+@limiter.limit("60/minute")
+def semantic_cache_stats(request: Request):
+    return semantic_cache.get_stats()
+
+
 # ─── POST /save ───────────────────────────────────────────────────────────────
 
 @router.post(
     "/save",
     summary="Save (upsert) a pipeline to the database",
+    description=(
+        "Saves are written behind: rapid saves of the same pipeline are coalesced into one write. "
+        "The response returns once the save is queued (`queued: true`, `rev: null`, and `created_at: null` "
+        "unless an earlier save is still pending); pass `durable=true` to wait for the commit and get the "
+        "stored `created_at` and revision number `rev`."
+    ),
 )
 @limiter.limit("60/minute")
-async def save_pipeline_endpoint(request: Request, body: SavePipelineRequest):
+async def save_pipeline_endpoint(
+    request: Request,
+    body: SavePipelineRequest,
+    durable: bool = Query(False, description="Acknowledge only after the save is committed"),
+):
     # Assign a new UUID if user passes empty string
     pipeline_id = body.id if body.id else str(uuid.uuid4())
-    nodes_raw = [n.model_dump() for n in body.nodes]
-    edges_raw = [e.model_dump() for e in body.edges]
-    record = await save_pipeline(pipeline_id, body.name, nodes_raw, edges_raw)
+    nodes_raw = [n.to_dict() for n in body.nodes]
+    edges_raw = [e.to_dict() for e in body.edges]
+    record = await save_pipeline(pipeline_id, body.name, nodes_raw, edges_raw, durable=durable)
     return record
 
 
 # ─── GET /saved ───────────────────────────────────────────────────────────────
 
+async def _stream_page(limit: int, after, name_prefix):
+    """Encode a page row by row; one extra row tells whether a next page exists."""
+    yield b'{"pipelines":['
+    last = None
+    count = 0
+    # aclosing: hand the reader connection back as soon as the page is done
+    async with aclosing(iter_pipelines(limit + 1, after, name_prefix)) as rows:
+        async for row in rows:
+            if count == limit:
+                break
+            yield (b"," if count else b"") + json.dumps(row, ensure_ascii=False).encode("utf-8")
+            last = row
+            count += 1
+        else:
+            last = None     # fewer than limit + 1 rows: this is the last page
+    next_cursor = encode_cursor(last) if last is not None else None
+    yield b'],"next_cursor":' + json.dumps(next_cursor).encode("utf-8") + b"}"
+
+
 @router.get(
     "/saved",
-    summary="List all saved pipelines",
+    response_model=SavedPipelinePage,
+    summary="List saved pipelines, newest first",
+    description=(
+        "Keyset-paginated: pass the returned `next_cursor` as `after` to get the next page. "
+        "`prefix` filters by name prefix (case-insensitive)."
+    ),
 )
 @limiter.limit("60/minute")
-async def list_saved_pipelines(request: Request):
-    records = await list_pipelines()
-    return {"pipelines": records}
+async def list_saved_pipelines(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = Query(None, max_length=512, description="Cursor from a previous page"),
+    prefix: Optional[str] = Query(None, max_length=200, description="Name prefix filter"),
+):
+    if after:
+        try:
+            decode_cursor(after)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+    return StreamingResponse(_stream_page(limit, after, prefix), media_type="application/json")
+
+
+# ─── GET /saved/search ────────────────────────────────────────────────────────
+
+@router.get(
+    "/saved/search",
+    response_model=PipelineSearchResponse,
+    summary="Full-text search over saved pipelines",
+    description=(
+        "Matches pipeline names and node content (text templates, prompts, URLs, node types). "
+        "Every word must match; the last one also matches as a prefix. Best matches first."
+    ),
+)
+@limiter.limit("120/minute")
+async def search_saved_pipelines(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+):
+    hits = await search_pipelines(q, limit + 1, offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    return {"results": hits[:limit], "next_offset": next_offset}
 
 
 # ─── GET /saved/{pipeline_id} ─────────────────────────────────────────────────
@@ -184,13 +589,52 @@ async def list_saved_pipelines(request: Request):
 @router.get(
     "/saved/{pipeline_id}",
     summary="Load a saved pipeline by ID",
+    description="Served from memory for recently loaded pipelines; honours If-None-Match with 304.",
 )
 @limiter.limit("60/minute")
 async def get_saved_pipeline(request: Request, pipeline_id: str):
-    record = await get_pipeline(pipeline_id)
-    if not record:
+    cached = await load_pipeline(pipeline_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found.")
-    return record
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if analysis_cache.etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+# ─── GET /saved/{pipeline_id}/revisions ───────────────────────────────────────
+
+@router.get(
+    "/saved/{pipeline_id}/revisions",
+    response_model=PipelineRevisionPage,
+    summary="List a pipeline's revision history, newest first",
+)
+@limiter.limit("60/minute")
+async def list_pipeline_revisions(
+    request: Request,
+    pipeline_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[int] = Query(None, ge=1, description="Only revisions older than this one"),
+):
+    rows = await list_revisions(pipeline_id, limit + 1, before)
+    # Pipelines saved before history existed have none until their next save
+    if not rows and before is None and await load_pipeline(pipeline_id) is None:
+        raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found.")
+    next_before = rows[limit - 1]["rev"] if len(rows) > limit else None
+    return {"revisions": rows[:limit], "next_before": next_before}
+
+
+@router.get(
+    "/saved/{pipeline_id}/revisions/{rev}",
+    response_model=PipelineRevisionDetail,
+    summary="Load a pipeline as it was at a given revision",
+)
+@limiter.limit("60/minute")
+async def get_pipeline_revision(request: Request, pipeline_id: str, rev: int):
+    revision = await get_revision(pipeline_id, rev)
+    if revision is None:
+        raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' has no revision {rev}.")
+    return revision
 
 
 # ─── DELETE /saved/{pipeline_id} ──────────────────────────────────────────────
@@ -205,3 +649,105 @@ async def delete_saved_pipeline(request: Request, pipeline_id: str):
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found.")
     return {"deleted": pipeline_id}
+
+
+# ─── GET /export · POST /import ───────────────────────────────────────────────
+
+@router.get(
+    "/export",
+    summary="Export every saved pipeline as NDJSON",
+    description="One JSON object per line, shaped like the `GET /saved/{id}` body. Streamed; suitable for backups.",
+)
+@limiter.limit("6/minute")
+async def export_saved_pipelines(request: Request):
+    return StreamingResponse(
+        export_pipelines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="pipelines.ndjson"'},
+    )
+
+
+def _line_too_long(line_no: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Line {line_no} exceeds {IMPORT_MAX_LINE_BYTES} bytes.")
+
+
+async def _ndjson_lines(chunks):
+    """(line number, raw line) for each non-blank line of a byte stream; 413 on an oversized line."""
+    partial: list = []          # pieces of a line spanning chunks, joined once it is complete
+    partial_size = 0
+    line_no = 0
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) >= 0:
+            line = b"".join(partial) + chunk[start:end] if partial else chunk[start:end]
+            partial, partial_size = [], 0
+            line_no += 1
+            if len(line) > IMPORT_MAX_LINE_BYTES:
+                raise _line_too_long(line_no)
+            if line.strip():
+                yield line_no, line
+            start = end + 1
+        if start < len(chunk):
+            partial.append(chunk[start:])
+            partial_size += len(chunk) - start
+            if partial_size > IMPORT_MAX_LINE_BYTES:
+                raise _line_too_long(line_no + 1)
+    line = b"".join(partial)
+    if line.strip():
+        yield line_no + 1, line
+
+
+def _validate_import_lines(lines, report: dict) -> list:
+    records = []
+    for line_no, line in lines:
+        try:
+            record = PipelineExportRecord.model_validate_json(line)
+        except ValidationError as exc:
+            report["failed"] += 1
+            if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                error = exc.errors(include_url=False)[0]
+                location = ".".join(str(part) for part in error["loc"])
+                report["errors"].append({"line": line_no, "detail": f"{location}: {error['msg']}" if location else error["msg"]})
+            continue
+        records.append({
+            "id": record.id,
+            "name": record.name,
+            "created_at": record.created_at.astimezone(timezone.utc).isoformat() if record.created_at else None,
+            "updated_at": record.updated_at.astimezone(timezone.utc).isoformat() if record.updated_at else None,
+            "nodes": [n.to_dict() for n in record.data.nodes],
+            "edges": [e.to_dict() for e in record.data.edges],
+        })
+    return records
+
+
+async def _import_batches(request: Request, report: dict):
+    """Validated records in IMPORT_BATCH-sized lists; parsing runs off the event loop."""
+    lines = []
+    async for numbered in _ndjson_lines(request.stream()):
+        lines.append(numbered)
+        if len(lines) == IMPORT_BATCH:
+            yield await run_in_threadpool(_validate_import_lines, lines, report)
+            lines = []
+    if lines:
+        yield await run_in_threadpool(_validate_import_lines, lines, report)
+
+
+@router.post(
+    "/import",
+    response_model=PipelineImportResult,
+    summary="Import pipelines from an NDJSON stream",
+    description=(
+        "Accepts the `GET /export` format. The body is read as a stream and written "
+        f"{IMPORT_BATCH} records per transaction. `on_conflict` decides what happens to an id that "
+        "already exists: `skip` it, `overwrite` it (a new revision), or `rename` (import under a new id). "
+        "Invalid lines are reported and skipped."
+    ),
+)
+@limiter.limit("6/minute")
+async def import_saved_pipelines(request: Request, on_conflict: str = "skip"):
+    if on_conflict not in CONFLICT_POLICIES:
+        raise HTTPException(status_code=422, detail=f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}.")
+    report = {"failed": 0, "errors": []}
+    async with aclosing(_import_batches(request, report)) as batches:
+        counts = await import_pipelines(batches, on_conflict)
+    return {**counts, **report}
@@ -0,0 +1,220 @@
+# domain/pipeline_ir.py — Lean internal pipeline representation and its request decoder
+import json
+import sys
+from typing import Any, Dict, Optional
+
+from pydantic_core import PydanticCustomError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_intern = sys.intern
+
+# Fields the canvas sends that no service reads; carried only so /save round-trips them
+NODE_UI_FIELDS = ("selected", "positionAbsolute", "dragging")
+EDGE_UI_FIELDS = ("type", "animated", "label")
+
+
+def loads(body: bytes) -> Any:
+    """Parse a JSON request body (orjson when installed; both raise json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+# ─── IR ───────────────────────────────────────────────────────────────────────
+
+class Node:
+    """A canvas node: id, type and data plus the geometry layout needs."""
+    __slots__ = ("id", "type", "data", "x", "y", "width", "height", "ui")
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        data: Dict[str, Any],
+        x: float = 0.0,
+        y: float = 0.0,
+        width: Optional[float] = None,
+        height: Optional[float] = None,
+        ui: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.type = type
+        self.data = data
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.ui = ui
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as BaseNodeSchema.model_dump(), for persistence."""
+        ui = self.ui or {}
+        return {
+            "id": self.id,
+            "type": self.type,
+            "position": {"x": self.x, "y": self.y},
+            "data": self.data,
+            "width": self.width,
+            "height": self.height,
+            "selected": ui.get("selected"),
+            "positionAbsolute": ui.get("positionAbsolute"),
+            "dragging": ui.get("dragging"),
+        }
+
+
+class Edge:
+    """A directed edge between two node handles."""
+    __slots__ = ("id", "source", "target", "sourceHandle", "targetHandle", "ui")
+
+    def __init__(
+        self,
+        id: str,
+        source: str,
+        target: str,
+        sourceHandle: Optional[str] = None,
+        targetHandle: Optional[str] = None,
+        ui: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.source = source
+        self.target = target
+        self.sourceHandle = sourceHandle
+        self.targetHandle = targetHandle
+        self.ui = ui
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as EdgeSchema.model_dump(), for persistence."""
+        ui = self.ui or {}
+        return {
+            "id": self.id,
+            "source": self.source,
+            "target": self.target,
+            "sourceHandle": self.sourceHandle,
+            "targetHandle": self.targetHandle,
+            "type": ui.get("type"),
+            "animated": ui.get("animated"),
+            "label": ui.get("label"),
+        }
+
+
+# ─── Decoder ──────────────────────────────────────────────────────────────────
+# Used as a Pydantic PlainValidator on each list item, so list limits, error
+# locations and the 422 format stay as they were with the models. The fast path
+# is a handful of inline type checks; _node_error/_edge_error re-walk a bad
+# item only to say what is wrong with it.
+
+_NUMBER = (int, float)
+
+
+def _error(field: str, expected: str) -> PydanticCustomError:
+    if expected == "required":
+        return PydanticCustomError("missing", "{field}: Field required", {"field": field})
+    return PydanticCustomError("ir_invalid", "{field}: Input should be {expected}", {"field": field, "expected": expected})
+
+
+def _bad_point(value: Any) -> bool:
+    return type(value) is not dict or type(value.get("x")) not in _NUMBER or type(value.get("y")) not in _NUMBER
+
+
+def _check(raw: dict, field: str, kind, required: bool = False) -> Optional[PydanticCustomError]:
+    value = raw.get(field)
+    if value is None:
+        return _error(field, "required") if required else None
+    if kind == "point":
+        return _error(field, "an object with numeric x and y") if _bad_point(value) else None
+    if type(value) not in kind:
+        name = {str: "a valid string", bool: "a valid boolean", int: "a valid number", dict: "a valid dictionary"}[kind[0]]
+        return _error(field, name)
+    return None
+
+
+def _node_error(raw: Any) -> PydanticCustomError:
+    if type(raw) is not dict:
+        return _error("node", "a valid dictionary")
+    checks = (
+        ("id", (str,), True), ("type", (str,), True), ("position", "point", True),
+        ("data", (dict,), False), ("width", _NUMBER, False), ("height", _NUMBER, False),
+        ("selected", (bool,), False), ("positionAbsolute", "point", False), ("dragging", (bool,), False),
+    )
+    for field, kind, required in checks:
+        err = _check(raw, field, kind, required)
+        if err is not None:
+            return err
+    return _error("node", "a valid node")
+
+
+def _edge_error(raw: Any) -> PydanticCustomError:
+    if type(raw) is not dict:
+        return _error("edge", "a valid dictionary")
+    checks = (
+        ("id", (str,), True), ("source", (str,), True), ("target", (str,), True),
+        ("sourceHandle", (str,), False), ("targetHandle", (str,), False),
+        ("type", (str,), False), ("animated", (bool,), False), ("label", (str,), False),
+    )
+    for field, kind, required in checks:
+        err = _check(raw, field, kind, required)
+        if err is not None:
+            return err
+    return _error("edge", "a valid edge")
+
+
+def decode_node(raw: Any) -> Node:
+    """Build a Node from one decoded JSON object; raises a Pydantic error on bad input."""
+    if type(raw) is not dict:
+        if isinstance(raw, Node):
+            return raw
+        raise _node_error(raw)
+    get = raw.get
+    node_id, node_type, pos, data = get("id"), get("type"), get("position"), get("data")
+    width, height = get("width"), get("height")
+    selected, absolute, dragging = get("selected"), get("positionAbsolute"), get("dragging")
+    if (
+        type(node_id) is not str or type(node_type) is not str or _bad_point(pos)
+        or (data is not None and type(data) is not dict)
+        or (width is not None and type(width) not in _NUMBER)
+        or (height is not None and type(height) not in _NUMBER)
+        or (selected is not None and type(selected) is not bool)
+        or (dragging is not None and type(dragging) is not bool)
+        or (absolute is not None and _bad_point(absolute))
+    ):
+        raise _node_error(raw)
+    # UI fields stay in the request dict; only /save reads them back
+    ui = raw if (selected is not None or absolute is not None or dragging is not None) else None
+    return Node(
+        _intern(node_id), _intern(node_type), {} if data is None else data,
+        float(pos["x"]), float(pos["y"]),
+        None if width is None else float(width), None if height is None else float(height),
+        ui,
+    )
+
+
+def decode_edge(raw: Any) -> Edge:
+    """Build an Edge from one decoded JSON object; raises a Pydantic error on bad input."""
+    if type(raw) is not dict:
+        if isinstance(raw, Edge):
+            return raw
+        raise _edge_error(raw)
+    get = raw.get
+    edge_id, source, target = get("id"), get("source"), get("target")
+    source_handle, target_handle = get("sourceHandle"), get("targetHandle")
+    edge_type, animated, label = get("type"), get("animated"), get("label")
+    if (
+        type(edge_id) is not str or type(source) is not str or type(target) is not str
+        or (source_handle is not None and type(source_handle) is not str)
+        or (target_handle is not None and type(target_handle) is not str)
+        or (edge_type is not None and type(edge_type) is not str)
+        or (animated is not None and type(animated) is not bool)
+        or (label is not None and type(label) is not str)
+    ):
+        raise _edge_error(raw)
+    ui = raw if (edge_type is not None or animated is not None or label is not None) else None
+    return Edge(
+        edge_id, _intern(source), _intern(target),
+        None if source_handle is None else _intern(source_handle),
+        None if target_handle is None else _intern(target_handle),
+        ui,
+    )
@@ -1,6 +1,8 @@
 # domain/schemas.py — Pydantic models for all request/response types
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from pydantic import AwareDatetime, BaseModel, Field, PlainSerializer, PlainValidator
+from typing import Annotated, List, Dict, Any, Optional
+
+from domain.pipeline_ir import Edge, Node, decode_edge, decode_node
 
 
 # ─── Request Schemas ──────────────────────────────────────────────────────────
@@ -33,19 +35,60 @@ class EdgeSchema(BaseModel):
     label: Optional[str] = None
 
 
+# Request node/edge lists decode straight into the lean IR in domain/pipeline_ir.py;
+# the models above only describe the wire format in OpenAPI and saved records.
+NodeIn = Annotated[Node, PlainValidator(decode_node, json_schema_input_type=BaseNodeSchema), PlainSerializer(Node.to_dict)]
+EdgeIn = Annotated[Edge, PlainValidator(decode_edge, json_schema_input_type=EdgeSchema), PlainSerializer(Edge.to_dict)]
+
+
 class PipelineData(BaseModel):
-    nodes: List[BaseNodeSchema] = Field(default=[], max_length=1000, description="Pipeline nodes")
-    edges: List[EdgeSchema] = Field(default=[], max_length=5000, description="Directed edges")
+    nodes: List[NodeIn] = Field(default=[], max_length=1000, description="Pipeline nodes")
+    edges: List[EdgeIn] = Field(default=[], max_length=5000, description="Directed edges")
     name: Optional[str] = Field(default="Untitled Pipeline", max_length=200)
 
 
 class ExecuteRequest(BaseModel):
-    nodes: List[BaseNodeSchema]
-    edges: List[EdgeSchema]
+    nodes: List[NodeIn] = Field(..., max_length=1000)
+    edges: List[EdgeIn] = Field(..., max_length=5000)
     pipeline_id: Optional[str] = None
     resume_node_id: Optional[str] = None
     user_input: Optional[str] = None
     env: Optional[Dict[str, str]] = None
+    saved_pipeline_id: Optional[str] = Field(
+        default=None, max_length=100, description="Saved pipeline being run; groups its runs in run history",
+    )
+
+
+class SavedExecuteRequest(BaseModel):
+    inputs: Dict[str, str] = Field(
+        default={}, max_length=200, description="Values for Input nodes, keyed by input name or node ID",
+    )
+    env: Optional[Dict[str, str]] = None
+
+
+class ResumeRunRequest(BaseModel):
+    user_input: Optional[str] = None
+    env: Optional[Dict[str, str]] = None
+
+
+class IncrementalLayoutRequest(PipelineData):
+    changed: List[str] = Field(default=[], max_length=1000, description="New or edited node IDs to place; all others stay pinned")
+
+
+class NodeUpdate(BaseModel):
+    id: str
+    type: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None      # replaces the node's data when given
+
+
+class GraphDelta(BaseModel):
+    """Changes applied to a graph session: removals first, then additions and updates."""
+    base_version: Optional[int] = Field(default=None, description="Reject with 409 unless the session is at this version")
+    add_nodes: List[NodeIn] = Field(default=[], max_length=1000)
+    update_nodes: List[NodeUpdate] = Field(default=[], max_length=1000)
+    remove_nodes: List[str] = Field(default=[], max_length=1000)
+    add_edges: List[EdgeIn] = Field(default=[], max_length=5000)
+    remove_edges: List[str] = Field(default=[], max_length=5000)
 
 
 # ─── Response Schemas ─────────────────────────────────────────────────────────
@@ -98,6 +141,56 @@ class AutoLayoutResponse(BaseModel):
     nodes: List[LayoutNode]
 
 
+class IncrementalLayoutResponse(AutoLayoutResponse):
+    """Only nodes whose position changed are listed."""
+    mode: str           # "incremental" | "full" (too much changed to keep positions)
+
+
+class AnalyzeResponse(BaseModel):
+    """Sections not requested via ?include= are omitted (null)."""
+    metrics: Optional[ParseResponse] = None
+    validation: Optional[ValidateResponse] = None
+    layout: Optional[AutoLayoutResponse] = None
+
+
+class GraphSessionSnapshot(BaseModel):
+    session_id: str
+    version: int
+    metrics: ParseResponse
+    validation: ValidateResponse
+
+
+class NodeDegree(BaseModel):
+    # "in" is a keyword, hence the alias
+    in_: int = Field(alias="in")
+    out: int
+
+
+class NodeIssues(BaseModel):
+    errors: List[ValidationError]
+    warnings: List[str]
+
+
+class DeltaValidation(BaseModel):
+    valid: bool
+    nodes: Dict[str, NodeIssues]          # only nodes whose issues changed; empty lists = cleared
+
+
+class GraphDeltaResponse(BaseModel):
+    session_id: str
+    version: int
+    num_nodes: int
+    num_edges: int
+    is_dag: bool
+    connected_components: int
+    cycle_edges: List[List[str]]           # (source, target) pairs that close a cycle
+    warnings: List[str]                    # pipeline-level warnings, as in ParseResponse
+    removed_nodes: List[str]
+    degrees: Dict[str, NodeDegree]         # nodes whose degree or config changed
+    order: Dict[str, int]                  # new topological ranks (ascending = execution order)
+    validation: DeltaValidation
+
+
 class NodeTypeField(BaseModel):
     name: str
     type: str       # "text" | "select" | "textarea" | "number"
@@ -127,8 +220,8 @@ class NodeTypesResponse(BaseModel):
 class SavePipelineRequest(BaseModel):
     id: str = Field(..., max_length=100, description="Unique pipeline ID (UUID)")
     name: str = Field(..., max_length=200, description="Human-readable pipeline name")
-    nodes: List[BaseNodeSchema] = Field(default=[])
-    edges: List[EdgeSchema] = Field(default=[])
+    nodes: List[NodeIn] = Field(default=[], max_length=1000)
+    edges: List[EdgeIn] = Field(default=[], max_length=5000)
 
 
 class SavedPipelineInfo(BaseModel):
@@ -139,7 +232,125 @@ class SavedPipelineInfo(BaseModel):
     updated_at: str
 
 
+class SavedPipelinePage(BaseModel):
+    """One keyset page of the list endpoint."""
+    pipelines: List[SavedPipelineInfo]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `after` for the next page; null on the last page")
+
+
+class PipelineSearchHit(SavedPipelineInfo):
+    snippet: str = Field(..., description="Matching node content with hits wrapped in [ ]")
+    score: float = Field(..., description="bm25 rank; lower is better")
+
+
+class PipelineSearchResponse(BaseModel):
+    results: List[PipelineSearchHit]
+    next_offset: Optional[int] = None
+
+
+class PipelineRevisionInfo(BaseModel):
+    rev: int
+    kind: str = Field(..., description="'snapshot' (full graph) or 'delta' (changes since the previous revision)")
+    name: str
+    created_at: str
+    bytes: int = Field(..., description="Stored (compressed) size of this revision")
+
+
+class PipelineRevisionPage(BaseModel):
+    revisions: List[PipelineRevisionInfo]
+    next_before: Optional[int] = Field(default=None, description="Pass as `before` for older revisions")
+
+
+class PipelineRevisionDetail(BaseModel):
+    """One revision, materialised."""
+    id: str
+    rev: int
+    name: str
+    created_at: str
+    data: Dict[str, Any] = Field(..., description="{nodes, edges} as saved in that revision")
+
+
 class SavedPipelineDetail(SavedPipelineInfo):
     """Full record including nodes and edges."""
     nodes: List[BaseNodeSchema] = []
     edges: List[EdgeSchema] = []
+
+
+class PipelineGraph(BaseModel):
+    nodes: List[NodeIn] = Field(default=[], max_length=1000)
+    edges: List[EdgeIn] = Field(default=[], max_length=5000)
+
+
+class PipelineExportRecord(BaseModel):
+    """One NDJSON line of GET /export and POST /import — the GET /saved/{id} body."""
+    id: str = Field(..., min_length=1, max_length=100)
+    name: str = Field(..., max_length=200)
+    created_at: Optional[AwareDatetime] = None
+    updated_at: Optional[AwareDatetime] = None
+    data: PipelineGraph
+
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+
+class PipelineImportResult(BaseModel):
+    imported: int = Field(..., description="Records stored under their own id")
+    overwritten: int
+    renamed: int = Field(..., description="Conflicting records stored under a new id")
+    skipped: int
+    failed: int = Field(..., description="Lines that were not valid records")
+    errors: List[ImportLineError] = Field(default=[], description="The first failed lines")
+
+
+class RunSummary(BaseModel):
+    run_id: str
+    pipeline_id: Optional[str] = None
+    status: str = Field(..., description="running | paused | completed | failed | aborted")
+    started_at: float = Field(..., description="Unix time")
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    cost: float
+    tokens_in: int
+    tokens_out: int
+
+
+class RunNodeEvent(BaseModel):
+    at: float = Field(..., description="Unix time")
+    event: str = Field(..., description="node_start | node_complete | node_paused | error")
+    node_id: Optional[str] = None
+    node_type: Optional[str] = None
+    duration_ms: Optional[float] = None
+    cost: Optional[float] = None
+    tokens_in: Optional[int] = None
+    tokens_out: Optional[int] = None
+    detail: Optional[str] = Field(default=None, description="Result preview or error message")
+
+
+class RunTimeline(RunSummary):
+    events: List[RunNodeEvent]
+
+
+class RunList(BaseModel):
+    runs: List[RunSummary]
+
+
+class Percentiles(BaseModel):
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class NodeRunStats(BaseModel):
+    node_id: str
+    node_type: Optional[str] = None
+    runs: int
+    latency_ms: Percentiles
+    cost: Percentiles
+    total_cost: float
+
+
+class PipelineRunStats(BaseModel):
+    pipeline_id: str
+    nodes: List[NodeRunStats] = Field(..., description="Slowest (p90 latency) first")
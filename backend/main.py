@@ -7,7 +7,8 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from api.v1.routers import pipelines
-from services.pipeline_store import init_db
+from services import compute_pool, run_history
+from services.pipeline_store import close_db, flush_saves, init_db
 
 # ─── Rate limiter ─────────────────────────────────────────────────────────────
 limiter = Limiter(key_func=get_remote_address)
@@ -16,10 +17,15 @@ limiter = Limiter(key_func=get_remote_address)
 # ─── Lifespan (startup/shutdown) ──────────────────────────────────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: initialise SQLite database
+    # Startup: open the SQLite connection pool and start an analysis worker
     await init_db()
+    compute_pool.warm_up()
     yield
-    # Shutdown (nothing to do)
+    # Shutdown: write queued saves and run events, stop analysis worker processes, close database connections
+    await flush_saves()
+    await run_history.stop()
+    compute_pool.shutdown()
+    await close_db()
 
 
 # ─── App ──────────────────────────────────────────────────────────────────────
@@ -49,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
 )
 
 # ─── Routers ──────────────────────────────────────────────────────────────────
@@ -0,0 +1,117 @@
+# services/analysis_cache.py — Memoised /parse and /validate results keyed by a canonical pipeline hash
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from domain.pipeline_ir import Edge, Node
+
+MAX_ENTRIES = 512
+_NO_HANDLE = "\x00"         # stands in for an unset edge handle in the hash
+
+# (kind, pipeline hash) → _Entry  (LRU)
+_RESULTS: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0}
+
+
+class _Entry:
+    __slots__ = ("value", "body")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.body: Optional[bytes] = None
+
+
+def pipeline_hash(nodes: List[Node], edges: List[Edge]) -> str:
+    """
+    Digest of the semantic graph only: node id/type/data and edge endpoints and
+    handles, in request order (results list nodes in that order). UI state such
+    as position, selection, dragging and measured size is ignored, so moving
+    nodes around does not invalidate cached analysis.
+    """
+    node_part = json.dumps(
+        [[n.id, n.type, n.data] for n in nodes],
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    # Edges are flat strings; joining them is ~3x cheaper than JSON-encoding 5k lists.
+    # An unset handle must not format as "None", which is also a valid handle id.
+    edge_part = "\x1e".join(
+        f"{e.source}\x1f{e.target}\x1f{_NO_HANDLE if e.sourceHandle is None else e.sourceHandle}"
+        f"\x1f{_NO_HANDLE if e.targetHandle is None else e.targetHandle}"
+        for e in edges
+    )
+    h = hashlib.blake2b(digest_size=16)
+    h.update(node_part.encode("utf-8"))
+    h.update(b"\x1d")
+    h.update(edge_part.encode("utf-8"))
+    return h.hexdigest()
+
+
+def etag(kind: str, digest: str) -> str:
+    return f'"{kind}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == tag:
+            return True
+    return False
+
+
+def lookup(kind: str, digest: str) -> Optional[Any]:
+    """Cached result for (kind, digest), or None on a miss."""
+    key = (kind, digest)
+    with _LOCK:
+        entry = _RESULTS.get(key)
+        if entry is None:
+            _STATS["misses"] += 1
+            return None
+        _RESULTS.move_to_end(key)
+        _STATS["hits"] += 1
+        return entry.value
+
+
+def lookup_json(kind: str, digest: str) -> Optional[bytes]:
+    """Like lookup(), but the result already encoded as a JSON body."""
+    key = (kind, digest)
+    with _LOCK:
+        entry = _RESULTS.get(key)
+        if entry is None:
+            _STATS["misses"] += 1
+            return None
+        _RESULTS.move_to_end(key)
+        _STATS["hits"] += 1
+    return _encoded(entry)
+
+
+def store(kind: str, digest: str, value: Any) -> bytes:
+    """Cache a freshly computed result; returns its JSON body."""
+    entry = _Entry(value)
+    with _LOCK:
+        _RESULTS[(kind, digest)] = entry
+        while len(_RESULTS) > MAX_ENTRIES:
+            _RESULTS.popitem(last=False)
+    return _encoded(entry)
+
+
+def _encoded(entry: _Entry) -> bytes:
+    if entry.body is None:
+        entry.body = json.dumps(entry.value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return entry.body
+
+
+def get_stats() -> dict:
+    with _LOCK:
+        return {"entries": len(_RESULTS), "max_entries": MAX_ENTRIES, **_STATS}
+
+
+def clear() -> None:
+    with _LOCK:
+        _RESULTS.clear()
+        _STATS["hits"] = _STATS["misses"] = 0
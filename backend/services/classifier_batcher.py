@@ -0,0 +1,170 @@
+# services/classifier_batcher.py — Cross-run micro-batching of classifier calls
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# (system_prompt, user_text) → (content, tokens_in, tokens_out)
+CompleteFn = Callable[[str, str], Awaitable[Tuple[str, int, int]]]
+
+BATCH_WINDOW_SECONDS = 0.015   # how long the first request waits for companions
+MAX_BATCH_ITEMS = 16
+MAX_BATCH_CHARS = 24000        # keep packed prompts well inside small free-model contexts
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# (api key digest, model, labels) → batch currently collecting requests
+_PENDING: Dict[tuple, "_Batch"] = {}
+# Strong references so in-flight batch tasks are not garbage-collected
+_TASKS: Set[asyncio.Task] = set()
+
+
+class _Item:
+    __slots__ = ("text", "future")
+
+    def __init__(self, text: str, future: asyncio.Future):
+        self.text = text
+        self.future = future
+
+
+class _Batch:
+    __slots__ = ("complete", "labels", "items", "chars", "timer")
+
+    def __init__(self, complete: CompleteFn, labels: List[str]):
+        self.complete = complete
+        self.labels = labels
+        self.items: List[_Item] = []
+        self.chars = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+# ─── Prompts & parsing ────────────────────────────────────────────────────────
+
+def single_system_prompt(labels: List[str]) -> str:
+    return (
+        f"Classify the given text into exactly one of these labels: {labels}. "
+        "Respond ONLY with valid JSON: {\"label\": \"chosen_label\", \"score\": 0.95}"
+    )
+
+
+def batch_system_prompt(labels: List[str]) -> str:
+    return (
+        f"Classify each text in the given JSON array into exactly one of these labels: {labels}. "
+        "Respond ONLY with a valid JSON array containing one object per input, in the same order: "
+        "[{\"index\": 0, \"label\": \"chosen_label\", \"score\": 0.95}, ...]"
+    )
+
+
+def parse_json_reply(content: str) -> Any:
+    """Strip optional ``` fences and decode the model's JSON reply."""
+    return json.loads(_FENCE_RE.sub("", (content or "").strip()).strip())
+
+
+def _validate_batch(reply: Any, labels: List[str], n: int) -> List[Optional[dict]]:
+    """Map a batch reply onto item slots; None marks an item that must be retried on its own."""
+    results: List[Optional[dict]] = [None] * n
+    if not isinstance(reply, list):
+        return results
+    canonical = {l.lower(): l for l in labels}
+    for pos, entry in enumerate(reply):
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("index", pos)
+        # type() rather than isinstance(): true/false in a reply would pass as 1/0
+        if type(index) is not int or not 0 <= index < n or results[index] is not None:
+            continue
+        label = canonical.get(str(entry.get("label", "")).strip().lower())
+        try:
+            score = float(entry.get("score"))
+        except (TypeError, ValueError):
+            continue
+        if label is None or not 0.0 <= score <= 1.0:
+            continue
+        results[index] = {"label": label, "score": score}
+    return results
+
+
+# ─── Dispatch ─────────────────────────────────────────────────────────────────
+
+def _resolve(item: _Item, value: Any = None, exc: Optional[BaseException] = None) -> None:
+    if item.future.done():
+        return
+    if exc is not None:
+        item.future.set_exception(exc)
+    else:
+        item.future.set_result(value)
+
+
+async def _run_single(batch: _Batch, item: _Item) -> None:
+    try:
+        content, t_in, t_out = await batch.complete(single_system_prompt(batch.labels), item.text)
+        _resolve(item, (parse_json_reply(content), t_in, t_out))
+    except Exception as exc:
+        _resolve(item, exc=exc)
+
+
+async def _run_batch(batch: _Batch) -> None:
+    items = batch.items
+    if len(items) == 1:
+        await _run_single(batch, items[0])
+        return
+
+    payload = json.dumps([{"index": i, "text": it.text} for i, it in enumerate(items)])
+    try:
+        content, t_in, t_out = await batch.complete(batch_system_prompt(batch.labels), payload)
+        results = _validate_batch(parse_json_reply(content), batch.labels, len(items))
+    except Exception:
+        results, t_in, t_out = [None] * len(items), 0, 0
+
+    share_in, share_out = t_in // len(items), t_out // len(items)
+    retry = []
+    for item, result in zip(items, results):
+        if result is None:
+            retry.append(item)
+        else:
+            _resolve(item, (result, share_in, share_out))
+    if retry:
+        await asyncio.gather(*(_run_single(batch, it) for it in retry))
+
+
+def _dispatch(key: tuple) -> None:
+    batch = _PENDING.pop(key, None)
+    if batch is None:
+        return
+    if batch.timer is not None:
+        batch.timer.cancel()
+    task = asyncio.ensure_future(_run_batch(batch))
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+
+
+async def classify(
+    complete: CompleteFn,
+    api_key: str,
+    model: str,
+    labels: List[str],
+    text: str,
+) -> Tuple[Any, int, int]:
+    """
+    Classify one text. Concurrent calls sharing api key, model and label set
+    are packed into a single JSON-array prompt; items whose answer fails
+    validation are retried individually. Returns (result, tokens_in, tokens_out).
+    """
+    loop = asyncio.get_running_loop()
+    key = (hashlib.sha1(api_key.encode("utf-8")).hexdigest(), model, tuple(labels))
+
+    batch = _PENDING.get(key)
+    if batch is not None and batch.chars + len(text) > MAX_BATCH_CHARS:
+        _dispatch(key)
+        batch = None
+    if batch is None:
+        batch = _PENDING[key] = _Batch(complete, labels)
+        batch.timer = loop.call_later(BATCH_WINDOW_SECONDS, _dispatch, key)
+
+    future = loop.create_future()
+    batch.items.append(_Item(text, future))
+    batch.chars += len(text)
+    if len(batch.items) >= MAX_BATCH_ITEMS:
+        _dispatch(key)
+    return await future
@@ -0,0 +1,133 @@
+# services/compute_pool.py — Size-aware dispatch of CPU-bound graph work to a process pool
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from domain.pipeline_ir import Edge, Node
+from services.graph_service import (
+    analyze_pipeline,
+    calculate_pipeline_metrics,
+    compute_auto_layout,
+    compute_incremental_layout,
+    validate_pipeline,
+)
+
+OFFLOAD_MIN_ELEMENTS = 1500     # nodes + edges; smaller graphs finish in a few ms on the threadpool
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+MAX_QUEUED = MAX_WORKERS * 4    # waiting jobs allowed on top of the ones running
+RETRY_AFTER_SECONDS = 2
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+# Offloaded jobs running or queued. Only touched from the event loop, so no lock.
+_IN_FLIGHT = 0
+
+
+class PoolBusy(Exception):
+    """Too many large graph jobs queued; the caller should answer 503 with Retry-After."""
+
+    def __init__(self, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__("Server is busy analysing other large pipelines.")
+        self.retry_after = retry_after
+
+
+# ─── Jobs (run inline or inside a worker process) ─────────────────────────────
+
+def _analyze_sections(nodes, edges, sections, direction: str = "LR") -> Dict[str, Any]:
+    analysis = analyze_pipeline(nodes, edges)
+    result: Dict[str, Any] = {}
+    if "metrics" in sections:
+        result["metrics"] = calculate_pipeline_metrics(nodes, edges, analysis=analysis)
+    if "validation" in sections:
+        result["validation"] = validate_pipeline(nodes, edges, analysis=analysis)
+    if "layout" in sections:
+        result["layout"] = {"nodes": compute_auto_layout(nodes, edges, direction, analysis=analysis)}
+    return result
+
+
+_JOBS = {
+    "parse": calculate_pipeline_metrics,
+    "validate": validate_pipeline,
+    "layout": compute_auto_layout,
+    "incremental_layout": compute_incremental_layout,
+    "analyze": _analyze_sections,
+}
+
+
+# ─── Compact payload ──────────────────────────────────────────────────────────
+
+def pack(nodes: List[Node], edges: List[Edge]) -> Tuple[tuple, tuple]:
+    """Plain tuples of the fields graph services read; cheaper to pickle than slotted objects."""
+    return (
+        tuple((n.id, n.type, n.data, n.x, n.y, n.width, n.height) for n in nodes),
+        tuple((e.id, e.source, e.target, e.sourceHandle, e.targetHandle) for e in edges),
+    )
+
+
+def unpack(payload: Tuple[tuple, tuple]) -> Tuple[List[Node], List[Edge]]:
+    """Rebuild the IR; the payload was already validated in the parent."""
+    node_rows, edge_rows = payload
+    nodes = [Node(*row) for row in node_rows]
+    edges = [Edge(*row) for row in edge_rows]
+    return nodes, edges
+
+
+def _run_packed(kind: str, payload: Tuple[tuple, tuple], args: tuple, kwargs: dict) -> Any:
+    nodes, edges = unpack(payload)
+    return _JOBS[kind](nodes, edges, *args, **kwargs)
+
+
+# ─── Dispatch ─────────────────────────────────────────────────────────────────
+
+def _executor() -> ProcessPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        # spawn, not fork: the server process has live threads (event loop, threadpool)
+        _EXECUTOR = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _EXECUTOR
+
+
+async def run(kind: str, nodes: List[Node], edges: List[Edge], *args, **kwargs) -> Any:
+    """
+    Run a graph job off the event loop: small graphs on the threadpool, large
+    ones in the process pool (raises PoolBusy when its queue is full).
+    """
+    global _IN_FLIGHT
+    job = _JOBS[kind]
+    if len(nodes) + len(edges) < OFFLOAD_MIN_ELEMENTS:
+        return await run_in_threadpool(job, nodes, edges, *args, **kwargs)
+    if _IN_FLIGHT >= MAX_WORKERS + MAX_QUEUED:
+        raise PoolBusy()
+
+    _IN_FLIGHT += 1
+    try:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(_executor(), _run_packed, kind, pack(nodes, edges), args, kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time and finish this job here
+            shutdown()
+            return await run_in_threadpool(job, nodes, edges, *args, **kwargs)
+    finally:
+        _IN_FLIGHT -= 1
+
+
+def _noop() -> None:
+    return None
+
+
+def warm_up() -> None:
+    """Start a worker in the background so the first large request skips interpreter spawn."""
+    _executor().submit(_noop)
+
+
+def shutdown() -> None:
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        _EXECUTOR = None
+
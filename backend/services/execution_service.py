@@ -5,10 +5,11 @@ import uuid
 import csv
 import io
 import re
+import time
+import zipfile
 from typing import List, Dict, Any, AsyncGenerator, Optional
 
 import httpx
-from simpleeval import simple_eval
 
 try:
     from openai import AsyncOpenAI
@@ -20,9 +21,12 @@ try:
 except ImportError:
     BeautifulSoup = None
 
-from domain.schemas import BaseNodeSchema, EdgeSchema
+from domain.pipeline_ir import Edge, Node
 from services.graph_service import _build_graph
-import networkx as nx
+from services import classifier_batcher, run_history, semantic_cache, summarization
+from services.node_compiler import compile_plan, resolve_json_path
+from services.model_catalog import get_context_length
+from services.table import ColumnarTable, parse_csv, to_python
 
 # OpenRouter base URL — drop-in OpenAI-compatible
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
@@ -30,6 +34,10 @@ OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 # SSE event separator — must be actual double-newline characters
 SEP = "\n\n"
 
+# GitHub "Create Issue": JSON payload inside a ```json fence, else the first {...} block
+_GH_FENCED_JSON_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_GH_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
 # Global in-memory dictionary to hold paused execution states
 PAUSED_EXECUTIONS: Dict[str, Dict] = {}
 
@@ -45,6 +53,26 @@ def _get_openrouter_client(api_key: str) -> "AsyncOpenAI":
     return AsyncOpenAI(api_key=api_key, base_url=OPENROUTER_BASE_URL)
 
 
+async def _chat_once(client: "AsyncOpenAI", model: str, system: str, user: str) -> tuple:
+    """Single non-streaming completion → (content, tokens_in, tokens_out)."""
+    resp = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+        extra_headers={"HTTP-Referer": "http://localhost:3000", "X-Title": "VectorShift Pipeline"},
+    )
+    tokens_in = resp.usage.prompt_tokens if resp.usage else 50
+    tokens_out = resp.usage.completion_tokens if resp.usage else 30
+    return resp.choices[0].message.content, tokens_in, tokens_out
+
+
+def _get_upstream_raw(G: Any, node_id: str, node_results: Dict, index: int = 0) -> Any:
+    """Return the unserialised output of the nth upstream node, or None if none."""
+    preds = list(G.predecessors(node_id))
+    if not preds:
+        return None
+    return node_results.get(preds[min(index, len(preds) - 1)])
+
+
 def _get_upstream_value(G: Any, node_id: str, node_results: Dict, index: int = 0) -> Any:
     """Return the output of the nth upstream node, or '' if none."""
     preds = list(G.predecessors(node_id))
@@ -52,6 +80,8 @@ def _get_upstream_value(G: Any, node_id: str, node_results: Dict, index: int = 0
         return ""
     target = preds[min(index, len(preds) - 1)]
     val = node_results.get(target, "")
+    if isinstance(val, ColumnarTable):
+        return val.to_json()
     if isinstance(val, (dict, list)):
         return json.dumps(val)
     return str(val) if val is not None else ""
@@ -63,35 +93,99 @@ def _all_upstream_values(G: Any, node_id: str, node_results: Dict) -> List[str]:
     results = []
     for p in preds:
         v = node_results.get(p, "")
-        results.append(json.dumps(v) if isinstance(v, (dict, list)) else str(v))
+        if isinstance(v, ColumnarTable):
+            results.append(v.to_json())
+        else:
+            results.append(json.dumps(v) if isinstance(v, (dict, list)) else str(v))
     return results
 
 
+class PlanError(ValueError):
+    """The graph cannot be executed (it does not build, or it has cycles)."""
+
+
+class ExecutionPlan:
+    """Everything a run needs that depends only on the graph; built once, shared by runs."""
+
+    __slots__ = ("graph", "order", "nodes_by_id", "compiled")
+
+    def __init__(self, graph: Any, order: List[str], nodes_by_id: Dict[str, Node], compiled: Dict[str, Any]):
+        self.graph = graph
+        self.order = order
+        self.nodes_by_id = nodes_by_id
+        self.compiled = compiled
+
+
+def build_plan(nodes: List[Node], edges: List[Edge]) -> ExecutionPlan:
+    """Build the graph, fix the execution order and compile expressions, templates and JSON paths."""
+    try:
+        G = _build_graph(nodes, edges)
+    except Exception as exc:
+        raise PlanError(f"Graph build failed: {exc}") from exc
+    order = G.topological_order()
+    if order is None:
+        raise PlanError("Graph contains cycles — cannot execute.")
+    return ExecutionPlan(G, [G.ids[i] for i in order], {n.id: n for n in nodes}, compile_plan(nodes, edges))
+
+
+def get_paused(run_id: str) -> Optional[Dict[str, Any]]:
+    """State of a run paused at a node awaiting approval: results, node_id, plan, saved_pipeline_id."""
+    return PAUSED_EXECUTIONS.get(run_id)
+
+
 async def execute_dag_stream(
-    nodes: List[BaseNodeSchema],
-    edges: List[EdgeSchema],
+    nodes: Optional[List[Node]] = None,
+    edges: Optional[List[Edge]] = None,
     pipeline_id: Optional[str] = None,
     resume_node_id: Optional[str] = None,
     user_input: Optional[str] = None,
     env: Optional[Dict[str, str]] = None,
+    saved_pipeline_id: Optional[str] = None,
+    plan: Optional[ExecutionPlan] = None,
+    inputs: Optional[Dict[str, str]] = None,
 ) -> AsyncGenerator[str, None]:
-    """Executes a DAG and yields Server-Sent Events (SSE)."""
+    """
+    Executes a DAG and yields Server-Sent Events (SSE). Pass `plan` to skip
+    building and compiling `nodes`/`edges`. `inputs` binds Input nodes by
+    input name or node ID. `pipeline_id` identifies the run (and a paused run
+    to resume); every event is also queued for run_history under it, tagged
+    with `saved_pipeline_id` when known.
+    """
     if not pipeline_id:
         pipeline_id = str(uuid.uuid4())
-
-    env = env or {}
-
-    try:
-        G = _build_graph(nodes, edges)
-    except Exception as exc:
-        yield _sse({"event": "error", "message": f"Graph build failed: {exc}"})
-        return
-
+    recorder = run_history.RunRecorder(pipeline_id, saved_pipeline_id)
     try:
-        execution_plan = list(nx.topological_sort(G))
-    except Exception:
-        yield _sse({"event": "error", "message": "Graph contains cycles — cannot execute."})
-        return
+        if plan is None:
+            try:
+                plan = build_plan(nodes, edges)
+            except PlanError as exc:
+                event = {"event": "error", "message": str(exc)}
+                recorder.observe(event)
+                yield _sse(event)
+                return
+        events = _execute_events(plan, pipeline_id, resume_node_id, user_input, env, inputs, saved_pipeline_id)
+        async for event in events:
+            recorder.observe(event)
+            yield _sse(event)
+    finally:
+        recorder.close()
+
+
+async def _execute_events(
+    plan: ExecutionPlan,
+    pipeline_id: str,
+    resume_node_id: Optional[str],
+    user_input: Optional[str],
+    env: Optional[Dict[str, str]],
+    inputs: Optional[Dict[str, str]],
+    saved_pipeline_id: Optional[str],
+) -> AsyncGenerator[Dict[str, Any], None]:
+    env = env or {}
+    inputs = inputs or {}
+    G = plan.graph
+    execution_plan = plan.order
+    compiled = plan.compiled
+    nodes_by_id = plan.nodes_by_id
 
     # ─── Restore or init state ────────────────────────────────────────────────
     if pipeline_id in PAUSED_EXECUTIONS and resume_node_id:
@@ -108,31 +202,35 @@ async def execute_dag_stream(
         node_results: Dict[str, Any] = {}
         start_index = 0
 
-    yield _sse({"event": "pipeline_start", "pipeline_id": pipeline_id, "plan": execution_plan[start_index:]})
+    yield {"event": "pipeline_start", "pipeline_id": pipeline_id, "plan": execution_plan[start_index:]}
     await asyncio.sleep(0.05)
 
     # ─── Execute each node ────────────────────────────────────────────────────
     for i in range(start_index, len(execution_plan)):
         node_id = execution_plan[i]
-        node = next((n for n in nodes if n.id == node_id), None)
+        node = nodes_by_id.get(node_id)
         if not node:
             continue
 
         node_type = node.type
         data = node.data or {}
 
-        yield _sse({"event": "node_start", "node_id": node_id, "node_type": node_type})
+        yield {"event": "node_start", "node_id": node_id, "node_type": node_type}
         await asyncio.sleep(0.15)  # Let the node glow render in the browser
+        node_started = time.perf_counter()
 
         cost = 0.0
         tokens_in = 0
         tokens_out = 0
+        extra_metrics: Optional[Dict[str, Any]] = None
 
         # ── Human-in-the-loop ─────────────────────────────────────────────────
         if data.get("require_approval", False):
-            PAUSED_EXECUTIONS[pipeline_id] = {"results": node_results}
-            yield _sse({"event": "node_paused", "node_id": node_id, "pipeline_id": pipeline_id,
-                        "message": "Execution paused for user input."})
+            PAUSED_EXECUTIONS[pipeline_id] = {
+                "results": node_results, "node_id": node_id, "plan": plan, "saved_pipeline_id": saved_pipeline_id,
+            }
+            yield {"event": "node_paused", "node_id": node_id, "pipeline_id": pipeline_id,
+                   "message": "Execution paused for user input."}
             return
 
         try:
@@ -140,7 +238,8 @@ async def execute_dag_stream(
             #  I/O NODES
             # ================================================================
             if node_type == "customInput":
-                node_results[node_id] = data.get("inputName", f"input_{node_id}")
+                input_name = data.get("inputName", f"input_{node_id}")
+                node_results[node_id] = inputs.get(input_name, inputs.get(node_id, input_name))
 
             elif node_type == "customOutput":
                 node_results[node_id] = _get_upstream_value(G, node_id, node_results)
@@ -151,12 +250,12 @@ async def execute_dag_stream(
             elif node_type == "llm":
                 openrouter_key = env.get("OPENROUTER_API_KEY", "")
                 if not openrouter_key:
-                    yield _sse({"event": "error", "message": "LLM Error: OPENROUTER_API_KEY missing. Add it in Settings → Secrets."})
+                    yield {"event": "error", "message": "LLM Error: OPENROUTER_API_KEY missing. Add it in Settings → Secrets."}
                     return
 
                 model = data.get("model")
                 if not model:
-                    yield _sse({"event": "error", "message": "LLM Error: No model selected. Please select a free model in the node configuration."})
+                    yield {"event": "error", "message": "LLM Error: No model selected. Please select a free model in the node configuration."}
                     return
                 if "/" not in model:
                     model = f"openai/{model}"
@@ -166,40 +265,55 @@ async def execute_dag_stream(
                 max_tokens = int(data.get("maxTokens", 8192))
                 upstream_text = _get_upstream_value(G, node_id, node_results)
 
-                client = _get_openrouter_client(openrouter_key)
-                full_response = ""
-                try:
-                    stream = await client.chat.completions.create(
-                        model=model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": upstream_text},
-                        ],
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        stream=True,
-                        extra_headers={
-                            "HTTP-Referer": "http://localhost:3000",
-                            "X-Title": "VectorShift Pipeline",
-                        },
-                    )
-                    async for chunk in stream:
-                        delta = chunk.choices[0].delta.content if chunk.choices else None
-                        if delta:
-                            full_response += delta
-                            tokens_out += 1
-                            yield _sse({"event": "node_chunk", "node_id": node_id, "chunk": delta})
-                    tokens_in = len((system_prompt + upstream_text).split())
-                    cost = (tokens_in * 0.005 + tokens_out * 0.015) / 1000
-                except Exception as exc:
-                    yield _sse({"event": "error", "message": f"LLM Error: {exc}"})
-                    return
+                use_cache = semantic_cache.is_enabled(data)
+                cached = None
+                if use_cache:
+                    partition = semantic_cache.partition_key(openrouter_key, node_type, model, system_prompt, temperature, max_tokens)
+                    cached, similarity = semantic_cache.lookup(
+                        node_id, partition, upstream_text, semantic_cache.get_threshold(data))
+                    extra_metrics = {"cache_hit": cached is not None, "similarity": round(similarity, 4)}
+
+                if cached is not None:
+                    full_response = cached
+                    for piece in semantic_cache.iter_chunks(full_response):
+                        yield {"event": "node_chunk", "node_id": node_id, "chunk": piece}
+                else:
+                    client = _get_openrouter_client(openrouter_key)
+                    full_response = ""
+                    try:
+                        stream = await client.chat.completions.create(
+                            model=model,
+                            messages=[
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user", "content": upstream_text},
+                            ],
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            stream=True,
+                            extra_headers={
+                                "HTTP-Referer": "http://localhost:3000",
+                                "X-Title": "VectorShift Pipeline",
+                            },
+                        )
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                full_response += delta
+                                tokens_out += 1
+                                yield {"event": "node_chunk", "node_id": node_id, "chunk": delta}
+                        tokens_in = len((system_prompt + upstream_text).split())
+                        cost = (tokens_in * 0.005 + tokens_out * 0.015) / 1000
+                    except Exception as exc:
+                        yield {"event": "error", "message": f"LLM Error: {exc}"}
+                        return
+                    if use_cache and full_response:
+                        semantic_cache.store(partition, upstream_text, full_response)
                 node_results[node_id] = full_response
 
             elif node_type == "embedder":
                 openrouter_key = env.get("OPENROUTER_API_KEY", "")
                 if not openrouter_key:
-                    yield _sse({"event": "error", "message": "Embedder Error: OPENROUTER_API_KEY missing in settings."})
+                    yield {"event": "error", "message": "Embedder Error: OPENROUTER_API_KEY missing in settings."}
                     return
                 model = data.get("embeddingModel", "text-embedding-3-small")
                 if "/" not in model:
@@ -214,13 +328,13 @@ async def execute_dag_stream(
                     tokens_in = resp.usage.prompt_tokens if resp.usage else len(upstream_text.split())
                     cost = tokens_in * 0.00002 / 1000
                 except Exception as exc:
-                    yield _sse({"event": "error", "message": f"Embedder Error: {exc}"})
+                    yield {"event": "error", "message": f"Embedder Error: {exc}"}
                     return
 
             elif node_type == "imageGen":
                 openrouter_key = env.get("OPENROUTER_API_KEY", "")
                 if not openrouter_key:
-                    yield _sse({"event": "error", "message": "Image Gen Error: OPENROUTER_API_KEY missing in settings."})
+                    yield {"event": "error", "message": "Image Gen Error: OPENROUTER_API_KEY missing in settings."}
                     return
                 model = data.get("imageModel", "dall-e-3")
                 size = data.get("imageSize", "1024x1024")
@@ -238,17 +352,17 @@ async def execute_dag_stream(
                     node_results[node_id] = resp.data[0].url
                     cost = 0.04 if "dall-e-3" in model else 0.02
                 except Exception as exc:
-                    yield _sse({"event": "error", "message": f"Image Gen Error: {exc}"})
+                    yield {"event": "error", "message": f"Image Gen Error: {exc}"}
                     return
 
             elif node_type == "summarizer":
                 openrouter_key = env.get("OPENROUTER_API_KEY", "")
                 if not openrouter_key:
-                    yield _sse({"event": "error", "message": "Summarizer Error: OPENROUTER_API_KEY missing."})
+                    yield {"event": "error", "message": "Summarizer Error: OPENROUTER_API_KEY missing."}
                     return
                 model = data.get("summaryModel")
                 if not model:
-                    yield _sse({"event": "error", "message": "Summarizer Error: No model selected."})
+                    yield {"event": "error", "message": "Summarizer Error: No model selected."}
                     return
                 if "/" not in model:
                     model = f"openai/{model}"
@@ -261,28 +375,51 @@ async def execute_dag_stream(
                     f"You are a summarization expert. Summarize the following text in a {style.lower()} style, "
                     f"targeting {length_map.get(length, 'medium length')}. Output only the summary."
                 )
-                try:
-                    resp = await client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "system", "content": system}, {"role": "user", "content": upstream_text}],
-                        extra_headers={"HTTP-Referer": "http://localhost:3000", "X-Title": "VectorShift Pipeline"},
-                    )
-                    node_results[node_id] = resp.choices[0].message.content
-                    tokens_in = resp.usage.prompt_tokens if resp.usage else 50
-                    tokens_out = resp.usage.completion_tokens if resp.usage else 30
-                    cost = (tokens_in * 0.005 + tokens_out * 0.015) / 1000
-                except Exception as exc:
-                    yield _sse({"event": "error", "message": f"Summarizer Error: {exc}"})
-                    return
+                use_cache = semantic_cache.is_enabled(data)
+                cached = None
+                if use_cache:
+                    partition = semantic_cache.partition_key(openrouter_key, node_type, model, system)
+                    cached, similarity = semantic_cache.lookup(
+                        node_id, partition, upstream_text, semantic_cache.get_threshold(data))
+                    extra_metrics = {"cache_hit": cached is not None, "similarity": round(similarity, 4)}
+
+                if cached is not None:
+                    node_results[node_id] = cached
+                else:
+                    # Chunking: "Auto" splits only inputs that exceed the model's per-call budget
+                    chunking = data.get("chunking", "Auto")
+                    use_chunks = False
+                    if chunking == "Always" or (
+                        chunking == "Auto"
+                        and summarization.estimate_tokens(upstream_text) > summarization.MIN_CHUNK_TOKENS
+                    ):
+                        context_length = await get_context_length(model, openrouter_key)
+                        use_chunks = chunking == "Always" or summarization.needs_chunking(upstream_text, context_length)
+                    try:
+                        if use_chunks:
+                            summary, tokens_in, tokens_out, num_chunks = await summarization.map_reduce_summarize(
+                                lambda sys_prompt, text: _chat_once(client, model, sys_prompt, text),
+                                upstream_text, system, context_length,
+                            )
+                            extra_metrics = {**(extra_metrics or {}), "chunks": num_chunks}
+                        else:
+                            summary, tokens_in, tokens_out = await _chat_once(client, model, system, upstream_text)
+                        node_results[node_id] = summary
+                        cost = (tokens_in * 0.005 + tokens_out * 0.015) / 1000
+                    except Exception as exc:
+                        yield {"event": "error", "message": f"Summarizer Error: {exc}"}
+                        return
+                    if use_cache and node_results[node_id]:
+                        semantic_cache.store(partition, upstream_text, node_results[node_id])
 
             elif node_type == "classifier":
                 openrouter_key = env.get("OPENROUTER_API_KEY", "")
                 if not openrouter_key:
-                    yield _sse({"event": "error", "message": "Classifier Error: OPENROUTER_API_KEY missing."})
+                    yield {"event": "error", "message": "Classifier Error: OPENROUTER_API_KEY missing."}
                     return
                 model = data.get("classifierModel")
                 if not model:
-                    yield _sse({"event": "error", "message": "Classifier Error: No model selected."})
+                    yield {"event": "error", "message": "Classifier Error: No model selected."}
                     return
                 if "/" not in model:
                     model = f"openai/{model}"
@@ -290,29 +427,43 @@ async def execute_dag_stream(
                 labels = [l.strip() for l in labels_str.split(",") if l.strip()]
                 upstream_text = _get_upstream_value(G, node_id, node_results)
                 client = _get_openrouter_client(openrouter_key)
-                system = (
-                    f"Classify the given text into exactly one of these labels: {labels}. "
-                    "Respond ONLY with valid JSON: {\"label\": \"chosen_label\", \"score\": 0.95}"
-                )
-                try:
-                    resp = await client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "system", "content": system}, {"role": "user", "content": upstream_text}],
-                        extra_headers={"HTTP-Referer": "http://localhost:3000", "X-Title": "VectorShift Pipeline"},
-                    )
-                    raw = resp.choices[0].message.content.strip()
-                    raw = re.sub(r"^```(?:json)?\s*|\s*```$", "", raw).strip()
-                    node_results[node_id] = json.loads(raw)
-                    tokens_in = resp.usage.prompt_tokens if resp.usage else 30
-                    cost = (tokens_in * 0.005) / 1000
-                except Exception as exc:
-                    node_results[node_id] = {"label": labels[0] if labels else "unknown", "score": 0.0, "error": str(exc)}
+                system = classifier_batcher.single_system_prompt(labels)
+                use_cache = semantic_cache.is_enabled(data)
+                cached = None
+                if use_cache:
+                    partition = semantic_cache.partition_key(openrouter_key, node_type, model, system)
+                    cached, similarity = semantic_cache.lookup(
+                        node_id, partition, upstream_text, semantic_cache.get_threshold(data))
+                    extra_metrics = {"cache_hit": cached is not None, "similarity": round(similarity, 4)}
+
+                if cached is not None:
+                    node_results[node_id] = dict(cached)
+                else:
+                    try:
+                        # Concurrent classifications with the same model and labels share one request
+                        node_results[node_id], tokens_in, tokens_out = await classifier_batcher.classify(
+                            lambda sys_prompt, text: _chat_once(client, model, sys_prompt, text),
+                            openrouter_key, model, labels, upstream_text,
+                        )
+                        cost = (tokens_in * 0.005 + tokens_out * 0.015) / 1000
+                        if use_cache and isinstance(node_results[node_id], dict):
+                            semantic_cache.store(partition, upstream_text, node_results[node_id])
+                    except Exception as exc:
+                        node_results[node_id] = {"label": labels[0] if labels else "unknown", "score": 0.0, "error": str(exc)}
 
             # ================================================================
             #  DATA NODES
             # ================================================================
             elif node_type == "text":
-                node_results[node_id] = data.get("text", "")
+                template = compiled[node_id].template
+                values = {}
+                for var, source_id in compiled[node_id].bindings.items():
+                    v = node_results.get(source_id, "")
+                    if isinstance(v, ColumnarTable):
+                        values[var] = v.to_json()
+                    else:
+                        values[var] = json.dumps(v) if isinstance(v, (dict, list)) else ("" if v is None else str(v))
+                node_results[node_id] = template.render(values)
 
             elif node_type == "transform":
                 fn = data.get("transformFn", "")
@@ -349,17 +500,11 @@ async def execute_dag_stream(
             elif node_type == "jsonParser":
                 upstream_text = _get_upstream_value(G, node_id, node_results)
                 mode = data.get("parseMode", "Extract Key")
-                path = data.get("jsonPath", "")
+                path = compiled[node_id].json_path
                 try:
                     obj = json.loads(upstream_text)
                     if mode == "Extract Key" and path:
-                        parts = re.split(r'[.\[\]]', path)
-                        val = obj
-                        for part in parts:
-                            if not part:
-                                continue
-                            val = val[int(part)] if isinstance(val, list) else val[part]
-                        node_results[node_id] = val
+                        node_results[node_id] = resolve_json_path(obj, path)
                     elif mode == "Stringify":
                         node_results[node_id] = json.dumps(obj, indent=2)
                     elif mode == "Array Length":
@@ -377,23 +522,39 @@ async def execute_dag_stream(
                 delim = delimiter_map.get(data.get("csvDelimiter", "Comma"), ",")
                 has_header = data.get("hasHeader", "Yes") == "Yes"
                 try:
-                    if has_header:
+                    # Columnar NumPy table when the data is rectangular; row dicts otherwise
+                    table = parse_csv(upstream_text, delim, has_header)
+                    if table is not None:
+                        node_results[node_id] = table
+                    elif has_header:
                         reader = csv.DictReader(io.StringIO(upstream_text), delimiter=delim)
                         rows = [dict(r) for r in reader]
+                        node_results[node_id] = {"rows": rows, "count": len(rows)}
                     else:
                         reader = csv.reader(io.StringIO(upstream_text), delimiter=delim)
                         rows = list(reader)
-                    node_results[node_id] = {"rows": rows, "count": len(rows)}
+                        node_results[node_id] = {"rows": rows, "count": len(rows)}
                 except Exception as exc:
                     node_results[node_id] = f"[CSV parse error: {exc}]"
 
             elif node_type == "calculator":
-                expr = data.get("expression", "a + b")
                 preds = list(G.predecessors(node_id))
                 a = node_results.get(preds[0], 0) if preds else 0
                 b = node_results.get(preds[1], 0) if len(preds) > 1 else 0
                 try:
-                    result = simple_eval(expr, names={"a": float(str(a)), "b": float(str(b))})
+                    expression = compiled[node_id].expression
+                    if isinstance(a, ColumnarTable):
+                        # Vectorised over whole columns; column headers are expression variables
+                        names = a.expression_names()
+                        if not isinstance(b, ColumnarTable):
+                            names["b"] = float(str(b))
+                        result = expression.evaluate_vectorized(names)
+                        if getattr(result, "shape", ()) == (len(a),):
+                            result = a.with_column(data.get("resultColumn") or "result", result)
+                        else:
+                            result = to_python(result)
+                    else:
+                        result = expression.evaluate({"a": float(str(a)), "b": float(str(b))})
                     node_results[node_id] = result
                 except Exception as exc:
                     node_results[node_id] = f"[calc error: {exc}]"
@@ -402,13 +563,24 @@ async def execute_dag_stream(
             #  LOGIC NODES
             # ================================================================
             elif node_type == "filter":
-                condition = data.get("condition", "True")
-                upstream_val = _get_upstream_value(G, node_id, node_results)
-                try:
-                    passed = simple_eval(condition, names={"value": upstream_val, "input": upstream_val})
-                    node_results[node_id] = upstream_val if passed else None
-                except Exception:
-                    node_results[node_id] = upstream_val
+                upstream_raw = _get_upstream_raw(G, node_id, node_results)
+                if isinstance(upstream_raw, ColumnarTable):
+                    # Row filter: the condition is evaluated once over whole columns into a mask
+                    try:
+                        mask = compiled[node_id].expression.evaluate_vectorized(upstream_raw.expression_names())
+                        if getattr(mask, "shape", ()) == (len(upstream_raw),):
+                            node_results[node_id] = upstream_raw.take(mask.astype(bool))
+                        else:
+                            node_results[node_id] = upstream_raw if bool(mask) else None
+                    except Exception:
+                        node_results[node_id] = upstream_raw
+                else:
+                    upstream_val = _get_upstream_value(G, node_id, node_results)
+                    try:
+                        passed = compiled[node_id].expression.evaluate({"value": upstream_val, "input": upstream_val})
+                        node_results[node_id] = upstream_val if passed else None
+                    except Exception:
+                        node_results[node_id] = upstream_val
 
             elif node_type == "split":
                 raw_delim = data.get("delimiter", "\\n")
@@ -418,10 +590,9 @@ async def execute_dag_stream(
                 node_results[node_id] = upstream_text.split(delimiter, max_splits) if max_splits > 0 else upstream_text.split(delimiter)
 
             elif node_type == "conditional":
-                condition = data.get("condition", "True")
                 upstream_val = _get_upstream_value(G, node_id, node_results)
                 try:
-                    result = bool(simple_eval(condition, names={"input": upstream_val, "value": upstream_val}))
+                    result = bool(compiled[node_id].expression.evaluate({"input": upstream_val, "value": upstream_val}))
                 except Exception:
                     result = False
                 node_results[node_id] = {"branch": "true" if result else "false", "value": upstream_val}
@@ -473,7 +644,7 @@ async def execute_dag_stream(
             elif node_type == "vectorDb":
                 pinecone_key = env.get("PINECONE_API_KEY", "")
                 if not pinecone_key:
-                    yield _sse({"event": "error", "message": "Vector DB Error: PINECONE_API_KEY missing in settings."})
+                    yield {"event": "error", "message": "Vector DB Error: PINECONE_API_KEY missing in settings."}
                     return
                 action = data.get("action", "Query")
                 index = data.get("indexName", "default")
@@ -530,7 +701,7 @@ async def execute_dag_stream(
             elif node_type == "slackWebhook":
                 webhook_url = env.get("SLACK_WEBHOOK_URL", "") or data.get("webhookUrl", "")
                 if not webhook_url:
-                    yield _sse({"event": "error", "message": "Slack Error: SLACK_WEBHOOK_URL missing in settings."})
+                    yield {"event": "error", "message": "Slack Error: SLACK_WEBHOOK_URL missing in settings."}
                     return
                 upstream_val = _get_upstream_value(G, node_id, node_results)
                 template = data.get("messageTemplate", "")
@@ -545,7 +716,7 @@ async def execute_dag_stream(
             elif node_type == "email":
                 sendgrid_key = env.get("SENDGRID_API_KEY", "")
                 if not sendgrid_key:
-                    yield _sse({"event": "error", "message": "Email Error: SENDGRID_API_KEY missing in settings."})
+                    yield {"event": "error", "message": "Email Error: SENDGRID_API_KEY missing in settings."}
                     return
                 to = data.get("emailTo", "")
                 subject = data.get("emailSubject", "Pipeline Notification")
@@ -574,7 +745,7 @@ async def execute_dag_stream(
                     gh_token = gh_token[6:].strip()
                 
                 if not gh_token:
-                    yield _sse({"event": "error", "message": "GitHub Error: GITHUB_TOKEN missing in settings."})
+                    yield {"event": "error", "message": "GitHub Error: GITHUB_TOKEN missing in settings."}
                     return
                 upstream_val = _get_upstream_value(G, node_id, node_results)
                 
@@ -613,26 +784,25 @@ async def execute_dag_stream(
                             username = user_info.json().get("login")
                             repo = f"{username}/{repo}"
                         else:
-                            yield _sse({"event": "error", "message": f"GitHub API Error: Provided '{repo}' but could not auto-detect owner username using token. Status: {user_info.status_code}, Response: {user_info.text}"})
+                            yield {"event": "error", "message": f"GitHub API Error: Provided '{repo}' but could not auto-detect owner username using token. Status: {user_info.status_code}, Response: {user_info.text}"}
                             return
                             
                     if not repo or "/" not in repo:
-                        yield _sse({"event": "error", "message": f"GitHub Error: Repository must be in 'owner/repo' format. Got: '{repo}'"})
+                        yield {"event": "error", "message": f"GitHub Error: Repository must be in 'owner/repo' format. Got: '{repo}'"}
                         return
                     
                     try:
                         if action == "Create Issue":
                             try:
-                                import re
                                 raw_text = upstream_val.strip()
                                 
-                                # Use regex to find a JSON block, either inside ```json ... ``` or just the first {...} block
-                                json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', raw_text, re.DOTALL)
+                                # Find a JSON block, either inside ```json ... ``` or just the first {...} block
+                                json_match = _GH_FENCED_JSON_RE.search(raw_text)
                                 if json_match:
                                     raw_json = json_match.group(1)
                                 else:
                                     # Fallback: look for the first string that looks like a JSON object
-                                    json_match = re.search(r'\{.*\}', raw_text, re.DOTALL)
+                                    json_match = _GH_JSON_OBJECT_RE.search(raw_text)
                                     raw_json = json_match.group(0) if json_match else raw_text
                                     
                                 payload = json.loads(raw_json.strip())
@@ -646,41 +816,39 @@ async def execute_dag_stream(
                                 headers=headers, json={"title": title, "body": body}
                             )
                             if r.status_code >= 400:
-                                yield _sse({"event": "error", "message": f"GitHub API Error ({r.status_code}): {r.text}"})
+                                yield {"event": "error", "message": f"GitHub API Error ({r.status_code}): {r.text}"}
                                 return
                             node_results[node_id] = r.json().get("html_url", r.text)
                         elif action == "Get Repo Info":
                             r = await client.get(f"https://api.github.com/repos/{repo}", headers=headers)
                             if r.status_code >= 400:
-                                yield _sse({"event": "error", "message": f"GitHub API Error ({r.status_code}): {r.text}"})
+                                yield {"event": "error", "message": f"GitHub API Error ({r.status_code}): {r.text}"}
                                 return
                             node_results[node_id] = r.json()
                         elif action == "Read File":
                             file_path = upstream_val.strip()
                             if not file_path:
-                                yield _sse({"event": "error", "message": "GitHub Error: File path required in input."})
+                                yield {"event": "error", "message": "GitHub Error: File path required in input."}
                                 return
                             else:
                                 headers["Accept"] = "application/vnd.github.v3.raw"
                                 r = await client.get(f"https://api.github.com/repos/{repo}/contents/{file_path}", headers=headers)
                                 if r.status_code >= 400:
-                                    yield _sse({"event": "error", "message": f"GitHub API Error ({r.status_code}): Unable to read file '{file_path}' from {repo}. Check if the file exists and the branch is correct."})
+                                    yield {"event": "error", "message": f"GitHub API Error ({r.status_code}): Unable to read file '{file_path}' from {repo}. Check if the file exists and the branch is correct."}
                                     return
                                 node_results[node_id] = r.text
                         elif action == "List Commits":
                             r = await client.get(f"https://api.github.com/repos/{repo}/commits?per_page=5", headers=headers)
                             if r.status_code >= 400:
-                                yield _sse({"event": "error", "message": f"GitHub API Error ({r.status_code}): {r.text}"})
+                                yield {"event": "error", "message": f"GitHub API Error ({r.status_code}): {r.text}"}
                                 return
                             node_results[node_id] = [{"sha": c["sha"][:7], "message": c["commit"]["message"][:80]} for c in r.json()[:5]]
                         elif action == "Read Entire Repository":
                             r = await client.get(f"https://api.github.com/repos/{repo}/zipball", headers=headers, follow_redirects=True)
                             if r.status_code >= 400:
-                                yield _sse({"event": "error", "message": f"GitHub API Error ({r.status_code}): Unable to download repository zip for '{repo}'. Response: {r.text[:200]}"})
+                                yield {"event": "error", "message": f"GitHub API Error ({r.status_code}): Unable to download repository zip for '{repo}'. Response: {r.text[:200]}"}
                                 return
                             
-                            import zipfile
-                            import io
                             try:
                                 with zipfile.ZipFile(io.BytesIO(r.content)) as z:
                                     repo_text = []
@@ -716,19 +884,19 @@ async def execute_dag_stream(
                                         combined = combined[:100000] + "\n\n...[TRUNCATED_DUE_TO_SIZE 100KB LIMIT]..."
                                     node_results[node_id] = combined
                             except Exception as e:
-                                yield _sse({"event": "error", "message": f"Failed to parse repository zip: {e}"})
+                                yield {"event": "error", "message": f"Failed to parse repository zip: {e}"}
                                 return
                         else:
-                            yield _sse({"event": "error", "message": f"GitHub Action '{action}' not implemented."})
+                            yield {"event": "error", "message": f"GitHub Action '{action}' not implemented."}
                             return
                     except Exception as exc:
-                        yield _sse({"event": "error", "message": f"Unexpected GitHub Error: {exc}"})
+                        yield {"event": "error", "message": f"Unexpected GitHub Error: {exc}"}
                         return
 
             elif node_type == "googleSheets":
                 sheets_key = env.get("GOOGLE_SHEETS_API_KEY", "")
                 if not sheets_key:
-                    yield _sse({"event": "error", "message": "Google Sheets Error: API Key missing in settings."})
+                    yield {"event": "error", "message": "Google Sheets Error: API Key missing in settings."}
                     return
                 action = data.get("sheetsAction", "Append Row")
                 spreadsheet_id = data.get("spreadsheetId", "")
@@ -758,7 +926,7 @@ async def execute_dag_stream(
             elif node_type == "notion":
                 notion_token = env.get("NOTION_TOKEN", "")
                 if not notion_token:
-                    yield _sse({"event": "error", "message": "Notion Error: NOTION_TOKEN missing in settings."})
+                    yield {"event": "error", "message": "Notion Error: NOTION_TOKEN missing in settings."}
                     return
                 action = data.get("notionAction", "Create Page")
                 db_id = data.get("notionDbId", "")
@@ -797,19 +965,27 @@ async def execute_dag_stream(
                 node_results[node_id] = f"[{node_type}] {upstream_val}"
 
         except Exception as outer_exc:
-            yield _sse({"event": "error", "message": f"Unexpected error in {node_type}: {outer_exc}"})
+            yield {"event": "error", "message": f"Unexpected error in {node_type}: {outer_exc}"}
             return
 
         # Serialize result
         result_val = node_results.get(node_id)
-        result_str = json.dumps(result_val) if isinstance(result_val, (dict, list)) else str(result_val)[:2000]
-
-        metrics = {"cost": cost, "tokens_in": tokens_in, "tokens_out": tokens_out}
-        yield _sse({"event": "node_complete", "node_id": node_id, "metrics": metrics, "result": result_str})
+        if isinstance(result_val, ColumnarTable):
+            result_str = result_val.preview_json()
+        else:
+            result_str = json.dumps(result_val) if isinstance(result_val, (dict, list)) else str(result_val)[:2000]
+
+        metrics = {
+            "cost": cost, "tokens_in": tokens_in, "tokens_out": tokens_out,
+            "duration_ms": round((time.perf_counter() - node_started) * 1000, 2),
+        }
+        if extra_metrics is not None:
+            metrics.update(extra_metrics)
+        yield {"event": "node_complete", "node_id": node_id, "metrics": metrics, "result": result_str}
         await asyncio.sleep(0.45)  # Let the edge flow animation play before next node_start
 
     # Cleanup
     if pipeline_id in PAUSED_EXECUTIONS:
         del PAUSED_EXECUTIONS[pipeline_id]
 
-    yield _sse({"event": "pipeline_complete"})
+    yield {"event": "pipeline_complete"}
@@ -0,0 +1,467 @@
+# services/graph_core.py — Compact array-backed directed graph used on request hot paths
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from domain.pipeline_ir import Edge, Node
+
+
+class NodeRecord:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, node_id: str, node_type: str, data: Dict[str, Any]):
+        self.id = node_id
+        self.type = node_type
+        self.data = data
+
+
+class CompactGraph:
+    """
+    Immutable directed graph with node ids interned to 0..n-1 and adjacency in
+    CSR form (offsets + flat neighbour arrays) for both directions.
+
+    Semantics match the nx.DiGraph the services used to build: duplicate node
+    ids collapse (first position, last data wins), parallel edges collapse,
+    edges to unknown nodes are dropped, self-loops are kept.
+    """
+    __slots__ = (
+        "ids", "index", "records", "num_edges", "edge_src", "edge_dst",
+        "out_offsets", "out_targets", "in_offsets", "in_sources",
+    )
+
+    def __init__(self, ids: List[str], records: List[NodeRecord], src: array, dst: array,
+                 index: Optional[Dict[str, int]] = None):
+        n = len(ids)
+        self.ids = ids
+        self.index = index if index is not None else {node_id: i for i, node_id in enumerate(ids)}
+        self.records = records
+        self.num_edges = len(src)
+        self.edge_src = src
+        self.edge_dst = dst
+        self.out_offsets, self.out_targets = _csr(n, src, dst)
+        self.in_offsets, self.in_sources = _csr(n, dst, src)
+
+    @classmethod
+    def from_pipeline(cls, nodes: Iterable[Node], edges: Iterable[Edge]) -> "CompactGraph":
+        ids: List[str] = []
+        records: List[NodeRecord] = []
+        index: Dict[str, int] = {}
+        for node in nodes:
+            i = index.get(node.id)
+            if i is None:
+                index[node.id] = len(ids)
+                ids.append(node.id)
+                records.append(NodeRecord(node.id, node.type, node.data))
+            else:
+                records[i] = NodeRecord(node.id, node.type, node.data)
+
+        src, dst = array("i"), array("i")
+        lookup = index.get
+        for edge in edges:
+            s = lookup(edge.source)
+            t = lookup(edge.target)
+            if s is not None and t is not None:
+                src.append(s)
+                dst.append(t)
+        src, dst = _dedupe_edges(len(ids), src, dst)
+        return cls(ids, records, src, dst, index)
+
+    # ── Basic queries ─────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.index
+
+    def number_of_nodes(self) -> int:
+        return len(self.ids)
+
+    def out_degree(self, i: int) -> int:
+        return self.out_offsets[i + 1] - self.out_offsets[i]
+
+    def in_degree(self, i: int) -> int:
+        return self.in_offsets[i + 1] - self.in_offsets[i]
+
+    def successor_indices(self, i: int) -> array:
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def predecessor_indices(self, i: int) -> array:
+        return self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def predecessors(self, node_id: str) -> List[str]:
+        """Upstream node ids in edge order (drop-in for nx.DiGraph.predecessors)."""
+        ids = self.ids
+        return [ids[j] for j in self.predecessor_indices(self.index[node_id])]
+
+    def successors(self, node_id: str) -> List[str]:
+        ids = self.ids
+        return [ids[j] for j in self.successor_indices(self.index[node_id])]
+
+    # ── Algorithms ────────────────────────────────────────────────────────────
+
+    def topological_order(self) -> Optional[List[int]]:
+        """Kahn's algorithm (FIFO, input order tie-break); None if the graph has a cycle."""
+        n = len(self.ids)
+        in_offsets = self.in_offsets
+        out_offsets, out_targets = self.out_offsets.tolist(), self.out_targets.tolist()
+        indeg = [in_offsets[i + 1] - in_offsets[i] for i in range(n)]
+        queue = deque(i for i in range(n) if indeg[i] == 0)
+        order: List[int] = []
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for v in out_targets[out_offsets[u]:out_offsets[u + 1]]:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    queue.append(v)
+        return order if len(order) == n else None
+
+    # ── Reference implementation ──────────────────────────────────────────────
+
+    def to_networkx(self):
+        """Equivalent nx.DiGraph, for cross-checking results. Requires networkx."""
+        import networkx as nx
+        G = nx.DiGraph()
+        for r in self.records:
+            G.add_node(r.id, type=r.type, data=r.data)
+        for u in range(len(self.ids)):
+            for v in self.successor_indices(u):
+                G.add_edge(self.ids[u], self.ids[v])
+        return G
+
+
+# ─── Fused analysis ───────────────────────────────────────────────────────────
+
+class GraphAnalysis:
+    """
+    Everything /parse, /validate and /auto-layout need from the topology,
+    computed by analyze() in one pass. Index-based; use graph.ids to map back.
+    """
+    __slots__ = (
+        "graph", "is_dag", "order", "depth", "longest_path",
+        "in_degree", "out_degree", "sources", "sinks", "isolated", "components",
+    )
+
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+        self.is_dag = True
+        self.order: List[int] = []          # topological order (complete only if is_dag)
+        self.depth: List[int] = []          # longest distance from any source, in hops
+        self.longest_path = -1
+        self.in_degree: List[int] = []
+        self.out_degree: List[int] = []
+        self.sources: List[int] = []        # in == 0, out > 0
+        self.sinks: List[int] = []          # out == 0, in > 0
+        self.isolated: List[int] = []       # no edges at all
+        self.components = 0
+
+
+def analyze(graph: CompactGraph) -> GraphAnalysis:
+    """
+    Single Kahn-style pass: degree scan seeds the queue, each popped node relaxes
+    depths and unions its out-edges; edges stranded in cycles are unioned after.
+    Every node and edge is visited once.
+    """
+    n = len(graph.ids)
+    a = GraphAnalysis(graph)
+    out_offsets, out_targets = graph.out_offsets.tolist(), graph.out_targets.tolist()
+    in_offsets = graph.in_offsets.tolist()
+
+    in_deg = [in_offsets[i + 1] - in_offsets[i] for i in range(n)]
+    out_deg = [out_offsets[i + 1] - out_offsets[i] for i in range(n)]
+    a.in_degree, a.out_degree = in_deg, list(out_deg)
+
+    remaining = list(in_deg)
+    queue = deque()
+    for i in range(n):
+        if in_deg[i] == 0:
+            queue.append(i)
+            if out_deg[i]:
+                a.sources.append(i)
+            else:
+                a.isolated.append(i)
+        elif out_deg[i] == 0:
+            a.sinks.append(i)
+
+    parent = list(range(n))
+    components = n
+    depth = [0] * n
+    order = a.order
+    visited = [False] * n
+    while queue:
+        u = queue.popleft()
+        order.append(u)
+        visited[u] = True
+        du = depth[u] + 1
+        for v in out_targets[out_offsets[u]:out_offsets[u + 1]]:
+            if du > depth[v]:
+                depth[v] = du
+            remaining[v] -= 1
+            if remaining[v] == 0:
+                queue.append(v)
+            ru, rv = _find(parent, u), _find(parent, v)
+            if ru != rv:
+                parent[rv] = ru
+                components -= 1
+
+    if len(order) < n:
+        a.is_dag = False
+        for u in range(n):
+            if visited[u]:
+                continue
+            for v in out_targets[out_offsets[u]:out_offsets[u + 1]]:
+                ru, rv = _find(parent, u), _find(parent, v)
+                if ru != rv:
+                    parent[rv] = ru
+                    components -= 1
+    else:
+        a.longest_path = max(depth) if n else -1
+
+    a.depth = depth
+    a.components = components
+    return a
+
+
+# ─── Incremental structures (graph sessions) ──────────────────────────────────
+
+class IncrementalTopoOrder:
+    """
+    Pearce–Kelly dynamic topological order over integer slots.
+
+    Each live slot holds a unique rank; every edge goes from a lower to a higher
+    rank. Inserting u→v only reorders the affected window ord[v]..ord[u], so a
+    single edit touches a handful of nodes rather than re-sorting the graph.
+    """
+    __slots__ = ("rank", "succ", "pred", "_next")
+
+    def __init__(self):
+        self.rank: List[int] = []           # -1 for a dead slot
+        self.succ: List[set] = []
+        self.pred: List[set] = []
+        self._next = 0
+
+    def add_node(self, slot: int) -> None:
+        while len(self.rank) <= slot:
+            self.rank.append(-1)
+            self.succ.append(set())
+            self.pred.append(set())
+        self.rank[slot] = self._next
+        self._next += 1
+
+    def seed(self, slots: List[int]) -> None:
+        """Re-rank edge-less slots in the given order (e.g. a Kahn order before a bulk load)."""
+        for slot in slots:
+            self.rank[slot] = self._next
+            self._next += 1
+
+    def remove_node(self, slot: int) -> None:
+        """The slot must already have no edges."""
+        self.rank[slot] = -1
+
+    def try_add_edge(self, u: int, v: int) -> Optional[List[int]]:
+        """Insert u→v; None (and no change) if it would close a cycle, else the slots whose rank changed."""
+        rank, succ, pred = self.rank, self.succ, self.pred
+        if u == v:
+            return None
+        lb, ub = rank[v], rank[u]
+        if lb > ub:
+            succ[u].add(v)
+            pred[v].add(u)
+            return []
+
+        # Forward search from v inside the window; reaching u means a cycle
+        forward, stack, seen = [], [v], {v}
+        while stack:
+            x = stack.pop()
+            forward.append(x)
+            for w in succ[x]:
+                rw = rank[w]
+                if rw == ub:
+                    return None
+                if rw < ub and w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+
+        backward, stack, seen = [], [u], {u}
+        while stack:
+            x = stack.pop()
+            backward.append(x)
+            for w in pred[x]:
+                if rank[w] > lb and w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+
+        # Reuse the affected ranks: everything that reaches u goes before everything v reaches
+        backward.sort(key=rank.__getitem__)
+        forward.sort(key=rank.__getitem__)
+        moved = backward + forward
+        for slot, r in zip(moved, sorted(rank[x] for x in moved)):
+            rank[slot] = r
+        succ[u].add(v)
+        pred[v].add(u)
+        return moved
+
+    def remove_edge(self, u: int, v: int) -> None:
+        self.succ[u].discard(v)
+        self.pred[v].discard(u)
+
+    def order(self) -> List[int]:
+        rank = self.rank
+        return sorted((i for i in range(len(rank)) if rank[i] >= 0), key=rank.__getitem__)
+
+
+class RollbackUnionFind:
+    """Union by size without path compression, so unions can be undone in LIFO order."""
+    __slots__ = ("parent", "size", "components", "_history", "_free")
+
+    def __init__(self):
+        self.parent: List[int] = []
+        self.size: List[int] = []
+        self.components = 0
+        self._history: List[int] = []       # absorbed root per successful union
+        self._free: List[int] = []
+
+    def add(self) -> int:
+        """New singleton; reuses slots released by remove()."""
+        if self._free:
+            x = self._free.pop()
+        else:
+            x = len(self.parent)
+            self.parent.append(x)
+            self.size.append(1)
+        self.components += 1
+        return x
+
+    def remove(self, x: int) -> None:
+        """Release a slot that is currently a singleton."""
+        self.components -= 1
+        self._free.append(x)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self._history.append(rb)
+        self.components -= 1
+        return True
+
+    def mark(self) -> int:
+        return len(self._history)
+
+    def rollback(self, mark: int) -> None:
+        history, parent, size = self._history, self.parent, self.size
+        while len(history) > mark:
+            rb = history.pop()
+            ra = parent[rb]
+            parent[rb] = rb
+            size[ra] -= size[rb]
+            self.components += 1
+
+
+class DynamicConnectivity:
+    """
+    Weakly connected components under edge insertions and deletions.
+
+    Undirected links are unioned in insertion order and logged with the
+    union-find mark taken just before them. Removing a link that did not merge
+    anything is free; removing one that did rolls back to its mark and replays
+    only the links added after it.
+    """
+    __slots__ = ("uf", "_links", "_marks", "_merged")
+
+    def __init__(self):
+        self.uf = RollbackUnionFind()
+        self._links: List[tuple] = []
+        self._marks: List[int] = []
+        self._merged: List[bool] = []
+
+    @property
+    def components(self) -> int:
+        return self.uf.components
+
+    def add_link(self, a: int, b: int) -> None:
+        self._links.append((a, b))
+        self._marks.append(self.uf.mark())
+        self._merged.append(self.uf.union(a, b))
+
+    def remove_link(self, a: int, b: int) -> None:
+        k = self._links.index((a, b))
+        mark, merged = self._marks[k], self._merged[k]
+        del self._links[k], self._marks[k], self._merged[k]
+        if not merged:
+            return
+        uf = self.uf
+        uf.rollback(mark)
+        for i in range(k, len(self._links)):
+            self._marks[i] = uf.mark()
+            self._merged[i] = uf.union(*self._links[i])
+
+
+def _dedupe_edges(n: int, src: array, dst: array):
+    """Drop parallel edges, keeping the first occurrence of each (source, target) pair."""
+    if not src:
+        return src, dst
+    if np is not None:
+        keys = np.frombuffer(src, dtype=np.int32).astype(np.int64) * n + np.frombuffer(dst, dtype=np.int32)
+        _, first = np.unique(keys, return_index=True)
+        if len(first) == len(src):
+            return src, dst
+        first.sort()
+        return (array("i", np.frombuffer(src, dtype=np.int32)[first].tobytes()),
+                array("i", np.frombuffer(dst, dtype=np.int32)[first].tobytes()))
+
+    seen = set()
+    out_src, out_dst = array("i"), array("i")
+    for s, t in zip(src, dst):
+        key = s * n + t
+        if key not in seen:
+            seen.add(key)
+            out_src.append(s)
+            out_dst.append(t)
+    return out_src, out_dst
+
+
+def _csr(n: int, keys: array, values: array):
+    """Counting-sort (keys, values) pairs into CSR offsets + values, stable in input order."""
+    if np is not None:
+        k = np.frombuffer(keys, dtype=np.int32) if len(keys) else np.zeros(0, dtype=np.int32)
+        v = np.frombuffer(values, dtype=np.int32) if len(values) else np.zeros(0, dtype=np.int32)
+        offsets_np = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(k, minlength=n), out=offsets_np[1:])
+        flat_np = v[np.argsort(k, kind="stable")].astype(np.int32)
+        return array("i", offsets_np.tobytes()), array("i", flat_np.tobytes())
+
+    offsets = array("i", bytes(4 * (n + 1)))
+    for k in keys:
+        offsets[k + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    cursor = array("i", offsets[:n])
+    flat = array("i", bytes(4 * len(keys)))
+    for k, v in zip(keys, values):
+        flat[cursor[k]] = v
+        cursor[k] += 1
+    return offsets, flat
+
+
+def _find(parent: List[int], x: int) -> int:
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
@@ -1,7 +1,9 @@
 # services/graph_service.py — Graph analysis, validation, and layout services
-import networkx as nx
-from typing import List, Tuple, Dict, Any
-from domain.schemas import BaseNodeSchema, EdgeSchema
+import re
+from typing import List, Tuple, Dict, Any, Callable, Optional
+from domain.pipeline_ir import Edge, Node
+from services.graph_core import CompactGraph, GraphAnalysis, analyze
+from services.layout import DEFAULT_TIME_BUDGET_MS, incremental_layout, layered_layout
 
 # ─── Node type registry (mirrors frontend NodeRegistry) ───────────────────────
 
@@ -32,6 +34,8 @@ NODE_TYPE_META = {
         "description": "Large Language Model inference node.",
         "fields": [
             {"name": "model", "type": "modelSelect", "label": "Model", "required": True, "default": ""},
+            {"name": "semanticCache", "type": "select", "label": "Semantic Cache", "options": ["Off", "On"], "default": "Off"},
+            {"name": "cacheThreshold", "type": "number", "label": "Cache Similarity", "default": 0.95},
         ],
         "max_inputs": 2, "max_outputs": 1,
     },
@@ -63,6 +67,8 @@ NODE_TYPE_META = {
         "fields": [
             {"name": "classifierModel", "type": "modelSelect", "label": "Model", "default": ""},
             {"name": "labels", "type": "text", "label": "Labels (comma-separated)", "required": True, "default": "positive, negative, neutral"},
+            {"name": "semanticCache", "type": "select", "label": "Semantic Cache", "options": ["Off", "On"], "default": "Off"},
+            {"name": "cacheThreshold", "type": "number", "label": "Cache Similarity", "default": 0.95},
         ],
         "max_inputs": 1, "max_outputs": 2,
     },
@@ -75,6 +81,10 @@ NODE_TYPE_META = {
              "options": ["Concise", "Bullet Points", "Detailed", "ELI5"], "default": "Concise"},
             {"name": "summaryLength", "type": "select", "label": "Target Length",
              "options": ["1 Sentence", "Short", "Medium", "Long"], "default": "Short"},
+            {"name": "chunking", "type": "select", "label": "Long Input Chunking",
+             "options": ["Auto", "Off", "Always"], "default": "Auto"},
+            {"name": "semanticCache", "type": "select", "label": "Semantic Cache", "options": ["Off", "On"], "default": "Off"},
+            {"name": "cacheThreshold", "type": "number", "label": "Cache Similarity", "default": 0.95},
         ],
         "max_inputs": 1, "max_outputs": 1,
     },
@@ -266,28 +276,48 @@ NODE_TYPE_META = {
 }
 
 
-# ─── Build NetworkX graph ─────────────────────────────────────────────────────
+# ─── Build graph ──────────────────────────────────────────────────────────────
+
+def _build_graph(nodes: List[Node], edges: List[Edge]) -> CompactGraph:
+    return CompactGraph.from_pipeline(nodes, edges)
 
-def _build_graph(nodes: List[BaseNodeSchema], edges: List[EdgeSchema]) -> nx.DiGraph:
-    G = nx.DiGraph()
-    for node in nodes:
-        G.add_node(node.id, type=node.type, data=node.data)
-    for edge in edges:
-        if edge.source in G and edge.target in G:
-            G.add_edge(edge.source, edge.target,
-                       sourceHandle=edge.sourceHandle,
-                       targetHandle=edge.targetHandle)
-    return G
+
+def analyze_pipeline(nodes: List[Node], edges: List[Edge]) -> GraphAnalysis:
+    """Build the graph and run the fused single-pass analysis (shareable across services)."""
+    return analyze(_build_graph(nodes, edges))
 
 
 # ─── Main analysis function ───────────────────────────────────────────────────
 
+def pipeline_warnings(
+    has_input: bool,
+    has_output: bool,
+    is_dag: bool,
+    isolated: List[str],
+    components: int,
+) -> List[str]:
+    warnings: List[str] = []
+    if not has_input:
+        warnings.append("No Input node found — pipeline has no entry point.")
+    if not has_output:
+        warnings.append("No Output node found — pipeline has no exit point.")
+    if not is_dag:
+        warnings.append("Pipeline contains cycles — it is NOT a valid DAG.")
+    if isolated:
+        warnings.append(f"{len(isolated)} node(s) have no connections: {', '.join(isolated)}")
+    if components > 1:
+        warnings.append(f"Pipeline has {components} disconnected sub-graphs.")
+    return warnings
+
+
 def calculate_pipeline_metrics(
-    nodes: List[BaseNodeSchema],
-    edges: List[EdgeSchema],
+    nodes: List[Node],
+    edges: List[Edge],
+    analysis: Optional[GraphAnalysis] = None,
 ) -> dict:
-    G = _build_graph(nodes, edges)
-    is_dag = nx.is_directed_acyclic_graph(G)
+    a = analysis or analyze_pipeline(nodes, edges)
+    ids = a.graph.ids
+    is_dag = a.is_dag
 
     # Type counts
     type_counts: Dict[str, int] = {}
@@ -295,41 +325,23 @@ def calculate_pipeline_metrics(
         type_counts[n.type] = type_counts.get(n.type, 0) + 1
 
     # Source / sink / isolated
-    source_ids = [n for n in G.nodes if G.in_degree(n) == 0 and G.out_degree(n) > 0]
-    sink_ids   = [n for n in G.nodes if G.out_degree(n) == 0 and G.in_degree(n) > 0]
-    isolated   = [n for n in G.nodes if G.degree(n) == 0]
+    source_ids = [ids[i] for i in a.sources]
+    sink_ids   = [ids[i] for i in a.sinks]
+    isolated   = [ids[i] for i in a.isolated]
 
     # Connected components (undirected view)
-    components = nx.number_weakly_connected_components(G) if G.number_of_nodes() > 0 else 0
+    components = a.components
 
     # Longest path (only meaningful for DAGs) and Execution Plan
-    longest = -1
-    execution_plan = []
-    if is_dag and G.number_of_nodes() > 0:
-        try:
-            longest = len(nx.dag_longest_path(G)) - 1
-            execution_plan = list(nx.topological_sort(G))
-        except Exception:
-            longest = -1
-            execution_plan = []
+    longest = a.longest_path
+    execution_plan = [ids[i] for i in a.order] if is_dag else []
 
     # Node type booleans
     node_types = {n.type for n in nodes}
     has_input  = "customInput" in node_types
     has_output = "customOutput" in node_types
 
-    # Warnings
-    warnings: List[str] = []
-    if not has_input:
-        warnings.append("No Input node found — pipeline has no entry point.")
-    if not has_output:
-        warnings.append("No Output node found — pipeline has no exit point.")
-    if not is_dag:
-        warnings.append("Pipeline contains cycles — it is NOT a valid DAG.")
-    if isolated:
-        warnings.append(f"{len(isolated)} node(s) have no connections: {', '.join(isolated)}")
-    if components > 1:
-        warnings.append(f"Pipeline has {components} disconnected sub-graphs.")
+    warnings = pipeline_warnings(has_input, has_output, is_dag, isolated, components)
 
     return {
         "num_nodes": len(nodes),
@@ -350,76 +362,133 @@ def calculate_pipeline_metrics(
 
 # ─── Validation function ──────────────────────────────────────────────────────
 
-def validate_pipeline(
-    nodes: List[BaseNodeSchema],
-    edges: List[EdgeSchema],
-) -> dict:
-    errors = []
-    warnings_list = []
+_HANDLE_NAME_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
-    G = _build_graph(nodes, edges)
+# (node_id, data, in_deg, out_deg, multi_node) → (errors, warnings)
+NodeRule = Callable[[str, Dict[str, Any], int, int, bool], Tuple[List[dict], List[str]]]
 
-    for node in nodes:
-        meta = NODE_TYPE_META.get(node.type)
-        if not meta:
-            errors.append({
-                "node_id": node.id,
-                "node_type": node.type,
-                "field": "type",
-                "message": f"Unknown node type '{node.type}'.",
-            })
-            continue
+
+def _compile_rule(node_type: str, meta: dict) -> NodeRule:
+    """Fold a NODE_TYPE_META entry into one check function with its constants pre-bound."""
+    required = tuple(
+        (f["name"], f"Required field '{f['label']}' is empty.")
+        for f in meta.get("fields", []) if f.get("required")
+    )
+    max_in = meta.get("max_inputs", -1)
+    max_out = meta.get("max_outputs", -1)
+    match_handle = _HANDLE_NAME_RE.match
+
+    def check(node_id, data, in_deg, out_deg, multi_node):
+        errors: List[dict] = []
+        warnings_list: List[str] = []
 
         # Check required fields
-        for field in meta.get("fields", []):
-            if field.get("required"):
-                val = node.data.get(field["name"])
-                if val is None or (isinstance(val, str) and not val.strip()):
-                    errors.append({
-                        "node_id": node.id,
-                        "node_type": node.type,
-                        "field": field["name"],
-                        "message": f"Required field '{field['label']}' is empty.",
-                    })
-
-        # Check input degree against max_inputs
-        # IMPORTANT: account for user-added extra input handles (data.extraInputs)
-        extra_inputs  = node.data.get("extraInputs",  []) if isinstance(node.data, dict) else []
-        extra_outputs = node.data.get("extraOutputs", []) if isinstance(node.data, dict) else []
+        for name, message in required:
+            val = data.get(name)
+            if val is None or (isinstance(val, str) and not val.strip()):
+                errors.append({"node_id": node_id, "node_type": node_type, "field": name, "message": message})
+
+        # IMPORTANT: account for user-added extra handles (data.extraInputs / extraOutputs)
+        extra_inputs  = data.get("extraInputs",  []) if isinstance(data, dict) else []
+        extra_outputs = data.get("extraOutputs", []) if isinstance(data, dict) else []
 
         # Validate extra handle name format
-        import re
         for h_name in extra_inputs + extra_outputs:
-            if not isinstance(h_name, str) or not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', h_name):
+            if not isinstance(h_name, str) or not match_handle(h_name):
                 warnings_list.append(
-                    f"Node '{node.id}': extra handle '{h_name}' has an invalid name "
+                    f"Node '{node_id}': extra handle '{h_name}' has an invalid name "
                     f"(use letters, numbers, underscores only)."
                 )
 
         # Effective max_inputs = static limit + number of extra input handles added
-        max_in = meta.get("max_inputs", -1)
         effective_max_in = -1 if max_in < 0 else max_in + len(extra_inputs)
-        in_deg = G.in_degree(node.id)
         if effective_max_in >= 0 and in_deg > effective_max_in:
             warnings_list.append(
-                f"Node '{node.id}' ({node.type}) has {in_deg} connections but "
+                f"Node '{node_id}' ({node_type}) has {in_deg} connections but "
                 f"supports at most {effective_max_in} "
                 f"({max_in} built-in + {len(extra_inputs)} custom)."
             )
 
         # Similarly track extra outputs for informational purposes
-        max_out = meta.get("max_outputs", -1)
-        out_deg = G.out_degree(node.id)
         effective_max_out = -1 if max_out < 0 else max_out + len(extra_outputs)
         if effective_max_out >= 0 and out_deg > effective_max_out:
             warnings_list.append(
-                f"Node '{node.id}' ({node.type}) has {out_deg} outgoing connections "
+                f"Node '{node_id}' ({node_type}) has {out_deg} outgoing connections "
                 f"but supports at most {effective_max_out}."
             )
 
         # Orphan check (no edges, not an isolated input/output node)
-        if G.degree(node.id) == 0 and len(nodes) > 1:
-            warnings_list.append(f"Node '{node.id}' ({node.type}) is disconnected.")
+        if in_deg + out_deg == 0 and multi_node:
+            warnings_list.append(f"Node '{node_id}' ({node_type}) is disconnected.")
+
+        return errors, warnings_list
+
+    return check
+
+
+# Compiled once at import; NODE_TYPE_META is static
+_RULES: Dict[str, NodeRule] = {t: _compile_rule(t, meta) for t, meta in NODE_TYPE_META.items()}
+
+
+def node_issues(
+    node_id: str,
+    node_type: str,
+    data: Dict[str, Any],
+    in_deg: int,
+    out_deg: int,
+    multi_node: bool,
+) -> Tuple[List[dict], List[str]]:
+    """
+    Errors and warnings for a single node. Depends only on the node's own
+    config, its (distinct-neighbour) degrees and whether the pipeline has more
+    than one node, so incremental sessions can re-run it per dirty node.
+    """
+    rule = _RULES.get(node_type)
+    if rule is None:
+        return [{
+            "node_id": node_id,
+            "node_type": node_type,
+            "field": "type",
+            "message": f"Unknown node type '{node_type}'.",
+        }], []
+    return rule(node_id, data, in_deg, out_deg, multi_node)
+
+
+def _distinct_degrees(nodes: List[Node], edges: List[Edge]) -> Dict[str, Tuple[int, int]]:
+    """
+    (in, out) degree per node id with CompactGraph semantics (parallel edges
+    collapse, dangling edges are dropped) — all validation needs, without
+    building adjacency or running the analysis pass.
+    """
+    in_deg = dict.fromkeys((n.id for n in nodes), 0)
+    out_deg = dict(in_deg)
+    for source, target in {(e.source, e.target) for e in edges}:
+        if source in out_deg and target in in_deg:
+            out_deg[source] += 1
+            in_deg[target] += 1
+    return {node_id: (in_deg[node_id], out_deg[node_id]) for node_id in in_deg}
+
+
+def validate_pipeline(
+    nodes: List[Node],
+    edges: List[Edge],
+    analysis: Optional[GraphAnalysis] = None,
+) -> dict:
+    errors = []
+    warnings_list = []
+    multi_node = len(nodes) > 1
+
+    if analysis is not None:
+        index, a_in, a_out = analysis.graph.index, analysis.in_degree, analysis.out_degree
+        degree_of = lambda node_id: (a_in[index[node_id]], a_out[index[node_id]])
+    else:
+        degree_of = _distinct_degrees(nodes, edges).__getitem__
+
+    for node in nodes:
+        in_deg, out_deg = degree_of(node.id)
+        node_errors, node_warnings = node_issues(node.id, node.type, node.data, in_deg, out_deg, multi_node)
+        errors.extend(node_errors)
+        warnings_list.extend(node_warnings)
 
     return {
         "valid": len(errors) == 0,
@@ -457,50 +526,50 @@ def get_node_types() -> list:
     return result
 
 
-# ─── Server-side Dagre-style layout ──────────────────────────────────────────
+# ─── Server-side layered layout ──────────────────────────────────────────────
 
 def compute_auto_layout(
-    nodes: List[BaseNodeSchema],
-    edges: List[EdgeSchema],
+    nodes: List[Node],
+    edges: List[Edge],
     direction: str = "LR",
+    analysis: Optional[GraphAnalysis] = None,
+    heuristic: str = "barycenter",
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
 ) -> list:
     """
-    Compute positions using a topological-sort-based layering algorithm.
+    Compute positions with the layered layout engine (services/layout.py),
+    using each node's measured width/height when the client sends them.
     Returns a list of {id, position: {x, y}} dicts.
     """
     if not nodes:
         return []
 
-    G = _build_graph(nodes, edges)
-
-    NODE_W = 300  # assumed node width + horizontal gap
-    NODE_H = 180  # assumed node height + vertical gap
-
-    # Assign layers via longest path from sources
-    layer: Dict[str, int] = {}
-    try:
-        for node_id in nx.topological_sort(G):
-            preds = list(G.predecessors(node_id))
-            layer[node_id] = (max(layer[p] for p in preds) + 1) if preds else 0
-    except nx.NetworkXUnfeasible:
-        # Has cycles — fall back to simple row layout
-        for i, node in enumerate(nodes):
-            layer[node.id] = i
-
-    # Group by layer
-    layers: Dict[int, List[str]] = {}
-    for node_id, l in layer.items():
-        layers.setdefault(l, []).append(node_id)
-
-    positioned = []
-    for l_idx, node_ids in sorted(layers.items()):
-        for row_idx, node_id in enumerate(node_ids):
-            if direction == "TB":
-                x = row_idx * NODE_W + 60
-                y = l_idx * NODE_H + 60
-            else:  # LR (default)
-                x = l_idx * NODE_W + 60
-                y = row_idx * NODE_H + 60
-            positioned.append({"id": node_id, "position": {"x": x, "y": y}})
-
-    return positioned
+    graph = analysis.graph if analysis is not None else _build_graph(nodes, edges)
+    sizes = {n.id: (n.width, n.height) for n in nodes}
+    result = layered_layout(graph, sizes, direction, heuristic, time_budget_ms)
+    return [
+        {"id": node_id, "position": {"x": round(x, 1), "y": round(y, 1)}}
+        for node_id, (x, y) in result.positions.items()
+    ]
+
+
+def compute_incremental_layout(
+    nodes: List[Node],
+    edges: List[Edge],
+    changed: List[str],
+    direction: str = "LR",
+) -> Tuple[str, list]:
+    """
+    Position-stable layout after an edit: only `changed` nodes are placed,
+    everything else keeps its current position. Falls back to a full layout
+    when most of the graph changed. Returns (mode, moved nodes).
+    """
+    moved = incremental_layout(nodes, edges, changed, direction)
+    if moved is None:
+        current = {n.id: (n.x, n.y) for n in nodes}
+        full = compute_auto_layout(nodes, edges, direction)
+        return "full", [p for p in full if current.get(p["id"]) != (p["position"]["x"], p["position"]["y"])]
+    return "incremental", [
+        {"id": node_id, "position": {"x": round(x, 1), "y": round(y, 1)}}
+        for node_id, (x, y) in moved.items()
+    ]
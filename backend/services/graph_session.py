@@ -0,0 +1,427 @@
+# services/graph_session.py — Server-side graph sessions maintained incrementally from node/edge deltas
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from domain.pipeline_ir import Edge, Node
+from services.graph_core import DynamicConnectivity, IncrementalTopoOrder
+from services.graph_service import analyze_pipeline, node_issues, pipeline_warnings
+
+MAX_NODES = 1000           # same limits as PipelineData
+MAX_EDGES = 5000
+MAX_SESSIONS = 256
+SESSION_IDLE_SECONDS = 1800
+
+# session id → GraphSession (LRU by last use)
+_SESSIONS: "OrderedDict[str, GraphSession]" = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+class SessionError(ValueError):
+    """A delta that cannot be applied (unknown ids, duplicates, size limits)."""
+
+
+class VersionConflict(Exception):
+    def __init__(self, current: int):
+        super().__init__(f"Session is at version {current}.")
+        self.current = current
+
+
+class _SessionNode:
+    __slots__ = ("id", "slot", "type", "data", "errors", "warnings")
+
+    def __init__(self, node_id: str, slot: int, node_type: str, data: Dict[str, Any]):
+        self.id = node_id
+        self.slot = slot
+        self.type = node_type
+        self.data = data
+        self.errors: List[dict] = []
+        self.warnings: List[str] = []
+
+
+class GraphSession:
+    """
+    A pipeline graph kept live between requests.
+
+    Structure mirrors CompactGraph semantics: parallel edges collapse into one
+    (source, target) pair and degrees count distinct neighbours. Pairs that
+    would close a cycle are parked in `back_pairs` instead of the dynamic
+    topological order, and retried whenever an ordered pair is removed — so
+    the graph is a DAG exactly when `back_pairs` is empty.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.version = 0
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+        self.nodes: Dict[str, _SessionNode] = {}
+        self.slot_ids: List[Optional[str]] = []
+        self.edges: Dict[str, Tuple[str, str]] = {}
+
+        self.pair_count: Dict[Tuple[int, int], int] = {}     # directed (u, v) → parallel edges
+        self.link_count: Dict[Tuple[int, int], int] = {}     # undirected (min, max) → directed pairs
+        self.back_pairs: Dict[Tuple[int, int], None] = {}    # insertion-ordered set
+        self.in_deg: List[int] = []
+        self.out_deg: List[int] = []
+        self.type_counts: Dict[str, int] = {}
+        self.error_count = 0
+
+        self.topo = IncrementalTopoOrder()
+        self.conn = DynamicConnectivity()
+
+    # ── Delta application ─────────────────────────────────────────────────────
+
+    def apply(
+        self,
+        add_nodes: List[Node] = (),
+        update_nodes: List[Any] = (),
+        remove_nodes: List[str] = (),
+        add_edges: List[Edge] = (),
+        remove_edges: List[str] = (),
+    ) -> dict:
+        """
+        Apply one delta atomically (everything is checked before anything
+        changes) and return only what it changed.
+        """
+        self._check(add_nodes, update_nodes, remove_nodes, add_edges, remove_edges)
+        multi_before = len(self.nodes) > 1
+        dirty: set = set()          # node ids whose degrees or config changed
+        moved: set = set()          # slots whose topological rank changed
+
+        for edge_id in remove_edges:
+            self._remove_edge(edge_id, dirty, moved)
+        removed = []
+        for node_id in remove_nodes:
+            for edge_id in [e for e, (s, t) in self.edges.items() if node_id in (s, t)]:
+                self._remove_edge(edge_id, dirty, moved)
+            self._remove_node(node_id)
+            removed.append(node_id)
+        for node in add_nodes:
+            self._add_node(node.id, node.type, node.data)
+            dirty.add(node.id)
+            moved.add(self.nodes[node.id].slot)
+        for update in update_nodes:
+            node = self.nodes[update.id]
+            if update.type is not None and update.type != node.type:
+                self._count_type(node.type, -1)
+                self._count_type(update.type, 1)
+                node.type = update.type
+            if update.data is not None:
+                node.data = update.data
+            dirty.add(update.id)
+        for edge in add_edges:
+            self._add_edge(edge.id, edge.source, edge.target, dirty, moved)
+
+        if (len(self.nodes) > 1) != multi_before:
+            # The orphan warning only applies to multi-node pipelines
+            dirty.update(n.id for n in self.nodes.values() if self.in_deg[n.slot] + self.out_deg[n.slot] == 0)
+        dirty.intersection_update(self.nodes)
+
+        self.version += 1
+        changed_issues = {}
+        for node_id in dirty:
+            node = self.nodes[node_id]
+            before = (node.errors, node.warnings)
+            self._revalidate(node)
+            if (node.errors, node.warnings) != before:
+                changed_issues[node_id] = {"errors": node.errors, "warnings": node.warnings}
+
+        rank = self.topo.rank
+        return {
+            "session_id": self.id,
+            "version": self.version,
+            **self._summary(),
+            "removed_nodes": removed,
+            "degrees": {
+                node_id: {"in": self.in_deg[self.nodes[node_id].slot], "out": self.out_deg[self.nodes[node_id].slot]}
+                for node_id in dirty
+            },
+            "order": {self.slot_ids[s]: rank[s] for s in moved if rank[s] >= 0},
+            "validation": {"valid": self.error_count == 0, "nodes": changed_issues},
+        }
+
+    def _check(self, add_nodes, update_nodes, remove_nodes, add_edges, remove_edges) -> None:
+        """Validate a delta against the current graph without copying it (cost ∝ delta size)."""
+        nodes, edges = self.nodes, self.edges
+        gone_nodes: set = set()
+        for node_id in remove_nodes:
+            if node_id not in nodes or node_id in gone_nodes:
+                raise SessionError(f"Cannot remove unknown node '{node_id}'.")
+            gone_nodes.add(node_id)
+        new_nodes: set = set()
+        for node in add_nodes:
+            if (node.id in nodes and node.id not in gone_nodes) or node.id in new_nodes:
+                raise SessionError(f"Node '{node.id}' already exists.")
+            new_nodes.add(node.id)
+
+        def exists(node_id: str) -> bool:
+            return node_id in new_nodes or (node_id in nodes and node_id not in gone_nodes)
+
+        for update in update_nodes:
+            if not exists(update.id):
+                raise SessionError(f"Cannot update unknown node '{update.id}'.")
+
+        gone_edges: set = set()
+        for edge_id in remove_edges:
+            if edge_id not in edges or edge_id in gone_edges:
+                raise SessionError(f"Cannot remove unknown edge '{edge_id}'.")
+            gone_edges.add(edge_id)
+        if gone_nodes:
+            gone_edges.update(e for e, ends in edges.items() if not gone_nodes.isdisjoint(ends))
+        new_edges: set = set()
+        for edge in add_edges:
+            if (edge.id in edges and edge.id not in gone_edges) or edge.id in new_edges:
+                raise SessionError(f"Edge '{edge.id}' already exists.")
+            for end in (edge.source, edge.target):
+                if not exists(end):
+                    raise SessionError(f"Edge '{edge.id}' references unknown node '{end}'.")
+            new_edges.add(edge.id)
+
+        if len(nodes) - len(gone_nodes) + len(new_nodes) > MAX_NODES:
+            raise SessionError(f"Pipeline may contain at most {MAX_NODES} nodes.")
+        if len(edges) - len(gone_edges) + len(new_edges) > MAX_EDGES:
+            raise SessionError(f"Pipeline may contain at most {MAX_EDGES} edges.")
+
+    # ── Nodes ─────────────────────────────────────────────────────────────────
+
+    def _add_node(self, node_id: str, node_type: str, data: Dict[str, Any]) -> None:
+        slot = self.conn.uf.add()
+        while len(self.slot_ids) <= slot:
+            self.slot_ids.append(None)
+            self.in_deg.append(0)
+            self.out_deg.append(0)
+        self.slot_ids[slot] = node_id
+        self.topo.add_node(slot)
+        self.nodes[node_id] = _SessionNode(node_id, slot, node_type, data)
+        self._count_type(node_type, 1)
+
+    def _remove_node(self, node_id: str) -> None:
+        node = self.nodes.pop(node_id)
+        self.error_count -= len(node.errors)
+        self._count_type(node.type, -1)
+        self.topo.remove_node(node.slot)
+        self.conn.uf.remove(node.slot)
+        self.slot_ids[node.slot] = None
+
+    def _count_type(self, node_type: str, delta: int) -> None:
+        count = self.type_counts.get(node_type, 0) + delta
+        if count:
+            self.type_counts[node_type] = count
+        else:
+            self.type_counts.pop(node_type, None)
+
+    def _revalidate(self, node: _SessionNode) -> None:
+        self.error_count -= len(node.errors)
+        node.errors, node.warnings = node_issues(
+            node.id, node.type, node.data,
+            self.in_deg[node.slot], self.out_deg[node.slot], len(self.nodes) > 1,
+        )
+        self.error_count += len(node.errors)
+
+    # ── Edges ─────────────────────────────────────────────────────────────────
+
+    def _add_edge(self, edge_id: str, source: str, target: str, dirty: set, moved: set) -> None:
+        self.edges[edge_id] = (source, target)
+        u, v = self.nodes[source].slot, self.nodes[target].slot
+        pair = (u, v)
+        count = self.pair_count.get(pair, 0)
+        self.pair_count[pair] = count + 1
+        if count:
+            return                                  # parallel edge: structure unchanged
+
+        self.out_deg[u] += 1
+        self.in_deg[v] += 1
+        dirty.update((source, target))
+        changed = self.topo.try_add_edge(u, v)
+        if changed is None:
+            self.back_pairs[pair] = None
+        else:
+            moved.update(changed)
+        if u != v:
+            link = (u, v) if u < v else (v, u)
+            links = self.link_count.get(link, 0)
+            self.link_count[link] = links + 1
+            if not links:
+                self.conn.add_link(*link)
+
+    def _remove_edge(self, edge_id: str, dirty: set, moved: set) -> None:
+        source, target = self.edges.pop(edge_id)
+        u, v = self.nodes[source].slot, self.nodes[target].slot
+        pair = (u, v)
+        count = self.pair_count[pair] - 1
+        if count:
+            self.pair_count[pair] = count
+            return
+        del self.pair_count[pair]
+
+        self.out_deg[u] -= 1
+        self.in_deg[v] -= 1
+        dirty.update((source, target))
+        if pair in self.back_pairs:
+            del self.back_pairs[pair]
+        else:
+            self.topo.remove_edge(u, v)
+            # Losing an ordered pair may break the cycle a parked pair was waiting on
+            for parked in list(self.back_pairs):
+                changed = self.topo.try_add_edge(*parked)
+                if changed is not None:
+                    del self.back_pairs[parked]
+                    moved.update(changed)
+        if u != v:
+            link = (u, v) if u < v else (v, u)
+            links = self.link_count[link] - 1
+            if links:
+                self.link_count[link] = links
+            else:
+                del self.link_count[link]
+                self.conn.remove_link(*link)
+
+    # ── Views ─────────────────────────────────────────────────────────────────
+
+    def _isolated(self) -> List[str]:
+        in_deg, out_deg = self.in_deg, self.out_deg
+        return [n.id for n in self.nodes.values() if in_deg[n.slot] + out_deg[n.slot] == 0]
+
+    def _summary(self) -> dict:
+        is_dag = not self.back_pairs
+        components = self.conn.components
+        slot_ids = self.slot_ids
+        return {
+            "num_nodes": len(self.nodes),
+            "num_edges": len(self.edges),
+            "is_dag": is_dag,
+            "connected_components": components,
+            "cycle_edges": [[slot_ids[u], slot_ids[v]] for u, v in self.back_pairs],
+            "warnings": pipeline_warnings(
+                "customInput" in self.type_counts, "customOutput" in self.type_counts,
+                is_dag, self._isolated(), components,
+            ),
+        }
+
+    def snapshot(self) -> dict:
+        """Full ParseResponse/ValidateResponse-shaped state, built from the maintained structures."""
+        slot_ids, in_deg, out_deg = self.slot_ids, self.in_deg, self.out_deg
+        is_dag = not self.back_pairs
+        components = self.conn.components
+        isolated = self._isolated()
+
+        longest, plan = -1, []
+        if is_dag:
+            order = self.topo.order()
+            depth = {s: 0 for s in order}
+            succ = self.topo.succ
+            for s in order:
+                for t in succ[s]:
+                    if depth[s] + 1 > depth[t]:
+                        depth[t] = depth[s] + 1
+            longest = max(depth.values()) if depth else -1
+            plan = [slot_ids[s] for s in order]
+
+        nodes = self.nodes.values()
+        has_input, has_output = "customInput" in self.type_counts, "customOutput" in self.type_counts
+        errors = [e for n in nodes for e in n.errors]
+        return {
+            "session_id": self.id,
+            "version": self.version,
+            "metrics": {
+                "num_nodes": len(self.nodes),
+                "num_edges": len(self.edges),
+                "is_dag": is_dag,
+                "node_type_counts": dict(self.type_counts),
+                "source_nodes": [n.id for n in nodes if in_deg[n.slot] == 0 and out_deg[n.slot] > 0],
+                "sink_nodes": [n.id for n in nodes if out_deg[n.slot] == 0 and in_deg[n.slot] > 0],
+                "isolated_nodes": isolated,
+                "connected_components": components,
+                "longest_path": longest,
+                "has_input_node": has_input,
+                "has_output_node": has_output,
+                "warnings": pipeline_warnings(has_input, has_output, is_dag, isolated, components),
+                "execution_plan": plan,
+            },
+            "validation": {
+                "valid": not errors,
+                "errors": errors,
+                "warnings": [w for n in nodes for w in n.warnings],
+            },
+        }
+
+
+# ─── Session registry ─────────────────────────────────────────────────────────
+
+def _evict_locked(now: float) -> None:
+    while _SESSIONS:
+        oldest = next(iter(_SESSIONS.values()))
+        if len(_SESSIONS) <= MAX_SESSIONS and now - oldest.last_used < SESSION_IDLE_SECONDS:
+            break
+        _SESSIONS.popitem(last=False)
+
+
+def _collapse(nodes: List[Node], edges: List[Edge]) -> Tuple[List[Node], List[Edge]]:
+    """
+    Reduce a full graph to one a delta could build, the way CompactGraph reads
+    it: duplicate node ids collapse (first position, last data wins), edges to
+    unknown nodes are dropped, and a repeated edge id keeps its first edge.
+    """
+    by_id: Dict[str, Node] = {}
+    for node in nodes:
+        by_id[node.id] = node                   # an existing key keeps its position
+    kept: Dict[str, Edge] = {}
+    for edge in edges:
+        if edge.id not in kept and edge.source in by_id and edge.target in by_id:
+            kept[edge.id] = edge
+    return list(by_id.values()), list(kept.values())
+
+
+def open_session(nodes: List[Node], edges: List[Edge]) -> GraphSession:
+    """
+    Create a session from a full graph, accepting whatever /parse accepts
+    (see _collapse). Raises SessionError only past the size limits.
+    """
+    nodes, edges = _collapse(nodes, edges)
+    session = GraphSession()
+    session.apply(add_nodes=nodes)
+    # Seed ranks with a Kahn order so the bulk edge insert rarely has to reorder anything
+    analysis = analyze_pipeline(nodes, edges)
+    ids = analysis.graph.ids
+    slots = [session.nodes[ids[i]].slot for i in analysis.order]
+    if not analysis.is_dag:
+        placed = set(slots)
+        slots += [n.slot for n in session.nodes.values() if n.slot not in placed]
+    session.topo.seed(slots)
+    session.apply(add_edges=edges)
+    session.version = 0
+    with _SESSIONS_LOCK:
+        _SESSIONS[session.id] = session
+        _evict_locked(time.monotonic())
+    return session
+
+
+def get_session(session_id: str) -> Optional[GraphSession]:
+    with _SESSIONS_LOCK:
+        now = time.monotonic()
+        _evict_locked(now)
+        session = _SESSIONS.get(session_id)
+        if session is not None:
+            session.last_used = now
+            _SESSIONS.move_to_end(session_id)
+        return session
+
+
+def apply_delta(session: GraphSession, delta: Any) -> dict:
+    """Apply a GraphDelta under the session lock, honouring optimistic base_version checks."""
+    with session.lock:
+        if delta.base_version is not None and delta.base_version != session.version:
+            raise VersionConflict(session.version)
+        return session.apply(
+            add_nodes=delta.add_nodes, update_nodes=delta.update_nodes, remove_nodes=delta.remove_nodes,
+            add_edges=delta.add_edges, remove_edges=delta.remove_edges,
+        )
+
+
+def close_session(session_id: str) -> bool:
+    with _SESSIONS_LOCK:
+        return _SESSIONS.pop(session_id, None) is not None
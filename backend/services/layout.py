@@ -0,0 +1,492 @@
+# services/layout.py — Layered (Sugiyama-style) auto-layout engine
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from domain.pipeline_ir import Edge, Node
+from services.graph_core import CompactGraph
+
+# ─── Tunables ─────────────────────────────────────────────────────────────────
+
+DEFAULT_NODE_W = 240        # used when the client did not send a measured size
+DEFAULT_NODE_H = 120
+LAYER_GAP = 80              # between consecutive layers (main axis)
+NODE_GAP = 40               # between neighbouring nodes in a layer (cross axis)
+DUMMY_GAP = 12              # around the zero-size bend points of long edges
+MARGIN = 60
+
+DEFAULT_TIME_BUDGET_MS = 250
+DEFAULT_MAX_SWEEPS = 24
+COMPACTION_PASSES = 4
+DUMMIES_PER_NODE = 4        # bend-point budget; the longest edges beyond it are left out of
+MIN_DUMMY_BUDGET = 2000     # ordering and compaction (they are rare in real pipelines and
+                            # would otherwise dominate the cost on dense random graphs)
+
+HEURISTICS = ("barycenter", "median")
+
+
+class LayoutResult:
+    """Top-left positions per node id plus diagnostics for benchmarking."""
+    __slots__ = ("positions", "layers", "crossings", "sweeps", "reversed_edges", "dummies")
+
+    def __init__(self):
+        self.positions: Dict[str, Tuple[float, float]] = {}
+        self.layers = 0
+        self.crossings = 0
+        self.sweeps = 0
+        self.reversed_edges = 0
+        self.dummies = 0
+
+
+# ─── Phase 1: cycle breaking ──────────────────────────────────────────────────
+
+def _acyclic_edges(graph: CompactGraph) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Iterative DFS in input order; edges into a node still on the stack are
+    reversed. Self-loops are dropped. Returns (deduplicated edges, reversed count).
+    """
+    n = len(graph.ids)
+    out_offsets, out_targets = graph.out_offsets.tolist(), graph.out_targets.tolist()
+    state = [0] * n                     # 0 = new, 1 = on stack, 2 = done
+    back = set()
+    for root in range(n):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, out_offsets[root])]
+        while stack:
+            u, i = stack[-1]
+            if i == out_offsets[u + 1]:
+                state[u] = 2
+                stack.pop()
+                continue
+            stack[-1] = (u, i + 1)
+            v = out_targets[i]
+            if state[v] == 0:
+                state[v] = 1
+                stack.append((v, out_offsets[v]))
+            elif state[v] == 1:
+                back.add((u, v))
+
+    edges = set()
+    src, dst = graph.edge_src.tolist(), graph.edge_dst.tolist()
+    for u, v in zip(src, dst):
+        if u == v:
+            continue
+        edges.add((v, u) if (u, v) in back else (u, v))
+    return sorted(edges), len(back - {(u, u) for u in range(n)})
+
+
+# ─── Phase 2: layer assignment ────────────────────────────────────────────────
+
+def _assign_layers(n: int, edges: List[Tuple[int, int]]) -> List[int]:
+    """Longest path from sources, then pull sources down next to their earliest successor."""
+    succ: List[List[int]] = [[] for _ in range(n)]
+    indeg = [0] * n
+    for u, v in edges:
+        succ[u].append(v)
+        indeg[v] += 1
+
+    layer = [0] * n
+    queue = [i for i in range(n) if indeg[i] == 0]
+    remaining = list(indeg)
+    head = 0
+    while head < len(queue):
+        u = queue[head]
+        head += 1
+        lu = layer[u] + 1
+        for v in succ[u]:
+            if lu > layer[v]:
+                layer[v] = lu
+            remaining[v] -= 1
+            if remaining[v] == 0:
+                queue.append(v)
+
+    for u in range(n):
+        if indeg[u] == 0 and succ[u]:
+            layer[u] = min(layer[v] for v in succ[u]) - 1
+    return layer
+
+
+# ─── Phase 3: proper layering with dummy bend points ──────────────────────────
+
+def _expand_long_edges(n: int, edges: List[Tuple[int, int]], layer: List[int]):
+    """
+    Split edges spanning several layers into chains through dummy nodes
+    (ids n, n+1, …) so every remaining edge joins adjacent layers. Returns
+    (layer list extended with dummy layers, up-neighbours, down-neighbours, dummy count).
+    """
+    layer = list(layer)
+    long_edges = sorted((layer[v] - layer[u], u, v) for u, v in edges if layer[v] - layer[u] > 1)
+    budget = max(MIN_DUMMY_BUDGET, DUMMIES_PER_NODE * n)
+    up: List[List[int]] = [[] for _ in range(n)]
+    down: List[List[int]] = [[] for _ in range(n)]
+
+    def link(a: int, b: int) -> None:
+        down[a].append(b)
+        up[b].append(a)
+
+    for u, v in edges:
+        if layer[v] - layer[u] == 1:
+            link(u, v)
+    for span, u, v in long_edges:           # shortest spans first, so the budget keeps the most edges
+        if span - 1 > budget:
+            break
+        budget -= span - 1
+        prev = u
+        for step in range(1, span):
+            d = len(layer)
+            layer.append(layer[u] + step)
+            up.append([])
+            down.append([])
+            link(prev, d)
+            prev = d
+        link(prev, v)
+    return layer, up, down, len(layer) - n
+
+
+# ─── Phase 4: crossing reduction ──────────────────────────────────────────────
+
+def _count_crossings(upper: List[int], down: List[List[int]], pos: List[int]) -> int:
+    """Crossings between one layer and the next: inversions of the target positions (O(E log V))."""
+    targets = []
+    for u in upper:
+        targets.extend(sorted(pos[v] for v in down[u]))
+    if not targets:
+        return 0
+    # Fenwick tree over positions: tree prefix sums count the targets seen at or left of t
+    size = max(targets) + 1
+    tree = [0] * (size + 1)
+    crossings = 0
+    for seen, t in enumerate(targets):
+        i = t + 1
+        while i > 0:
+            seen -= tree[i]
+            i -= i & -i
+        crossings += seen
+        i = t + 1
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+    return crossings
+
+
+def _total_crossings(layers: List[List[int]], down: List[List[int]], pos: List[int]) -> int:
+    return sum(_count_crossings(layers[i], down, pos) for i in range(len(layers) - 1))
+
+
+def _sort_layer(nodes: List[int], neighbours: List[List[int]], pos: List[int], median: bool) -> None:
+    def key(v: int) -> float:
+        adj = neighbours[v]
+        if not adj:
+            return pos[v]               # keep nodes without neighbours roughly in place
+        if median:
+            ps = sorted(pos[u] for u in adj)
+            mid = len(ps) // 2
+            return ps[mid] if len(ps) % 2 else (ps[mid - 1] + ps[mid]) / 2
+        return sum(pos[u] for u in adj) / len(adj)
+
+    nodes.sort(key=key)
+    for i, v in enumerate(nodes):
+        pos[v] = i
+
+
+def _reduce_crossings(
+    layers: List[List[int]],
+    up: List[List[int]],
+    down: List[List[int]],
+    pos: List[int],
+    heuristic: str,
+    deadline: float,
+    max_sweeps: int,
+) -> Tuple[int, int]:
+    """Alternate down/up layer sweeps, keeping the best ordering seen. Returns (crossings, sweeps)."""
+    median = heuristic == "median"
+    best = _total_crossings(layers, down, pos)
+    best_layers = [list(l) for l in layers]
+    sweeps = 0
+    stale = 0
+    while best and sweeps < max_sweeps and time.perf_counter() < deadline:
+        if sweeps % 2 == 0:
+            for i in range(1, len(layers)):
+                _sort_layer(layers[i], up, pos, median)
+        else:
+            for i in range(len(layers) - 2, -1, -1):
+                _sort_layer(layers[i], down, pos, median)
+        sweeps += 1
+        crossings = _total_crossings(layers, down, pos)
+        if crossings < best:
+            best, best_layers, stale = crossings, [list(l) for l in layers], 0
+        else:
+            stale += 1
+            if stale >= 4:
+                break
+
+    for i, l in enumerate(best_layers):
+        layers[i] = l
+        for j, v in enumerate(l):
+            pos[v] = j
+    return best, sweeps
+
+
+# ─── Phase 5: coordinate assignment ───────────────────────────────────────────
+
+def _place_layer(order: List[int], desired: List[float], size: List[float], real: int) -> List[float]:
+    """
+    Centres closest (least squares) to `desired` that keep the layer's order and
+    minimum separation: shift out the cumulative gaps, then pool adjacent violators.
+    """
+    offsets = [0.0] * len(order)
+    for i in range(1, len(order)):
+        a, b = order[i - 1], order[i]
+        gap = NODE_GAP if a < real and b < real else DUMMY_GAP
+        offsets[i] = offsets[i - 1] + (size[a] + size[b]) / 2 + gap
+
+    blocks: List[List[float]] = []      # [mean, count]
+    for i in range(len(order)):
+        mean, count = desired[i] - offsets[i], 1
+        while blocks and blocks[-1][0] >= mean:
+            prev_mean, prev_count = blocks.pop()
+            mean = (prev_mean * prev_count + mean * count) / (prev_count + count)
+            count += prev_count
+        blocks.append([mean, count])
+
+    centres: List[float] = []
+    for mean, count in blocks:
+        for _ in range(int(count)):
+            centres.append(mean + offsets[len(centres)])
+    return centres
+
+
+def _assign_coordinates(
+    layers: List[List[int]],
+    up: List[List[int]],
+    down: List[List[int]],
+    cross_size: List[float],
+    real: int,
+) -> List[float]:
+    """Cross-axis centre per node: tight stacking, then a few alignment passes toward neighbours."""
+    centre = [0.0] * len(cross_size)
+    for l in layers:
+        for v, c in zip(l, _place_layer(l, [0.0] * len(l), cross_size, real)):
+            centre[v] = c
+
+    for p in range(COMPACTION_PASSES):
+        downward = p % 2 == 0
+        indices = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+        neighbours = up if downward else down
+        for i in indices:
+            l = layers[i]
+            desired = []
+            for v in l:
+                adj = neighbours[v]
+                desired.append(sum(centre[u] for u in adj) / len(adj) if adj else centre[v])
+            for v, c in zip(l, _place_layer(l, desired, cross_size, real)):
+                centre[v] = c
+    return centre
+
+
+# ─── Entry point ──────────────────────────────────────────────────────────────
+
+def layered_layout(
+    graph: CompactGraph,
+    sizes: Dict[str, Tuple[Optional[float], Optional[float]]],
+    direction: str = "LR",
+    heuristic: str = "barycenter",
+    time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+    max_sweeps: int = DEFAULT_MAX_SWEEPS,
+) -> LayoutResult:
+    """
+    Cycle breaking → longest-path layering → dummy bend points → barycenter /
+    median sweeps (bounded by `max_sweeps` and `time_budget_ms`) → least-squares
+    compaction using each node's real (width, height).
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    result = LayoutResult()
+    ids = graph.ids
+    n = len(ids)
+    if not n:
+        return result
+
+    edges, result.reversed_edges = _acyclic_edges(graph)
+    layer, up, down, result.dummies = _expand_long_edges(n, edges, _assign_layers(n, edges))
+
+    base = min(layer[:n])
+    num_layers = max(layer) - base + 1
+    layers: List[List[int]] = [[] for _ in range(num_layers)]
+    for v in range(len(layer)):             # real nodes first, in input order
+        layers[layer[v] - base].append(v)
+    pos = [0] * len(layer)
+    for l in layers:
+        for j, v in enumerate(l):
+            pos[v] = j
+    result.layers = num_layers
+    result.crossings, result.sweeps = _reduce_crossings(layers, up, down, pos, heuristic, deadline, max_sweeps)
+
+    lr = direction != "TB"
+    widths, heights = [], []
+    for node_id in ids:
+        w, h = sizes.get(node_id, (None, None))
+        widths.append(float(w) if w else float(DEFAULT_NODE_W))
+        heights.append(float(h) if h else float(DEFAULT_NODE_H))
+    main_size = widths if lr else heights
+    cross_size = (heights if lr else widths) + [0.0] * result.dummies
+
+    centre = _assign_coordinates(layers, up, down, cross_size, n)
+    cross_min = min(centre[v] - cross_size[v] / 2 for v in range(n))
+
+    # Main axis: each layer is as deep as its largest node
+    layer_start, cursor = [], float(MARGIN)
+    for l in layers:
+        layer_start.append(cursor)
+        depth = max((main_size[v] for v in l if v < n), default=0.0)
+        cursor += depth + LAYER_GAP
+
+    for v in range(n):
+        main = layer_start[layer[v] - base]
+        cross = centre[v] - cross_size[v] / 2 - cross_min + MARGIN
+        result.positions[ids[v]] = (main, cross) if lr else (cross, main)
+    return result
+
+
+# ─── Incremental placement ────────────────────────────────────────────────────
+
+COLUMN_WIDTH = 200          # bucket size of the main-axis obstacle index
+FULL_RELAYOUT_RATIO = 0.5   # above this share of changed nodes, a full layout is cheaper and better
+
+
+class _Box:
+    __slots__ = ("main", "cross", "main_size", "cross_size")
+
+    def __init__(self, main: float, cross: float, main_size: float, cross_size: float):
+        self.main = main
+        self.cross = cross
+        self.main_size = main_size
+        self.cross_size = cross_size
+
+
+class _ColumnIndex:
+    """Boxes bucketed by main-axis column, so a placement only looks at its own band."""
+    __slots__ = ("columns",)
+
+    def __init__(self):
+        self.columns: Dict[int, List[_Box]] = {}
+
+    def _span(self, start: float, end: float) -> range:
+        return range(int(start // COLUMN_WIDTH), int(end // COLUMN_WIDTH) + 1)
+
+    def add(self, box: _Box) -> None:
+        for c in self._span(box.main, box.main + box.main_size):
+            self.columns.setdefault(c, []).append(box)
+
+    def blocked(self, main: float, main_size: float) -> List[Tuple[float, float]]:
+        """Cross-axis intervals occupied by boxes overlapping the band [main, main + size] (plus gap)."""
+        lo, hi = main - NODE_GAP, main + main_size + NODE_GAP
+        seen, intervals = set(), []
+        for c in self._span(lo, hi):
+            for box in self.columns.get(c, ()):
+                if id(box) in seen or box.main >= hi or box.main + box.main_size <= lo:
+                    continue
+                seen.add(id(box))
+                intervals.append((box.cross - NODE_GAP, box.cross + box.cross_size + NODE_GAP))
+        return intervals
+
+
+def _nearest_free(desired: float, size: float, intervals: List[Tuple[float, float]]) -> float:
+    """Cross-axis start closest to `desired` where [start, start + size] avoids every interval."""
+    def free(start: float) -> bool:
+        end = start + size
+        return all(end <= a or start >= b for a, b in intervals)
+
+    if free(desired):
+        return desired
+    candidates = [b for _, b in intervals] + [a - size for a, _ in intervals]
+    return min((c for c in candidates if free(c)), key=lambda c: abs(c - desired))
+
+
+def incremental_layout(
+    nodes: Sequence[Node],
+    edges: Sequence[Edge],
+    changed: Sequence[str],
+    direction: str = "LR",
+) -> Optional[Dict[str, Tuple[float, float]]]:
+    """
+    Place only the `changed` nodes (new or edited) around the rest, which stay
+    pinned at their current positions. Each changed node goes one layer gap
+    after its placed predecessors (or before its placed successors) and is
+    centred on their cross-axis mean, then slid to the nearest free slot in
+    its band. Work is proportional to the changed nodes and their edges plus
+    one linear scan to index the pinned boxes.
+
+    Returns {node id: (x, y)} for nodes that moved, or None when so much
+    changed that the caller should run a full layered_layout instead.
+    """
+    lr = direction != "TB"
+    by_id = {n.id: n for n in nodes}
+    todo = [node_id for node_id in dict.fromkeys(changed) if node_id in by_id]
+    if not todo:
+        return {}
+    if len(todo) > FULL_RELAYOUT_RATIO * len(by_id):
+        return None
+    pending = set(todo)
+
+    def box_of(node: Node) -> _Box:
+        w = float(node.width) if node.width else float(DEFAULT_NODE_W)
+        h = float(node.height) if node.height else float(DEFAULT_NODE_H)
+        x, y = node.x, node.y
+        return _Box(x, y, w, h) if lr else _Box(y, x, h, w)
+
+    boxes: Dict[str, _Box] = {}
+    index = _ColumnIndex()
+    for node_id, node in by_id.items():
+        box = boxes[node_id] = box_of(node)
+        if node_id not in pending:
+            index.add(box)
+
+    preds: Dict[str, List[str]] = {node_id: [] for node_id in todo}
+    succs: Dict[str, List[str]] = {node_id: [] for node_id in todo}
+    for e in edges:
+        if e.source == e.target or e.source not in by_id or e.target not in by_id:
+            continue
+        if e.target in pending:
+            preds[e.target].append(e.source)
+        if e.source in pending:
+            succs[e.source].append(e.target)
+
+    # Changed nodes in topological order among themselves, so new chains fill in left to right
+    indeg = {node_id: sum(1 for p in preds[node_id] if p in pending) for node_id in todo}
+    order = [node_id for node_id in todo if indeg[node_id] == 0]
+    head = 0
+    while head < len(order):
+        for s in succs[order[head]]:
+            if s in indeg:
+                indeg[s] -= 1
+                if indeg[s] == 0:
+                    order.append(s)
+        head += 1
+    if len(order) < len(todo):
+        placed = set(order)
+        order += [node_id for node_id in todo if node_id not in placed]
+
+    moved: Dict[str, Tuple[float, float]] = {}
+    for node_id in order:
+        box = boxes[node_id]
+        placed_preds = [boxes[p] for p in preds[node_id] if p not in pending]
+        placed_succs = [boxes[s] for s in succs[node_id] if s not in pending]
+        main, cross = box.main, box.cross
+        if placed_preds:
+            main = max(p.main + p.main_size for p in placed_preds) + LAYER_GAP
+        elif placed_succs:
+            main = min(s.main for s in placed_succs) - LAYER_GAP - box.main_size
+        anchors = placed_preds or placed_succs
+        if anchors:
+            cross = sum(a.cross + a.cross_size / 2 for a in anchors) / len(anchors) - box.cross_size / 2
+        cross = _nearest_free(cross, box.cross_size, index.blocked(main, box.main_size))
+
+        pending.discard(node_id)
+        box.main, box.cross = main, cross
+        index.add(box)
+        node = by_id[node_id]
+        x, y = (main, cross) if lr else (cross, main)
+        if (round(x, 1), round(y, 1)) != (round(node.x, 1), round(node.y, 1)):
+            moved[node_id] = (x, y)
+    return moved
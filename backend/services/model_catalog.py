@@ -0,0 +1,67 @@
+# services/model_catalog.py — Cached OpenRouter model catalogue (shared by /models and execution)
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
+
+CATALOG_TTL_SECONDS = 600
+DEFAULT_CONTEXT_LENGTH = 8192
+MAX_CATALOGS = 32           # distinct API keys whose catalogue is kept
+
+# api_key → (fetched_at, models)  (LRU; expired entries are dropped when seen)
+_CATALOG: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+
+
+def _evict_expired(now: float) -> None:
+    for api_key in [k for k, (fetched_at, _) in _CATALOG.items() if now - fetched_at >= CATALOG_TTL_SECONDS]:
+        del _CATALOG[api_key]
+
+
+async def fetch_models(api_key: str = "") -> List[dict]:
+    """Return the raw OpenRouter model list, re-fetching at most every CATALOG_TTL_SECONDS."""
+    _evict_expired(time.monotonic())
+    cached = _CATALOG.get(api_key)
+    if cached:
+        _CATALOG.move_to_end(api_key)
+        return cached[1]
+
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    async with httpx.AsyncClient(timeout=15.0) as client:
+        r = await client.get(OPENROUTER_MODELS_URL, headers=headers)
+        r.raise_for_status()
+        models = r.json().get("data", [])
+    _CATALOG[api_key] = (time.monotonic(), models)
+    _CATALOG.move_to_end(api_key)
+    while len(_CATALOG) > MAX_CATALOGS:
+        _CATALOG.popitem(last=False)
+    return models
+
+
+async def get_context_length(model: str, api_key: str = "") -> int:
+    """Context window (tokens) for a model id, or DEFAULT_CONTEXT_LENGTH if unknown/unreachable."""
+    known = cached_context_length(model)
+    if known is not None:
+        return known
+    try:
+        models = await fetch_models(api_key)
+    except Exception:
+        return DEFAULT_CONTEXT_LENGTH
+    for m in models:
+        if m.get("id") == model:
+            return int(m.get("context_length") or DEFAULT_CONTEXT_LENGTH)
+    return DEFAULT_CONTEXT_LENGTH
+
+
+def cached_context_length(model: str) -> Optional[int]:
+    """Context length from any unexpired catalogue, without network I/O."""
+    _evict_expired(time.monotonic())
+    for _, models in _CATALOG.values():
+        for m in models:
+            if m.get("id") == model:
+                return int(m.get("context_length") or DEFAULT_CONTEXT_LENGTH)
+    return None
@@ -0,0 +1,191 @@
+# services/node_compiler.py — Compile node configuration into reusable artifacts
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from simpleeval import SimpleEval
+
+from domain.pipeline_ir import Edge, Node
+from services.table import VectorEval
+
+# Mirrors the frontend's textNode getHandles() regex so handles and bindings agree
+TEMPLATE_VAR_RE = re.compile(r"{{\s*([a-zA-Z_$][a-zA-Z0-9_$]*)\s*}}")
+_JSON_PATH_SPLIT_RE = re.compile(r"[.\[\]]")
+
+MAX_CACHED_ARTIFACTS = 4096
+
+# config hash → compiled artifact (LRU)
+_ARTIFACTS: "OrderedDict[str, Any]" = OrderedDict()
+
+
+# ─── Artifacts ────────────────────────────────────────────────────────────────
+
+class CompiledExpression:
+    """A simpleeval expression parsed once; evaluate() only walks the AST."""
+    __slots__ = ("source", "tree", "error", "_evaluator", "_vector_evaluator")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tree = None
+        self.error: Optional[Exception] = None
+        self._evaluator = SimpleEval()
+        self._vector_evaluator: Optional[VectorEval] = None
+        try:
+            self.tree = self._evaluator.parse(source)
+        except Exception as exc:
+            self.error = exc
+
+    def evaluate(self, names: Dict[str, Any]) -> Any:
+        if self.error is not None:
+            raise self.error
+        self._evaluator.names = names
+        return self._evaluator.eval(self.source, previously_parsed=self.tree)
+
+    def evaluate_vectorized(self, names: Dict[str, Any]) -> Any:
+        """Evaluate over NumPy columns (see services/table.py); same AST, element-wise semantics."""
+        if self.error is not None:
+            raise self.error
+        if self._vector_evaluator is None:
+            self._vector_evaluator = VectorEval()
+        self._vector_evaluator.names = names
+        return self._vector_evaluator.eval(self.source, previously_parsed=self.tree)
+
+
+class CompiledTemplate:
+    """A {{variable}} template split into (literal, variable, placeholder) segments."""
+    __slots__ = ("segments", "tail", "variables")
+
+    def __init__(self, source: str):
+        segments: List[Tuple[str, str, str]] = []
+        variables: List[str] = []
+        pos = 0
+        for m in TEMPLATE_VAR_RE.finditer(source):
+            segments.append((source[pos:m.start()], m.group(1), m.group(0)))
+            if m.group(1) not in variables:
+                variables.append(m.group(1))
+            pos = m.end()
+        self.segments = tuple(segments)
+        self.tail = source[pos:]
+        self.variables = tuple(variables)
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Substitute bound variables; unbound placeholders are left verbatim."""
+        if not self.segments:
+            return self.tail
+        parts = []
+        for literal, var, placeholder in self.segments:
+            parts.append(literal)
+            parts.append(values[var] if var in values else placeholder)
+        parts.append(self.tail)
+        return "".join(parts)
+
+
+# A JSON path token: (dict key, list index or None if the token is not an integer)
+JsonPath = Tuple[Tuple[str, Optional[int]], ...]
+
+
+def tokenize_json_path(path: str) -> JsonPath:
+    tokens = []
+    for part in _JSON_PATH_SPLIT_RE.split(path):
+        if not part:
+            continue
+        try:
+            index: Optional[int] = int(part)
+        except ValueError:
+            index = None
+        tokens.append((part, index))
+    return tuple(tokens)
+
+
+def resolve_json_path(obj: Any, path: JsonPath) -> Any:
+    """Walk a tokenized path; raises KeyError/IndexError/TypeError/ValueError like direct indexing."""
+    val = obj
+    for key, index in path:
+        if isinstance(val, list):
+            if index is None:
+                raise ValueError(f"invalid list index '{key}'")
+            val = val[index]
+        else:
+            val = val[key]
+    return val
+
+
+# ─── Config-hash cache ────────────────────────────────────────────────────────
+
+def config_hash(kind: str, source: str) -> str:
+    return hashlib.sha1(f"{kind}\x1f{source}".encode("utf-8")).hexdigest()
+
+
+_BUILDERS = {
+    "expression": CompiledExpression,
+    "template": CompiledTemplate,
+    "json_path": tokenize_json_path,
+}
+
+
+def _compiled(kind: str, source: str) -> Any:
+    key = config_hash(kind, source)
+    artifact = _ARTIFACTS.get(key)
+    if artifact is None:
+        artifact = _ARTIFACTS[key] = _BUILDERS[kind](source)
+        while len(_ARTIFACTS) > MAX_CACHED_ARTIFACTS:
+            _ARTIFACTS.popitem(last=False)
+    else:
+        _ARTIFACTS.move_to_end(key)
+    return artifact
+
+
+# ─── Per-node compile phase ───────────────────────────────────────────────────
+
+class CompiledNode:
+    """Reusable per-node artifacts; only the slots relevant to the node type are set."""
+    __slots__ = ("expression", "template", "bindings", "json_path")
+
+    def __init__(self):
+        self.expression: Optional[CompiledExpression] = None
+        self.template: Optional[CompiledTemplate] = None
+        self.bindings: Dict[str, str] = {}      # template variable → upstream node id
+        self.json_path: JsonPath = ()
+
+
+def _bind_template(node_id: str, template: CompiledTemplate, incoming: List[Edge]) -> Dict[str, str]:
+    """Resolve each template variable to the upstream node wired into its handle."""
+    bindings: Dict[str, str] = {}
+    unmatched: List[str] = []
+    prefix = f"{node_id}-"
+    for edge in incoming:
+        handle = edge.targetHandle or ""
+        var = handle[len(prefix):] if handle.startswith(prefix) else handle
+        if var in template.variables and var not in bindings:
+            bindings[var] = edge.source
+        else:
+            unmatched.append(edge.source)
+    # Edges without a recognised handle fill the remaining variables in order
+    for var in template.variables:
+        if var not in bindings and unmatched:
+            bindings[var] = unmatched.pop(0)
+    return bindings
+
+
+def compile_node(node: Node, incoming: List[Edge]) -> CompiledNode:
+    data = node.data or {}
+    compiled = CompiledNode()
+    if node.type in ("filter", "conditional"):
+        compiled.expression = _compiled("expression", str(data.get("condition", "True")))
+    elif node.type == "calculator":
+        compiled.expression = _compiled("expression", str(data.get("expression", "a + b")))
+    elif node.type == "jsonParser":
+        compiled.json_path = _compiled("json_path", str(data.get("jsonPath", "") or ""))
+    elif node.type == "text":
+        compiled.template = _compiled("template", str(data.get("text", "")))
+        compiled.bindings = _bind_template(node.id, compiled.template, incoming)
+    return compiled
+
+
+def compile_plan(nodes: List[Node], edges: List[Edge]) -> Dict[str, CompiledNode]:
+    """Compile every node once per run; artifacts are shared across runs by config hash."""
+    incoming: Dict[str, List[Edge]] = {}
+    for edge in edges:
+        incoming.setdefault(edge.target, []).append(edge)
+    return {n.id: compile_node(n, incoming.get(n.id, [])) for n in nodes}
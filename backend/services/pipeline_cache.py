@@ -0,0 +1,76 @@
+# services/pipeline_cache.py — Read-through cache of saved pipeline response bodies
+import hashlib
+from collections import OrderedDict
+from typing import Optional
+
+from services import analysis_cache
+
+MAX_BYTES = 64 * 1024 * 1024        # budget across all entries (approximate: body size)
+MAX_ENTRY_BYTES = 8 * 1024 * 1024   # bigger pipelines are always read from SQLite
+
+# pipeline id → _Entry  (LRU)
+_ENTRIES: "OrderedDict[str, _Entry]" = OrderedDict()
+_STATS = {"hits": 0, "misses": 0, "bytes": 0}
+
+# Bumped by every invalidation. A load that started before a save or delete
+# carries the old generation and is not cached (it may hold the old row).
+_GENERATION = 0
+
+
+class _Entry:
+    __slots__ = ("updated_at", "body", "etag")
+
+    def __init__(self, pipeline_id: str, updated_at: str, body: bytes):
+        self.updated_at = updated_at
+        self.body = body
+        digest = hashlib.blake2b(f"{pipeline_id}\x1f{updated_at}".encode("utf-8"), digest_size=12).hexdigest()
+        self.etag = analysis_cache.etag("pipeline", digest)
+
+
+def generation() -> int:
+    return _GENERATION
+
+
+def get(pipeline_id: str) -> Optional[_Entry]:
+    entry = _ENTRIES.get(pipeline_id)
+    if entry is None:
+        _STATS["misses"] += 1
+        return None
+    _ENTRIES.move_to_end(pipeline_id)
+    _STATS["hits"] += 1
+    return entry
+
+
+def put(pipeline_id: str, updated_at: str, body: bytes, loaded_at: int) -> _Entry:
+    """Wrap a freshly loaded body; cache it unless it is too big or went stale while loading."""
+    entry = _Entry(pipeline_id, updated_at, body)
+    if loaded_at != _GENERATION or len(body) > MAX_ENTRY_BYTES:
+        return entry
+    _discard(pipeline_id)
+    _ENTRIES[pipeline_id] = entry
+    _STATS["bytes"] += len(body)
+    while _STATS["bytes"] > MAX_BYTES:
+        _discard(next(iter(_ENTRIES)))
+    return entry
+
+
+def invalidate(pipeline_id: str) -> None:
+    """Forget a pipeline after it was saved or deleted."""
+    global _GENERATION
+    _GENERATION += 1
+    _discard(pipeline_id)
+
+
+def _discard(pipeline_id: str) -> None:
+    entry = _ENTRIES.pop(pipeline_id, None)
+    if entry is not None:
+        _STATS["bytes"] -= len(entry.body)
+
+
+def get_stats() -> dict:
+    return {"entries": len(_ENTRIES), "max_bytes": MAX_BYTES, **_STATS}
+
+
+def clear() -> None:
+    _ENTRIES.clear()
+    _STATS["hits"] = _STATS["misses"] = _STATS["bytes"] = 0
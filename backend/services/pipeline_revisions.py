@@ -0,0 +1,102 @@
+# services/pipeline_revisions.py — Structural deltas between saved pipeline graphs
+from typing import Any, Dict, List, Optional
+
+# A full snapshot every SNAPSHOT_EVERY revisions bounds replay to that many deltas
+SNAPSHOT_EVERY = 20
+# ...and a delta bigger than this fraction of a snapshot is stored as a snapshot instead
+MAX_DELTA_RATIO = 0.5
+
+KIND_SNAPSHOT = 0
+KIND_DELTA = 1
+
+Graph = Dict[str, List[Dict[str, Any]]]
+
+
+# ─── Diff ─────────────────────────────────────────────────────────────────────
+
+def _ids(items: List[Dict[str, Any]]) -> Optional[List[Any]]:
+    ids = [item.get("id") for item in items]
+    return ids if len(set(ids)) == len(ids) else None
+
+
+def _diff_items(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    {"add": [...], "patch": [...], "remove": [...], "order": [...]} with empty
+    parts left out. A patch holds the id plus changed top-level keys (None =
+    key removed). "order" appears only when replay would order items differently.
+    """
+    old_ids, new_ids = _ids(old), _ids(new)
+    if old_ids is None or new_ids is None:
+        return None                 # duplicate ids: not representable as a keyed delta
+    before = dict(zip(old_ids, old))
+    after = set(new_ids)
+
+    add, patch = [], []
+    for item_id, item in zip(new_ids, new):
+        prev = before.get(item_id)
+        if prev is None:
+            add.append(item)
+        elif prev != item:
+            changes = {key: value for key, value in item.items() if prev.get(key) != value}
+            changes.update((key, None) for key in prev.keys() - item.keys())
+            changes["id"] = item_id
+            patch.append(changes)
+    remove = [item_id for item_id in old_ids if item_id not in after]
+
+    delta: Dict[str, Any] = {}
+    if add:
+        delta["add"] = add
+    if patch:
+        delta["patch"] = patch
+    if remove:
+        delta["remove"] = remove
+    removed = set(remove)
+    replayed = [i for i in old_ids if i not in removed] + [item["id"] for item in add]
+    if replayed != new_ids:
+        delta["order"] = new_ids
+    return delta
+
+
+def diff(old: Graph, new: Graph) -> Optional[Dict[str, Any]]:
+    """Delta turning `old` into `new` ({} when equal), or None if only a snapshot can."""
+    delta = {}
+    for part in ("nodes", "edges"):
+        part_delta = _diff_items(old.get(part, []), new.get(part, []))
+        if part_delta is None:
+            return None
+        if part_delta:
+            delta[part] = part_delta
+    return delta
+
+
+# ─── Replay ───────────────────────────────────────────────────────────────────
+
+def _apply_items(items: List[Dict[str, Any]], delta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    by_id = {item["id"]: item for item in items}
+    order = [item["id"] for item in items]
+    for item_id in delta.get("remove", ()):
+        del by_id[item_id]
+    for changes in delta.get("patch", ()):
+        item = dict(by_id[changes["id"]])
+        for key, value in changes.items():
+            if value is None:
+                item.pop(key, None)
+            else:
+                item[key] = value
+        by_id[changes["id"]] = item
+    added = delta.get("add", ())
+    for item in added:
+        by_id[item["id"]] = item
+    if "order" in delta:
+        order = delta["order"]
+    else:
+        order = [i for i in order if i in by_id] + [item["id"] for item in added]
+    return [by_id[i] for i in order]
+
+
+def apply(graph: Graph, delta: Dict[str, Any]) -> Graph:
+    """The graph after `delta`; the input graph is not modified."""
+    return {
+        part: _apply_items(graph.get(part, []), delta[part]) if part in delta else graph.get(part, [])
+        for part in ("nodes", "edges")
+    }
@@ -1,17 +1,163 @@
 # services/pipeline_store.py — SQLite-backed async pipeline persistence
+import asyncio
+import base64
 import json
+import re
+import uuid
 import aiosqlite
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from domain import pipeline_ir
+from services import pipeline_cache, pipeline_revisions as revisions, storage_codec
+from services.graph_service import NODE_TYPE_META
 
 DB_PATH = Path(__file__).parent.parent / "pipelines.db"
 
+READER_CONNECTIONS = 3
+MIGRATION_BATCH = 200
+OFFLOAD_ENCODE_ELEMENTS = 500   # nodes + edges; zlib releases the GIL, so big graphs compress on a thread
+HEAD_CACHE_SIZE = 32
+COALESCE_WINDOW = 0.25          # seconds a queued save waits for newer saves of the same pipeline
+MAX_PENDING = 256               # queued pipelines that force an immediate flush
+MAX_RETRY_DELAY = 30.0          # seconds; cap on the backoff between retries of a failed flush
+EXPORT_CHUNK_BYTES = 64 * 1024
+IMPORT_BATCH = 500              # records per import transaction
+CONFLICT_POLICIES = ("skip", "overwrite", "rename")
+
+# WAL lets readers run alongside the single writer; NORMAL sync is durable
+# across app crashes and only risks the last commits on power loss.
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -8000",        # 8 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Fixed SQL text so each connection's statement cache reuses the prepared statements
+_SQL_UPSERT = """
+    INSERT INTO pipelines (id, name, created_at, updated_at, data)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        updated_at = excluded.updated_at,
+        data = excluded.data
+    RETURNING rowid, created_at
+"""
+# Keyset pages seek into idx_pipelines_updated; (updated_at, id) is unique,
+# so no row is skipped or repeated between pages. One fixed statement per
+# (cursor?, prefix?) combination — an "?1 IS NULL OR ..." form would scan.
+def _list_sql(after: bool, prefix: bool) -> str:
+    where = []
+    if after:
+        where.append("(updated_at, id) < (?, ?)")
+    if prefix:
+        where.append("name LIKE ? ESCAPE '\\'")
+    return (
+        "SELECT id, name, created_at, updated_at FROM pipelines"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY updated_at DESC, id DESC LIMIT ?"
+    )
+
+
+_SQL_LIST = {(a, p): _list_sql(a, p) for a in (False, True) for p in (False, True)}
+_SQL_GET = "SELECT id, name, created_at, updated_at, data FROM pipelines WHERE id = ?"
+_SQL_DELETE = "DELETE FROM pipelines WHERE id = ? RETURNING rowid"
+_SQL_EXPORT = "SELECT id, name, created_at, updated_at, data FROM pipelines ORDER BY rowid"
+_SQL_INSERT_NEW = "INSERT INTO pipelines (id, name, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?)"
+
+# Revision history: append-only; each row is a full snapshot or a delta against
+# the previous revision, and base_rev names the snapshot its replay starts from.
+_SQL_CREATE_REVISIONS = """
+    CREATE TABLE IF NOT EXISTS pipeline_revisions (
+        pipeline_id TEXT NOT NULL,
+        rev         INTEGER NOT NULL,
+        base_rev    INTEGER NOT NULL,
+        kind        INTEGER NOT NULL,
+        name        TEXT NOT NULL,
+        created_at  TEXT NOT NULL,
+        data        BLOB NOT NULL,
+        PRIMARY KEY (pipeline_id, rev)
+    ) WITHOUT ROWID
+"""
+_SQL_LAST_REVISION = """
+    SELECT rev, base_rev, name FROM pipeline_revisions WHERE pipeline_id = ? ORDER BY rev DESC LIMIT 1
+"""
+_SQL_INSERT_REVISION = "INSERT INTO pipeline_revisions VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SQL_HEAD_DATA = "SELECT data FROM pipelines WHERE id = ?"
+_SQL_LIST_REVISIONS = """
+    SELECT rev, kind, name, created_at, length(data) AS bytes FROM pipeline_revisions
+    WHERE pipeline_id = ? AND rev < ? ORDER BY rev DESC LIMIT ?
+"""
+_SQL_REPLAY = """
+    SELECT rev, kind, name, created_at, data FROM pipeline_revisions
+    WHERE pipeline_id = ?1
+      AND rev BETWEEN (SELECT base_rev FROM pipeline_revisions WHERE pipeline_id = ?1 AND rev = ?2) AND ?2
+    ORDER BY rev
+"""
+_SQL_DELETE_REVISIONS = "DELETE FROM pipeline_revisions WHERE pipeline_id = ?"
+
+# Full-text index: one row per pipeline, rowid shared with `pipelines`.
+# Names weigh 10x node content in the ranking.
+_SQL_CREATE_FTS = """
+    CREATE VIRTUAL TABLE pipelines_fts USING fts5(
+        name, body, tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+_SQL_FTS_UPSERT = "INSERT OR REPLACE INTO pipelines_fts (rowid, name, body) VALUES (?, ?, ?)"
+_SQL_FTS_DELETE = "DELETE FROM pipelines_fts WHERE rowid = ?"
+_SQL_SEARCH = """
+    SELECT p.id, p.name, p.created_at, p.updated_at,
+           snippet(pipelines_fts, 1, '[', ']', '…', 12) AS snippet,
+           bm25(pipelines_fts, 10.0, 1.0) AS score
+    FROM pipelines_fts JOIN pipelines p ON p.rowid = pipelines_fts.rowid
+    WHERE pipelines_fts MATCH ?
+    ORDER BY score, p.rowid
+    LIMIT ? OFFSET ?
+"""
+
+# pipeline id → (rev, canonical graph) of the last save, so the next save can diff without decoding
+_HEADS: "OrderedDict[str, Tuple[int, dict]]" = OrderedDict()
+
+_WRITER: Optional[aiosqlite.Connection] = None
+_WRITE_LOCK: Optional[asyncio.Lock] = None
+_READERS: Optional["asyncio.Queue[aiosqlite.Connection]"] = None
+_OPEN_LOCK = asyncio.Lock()
+
+# Write-behind save queue: pipeline id → latest unwritten save
+_PENDING: "Dict[str, _PendingSave]" = {}
+_FLUSH_LOCK = asyncio.Lock()
+_FLUSH_TIMER: Optional[asyncio.Task] = None
+_FLUSHING: "Dict[str, _PendingSave]" = {}      # the batch being written
+_RETRY_DELAY = COALESCE_WINDOW                  # doubles after each failed flush, reset by a good one
+
+
+# ─── Connection pool ──────────────────────────────────────────────────────────
+
+async def _connect(read_only: bool) -> aiosqlite.Connection:
+    db = await aiosqlite.connect(DB_PATH, cached_statements=64)
+    db.row_factory = aiosqlite.Row
+    for pragma in _PRAGMAS:
+        await db.execute(pragma)
+    if read_only:
+        await db.execute("PRAGMA query_only = ON")
+    return db
+
 
 async def init_db():
-    """Create the pipelines table if it does not exist."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("""
+    """Open the writer and reader connections; create the tables and search index if needed."""
+    global _WRITER, _WRITE_LOCK, _READERS
+    async with _OPEN_LOCK:
+        if _WRITER is not None:
+            return
+        writer = await _connect(read_only=False)
+        # data holds storage_codec BLOBs. It stays declared TEXT: TEXT affinity never
+        # converts a BLOB, and databases from before the codec then need no table rebuild.
+        await writer.execute("""
             CREATE TABLE IF NOT EXISTS pipelines (
                 id          TEXT PRIMARY KEY,
                 name        TEXT NOT NULL,
@@ -20,60 +166,557 @@ async def init_db():
                 data        TEXT NOT NULL
             )
         """)
-        await db.commit()
+        await writer.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pipelines_updated ON pipelines (updated_at DESC, id DESC)"
+        )
+        await writer.execute(_SQL_CREATE_REVISIONS)
+        async with writer.execute("SELECT 1 FROM sqlite_master WHERE name = 'pipelines_fts'") as cur:
+            has_fts = await cur.fetchone() is not None
+        if not has_fts:
+            await writer.execute(_SQL_CREATE_FTS)
+            await _backfill_search_index(writer)
+        await writer.commit()
+        await _migrate_blobs(writer)
+        readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        for _ in range(READER_CONNECTIONS):
+            readers.put_nowait(await _connect(read_only=True))
+        _WRITER, _WRITE_LOCK, _READERS = writer, asyncio.Lock(), readers
 
 
-async def save_pipeline(pipeline_id: str, name: str, nodes: list, edges: list) -> dict:
-    """Upsert (insert or replace) a pipeline record."""
-    now = datetime.now(timezone.utc).isoformat()
-    data_json = json.dumps({"nodes": nodes, "edges": edges})
-    async with aiosqlite.connect(DB_PATH) as db:
-        # Check if exists so we preserve created_at
-        async with db.execute("SELECT created_at FROM pipelines WHERE id = ?", (pipeline_id,)) as cur:
-            row = await cur.fetchone()
-        created_at = row[0] if row else now
-        await db.execute("""
-            INSERT INTO pipelines (id, name, created_at, updated_at, data)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                name = excluded.name,
-                updated_at = excluded.updated_at,
-                data = excluded.data
-        """, (pipeline_id, name, created_at, now, data_json))
-        await db.commit()
-    return {"id": pipeline_id, "name": name, "created_at": created_at, "updated_at": now}
+async def close_db():
+    """Close every pooled connection (app shutdown; call flush_saves() first)."""
+    global _WRITER, _WRITE_LOCK, _READERS, _FLUSH_TIMER
+    async with _OPEN_LOCK:
+        if _FLUSH_TIMER is not None:
+            _FLUSH_TIMER.cancel()
+            _FLUSH_TIMER = None
+        if _WRITER is None:
+            return
+        while not _READERS.empty():
+            await _READERS.get_nowait().close()
+        await _WRITER.close()
+        _WRITER, _WRITE_LOCK, _READERS = None, None, None
+        _HEADS.clear()
+
+
+@asynccontextmanager
+async def _writer() -> AsyncIterator[aiosqlite.Connection]:
+    """The single writer connection; writes are serialised here instead of on SQLite's lock."""
+    if _WRITER is None:
+        await init_db()
+    async with _WRITE_LOCK:
+        try:
+            yield _WRITER
+        except BaseException:
+            await _WRITER.rollback()
+            raise
+
+
+@asynccontextmanager
+async def _reader() -> AsyncIterator[aiosqlite.Connection]:
+    if _READERS is None:
+        await init_db()
+    readers = _READERS
+    db = await readers.get()
+    try:
+        yield db
+    finally:
+        readers.put_nowait(db)
+
+
+# ─── Search index ─────────────────────────────────────────────────────────────
+
+# Free-text fields per node type (registry text/textarea fields), plus the LLM
+# system prompt, which the node edits inline rather than through the registry.
+_SEARCH_FIELDS = {
+    node_type: tuple(f["name"] for f in meta.get("fields", []) if f["type"] in ("text", "textarea"))
+    for node_type, meta in NODE_TYPE_META.items()
+}
+_SEARCH_FIELDS["llm"] += ("systemPrompt",)
+
 
+def searchable_text(nodes: Iterable[dict]) -> str:
+    """Node type labels and free-text field values of a saved pipeline, one per line."""
+    parts: List[str] = []
+    for node in nodes:
+        node_type = node.get("type")
+        meta = NODE_TYPE_META.get(node_type)
+        parts.append(meta["label"] if meta else str(node_type))
+        data = node.get("data") or {}
+        for field in _SEARCH_FIELDS.get(node_type, ()):
+            value = data.get(field)
+            if isinstance(value, str) and value:
+                parts.append(value)
+    return "\n".join(parts)
 
-async def list_pipelines() -> List[dict]:
-    """Return id, name, created_at, updated_at for all saved pipelines."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+
+async def _backfill_search_index(db: aiosqlite.Connection) -> None:
+    async with db.execute("SELECT rowid, name, data FROM pipelines") as cur:
+        async for row in cur:
+            nodes = storage_codec.decode(row[2]).get("nodes", [])
+            await db.execute(_SQL_FTS_UPSERT, (row[0], row[1], searchable_text(nodes)))
+
+
+async def _migrate_blobs(db: aiosqlite.Connection) -> None:
+    """
+    Rewrite rows stored in an older format (e.g. plain JSON text), one batch
+    per commit. PRAGMA user_version records the format the table was last
+    migrated to, so the scan runs once per FORMAT_VERSION, not every startup.
+    """
+    async with db.execute("PRAGMA user_version") as cur:
+        if (await cur.fetchone())[0] >= storage_codec.FORMAT_VERSION:
+            return
+    last_rowid = 0
+    while True:
         async with db.execute(
-            "SELECT id, name, created_at, updated_at FROM pipelines ORDER BY updated_at DESC"
+            "SELECT rowid, data FROM pipelines WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, MIGRATION_BATCH),
         ) as cur:
             rows = await cur.fetchall()
+        if not rows:
+            await db.execute(f"PRAGMA user_version = {storage_codec.FORMAT_VERSION}")
+            await db.commit()
+            return
+        stale = [(storage_codec.migrate_row(data), rowid) for rowid, data in rows if not storage_codec.is_current(data)]
+        if stale:
+            await db.executemany("UPDATE pipelines SET data = ? WHERE rowid = ?", stale)
+            await db.commit()
+        last_rowid = rows[-1][0]
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _match_query(query: str) -> Optional[str]:
+    """
+    Turn free user input into an FTS5 query: every word must match, the last
+    one as a prefix (search-as-you-type). Quoting each token keeps FTS5
+    operators and punctuation in the input from being interpreted.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    quoted = ['"%s"' % t for t in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+async def search_pipelines(query: str, limit: int, offset: int = 0) -> List[dict]:
+    """Best matches first: id, name, timestamps, a highlighted snippet and the bm25 score."""
+    match = _match_query(query)
+    if match is None:
+        return []
+    await _settle()
+    async with _reader() as db:
+        async with db.execute(_SQL_SEARCH, (match, limit, offset)) as cur:
+            rows = await cur.fetchall()
     return [dict(r) for r in rows]
 
 
+# ─── Save queue ───────────────────────────────────────────────────────────────
+
+class _PendingSave:
+    __slots__ = ("name", "nodes", "edges", "created_at", "updated_at", "waiters")
+
+    def __init__(self, name: str, nodes: list, edges: list, created_at: Optional[str], updated_at: str):
+        self.name, self.nodes, self.edges = name, nodes, edges
+        self.created_at, self.updated_at = created_at, updated_at
+        self.waiters: List[asyncio.Future] = []
+
+
+async def save_pipeline(pipeline_id: str, name: str, nodes: list, edges: list, durable: bool = False) -> dict:
+    """
+    Queue a save. Saves of the same pipeline within COALESCE_WINDOW collapse
+    into one write, and everything queued is written in a single transaction.
+    With durable=True, wait for the commit and return the stored record;
+    otherwise return as soon as the save is queued, with the same keys and
+    queued=True: rev is None until the write lands, and so is created_at
+    unless an earlier save of the pipeline is still queued or being written.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    # No await until the save is queued: a concurrent save must find it in _PENDING
+    superseded = _PENDING.get(pipeline_id)
+    earlier = superseded or _FLUSHING.get(pipeline_id)
+    save = _PendingSave(name, nodes, edges, earlier.created_at if earlier else None, now)
+    if superseded is not None:
+        save.waiters = superseded.waiters
+    _PENDING[pipeline_id] = save
+    waiter = None
+    if durable:
+        waiter = asyncio.get_running_loop().create_future()
+        save.waiters.append(waiter)
+    if len(_PENDING) >= MAX_PENDING:
+        await flush_saves()
+    else:
+        _schedule_flush()
+    if waiter is not None:
+        return await waiter
+    return {"id": pipeline_id, "name": name, "created_at": save.created_at, "updated_at": now, "rev": None, "queued": True}
+
+
+def _schedule_flush(delay: float = COALESCE_WINDOW) -> None:
+    global _FLUSH_TIMER
+    if _FLUSH_TIMER is None:
+        _FLUSH_TIMER = asyncio.get_running_loop().create_task(_flush_later(delay))
+
+
+async def _flush_later(delay: float) -> None:
+    global _FLUSH_TIMER
+    await asyncio.sleep(delay)
+    _FLUSH_TIMER = None         # saves queued from here on get a new window
+    await flush_saves()
+
+
+async def flush_saves() -> None:
+    """
+    Write every queued save in one transaction. Durable waiters get their
+    record or the error; after a failure, every save also goes back on the
+    queue (unless superseded) and a retry is scheduled with backoff, so a
+    queued edit that inherited a durable waiter is not lost with it.
+    """
+    global _RETRY_DELAY
+    async with _FLUSH_LOCK:
+        if not _PENDING:
+            return
+        batch = list(_PENDING.items())
+        _PENDING.clear()
+        _FLUSHING.update(batch)
+        try:
+            records = await _write_saves(batch)
+        except Exception as exc:
+            for pipeline_id, save in batch:
+                for waiter in save.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(exc)
+                save.waiters = []
+                _PENDING.setdefault(pipeline_id, save)
+            if _PENDING:
+                _schedule_flush(_RETRY_DELAY)
+                _RETRY_DELAY = min(_RETRY_DELAY * 2, MAX_RETRY_DELAY)
+            return
+        finally:
+            _FLUSHING.clear()
+        _RETRY_DELAY = COALESCE_WINDOW
+        for (_, save), record in zip(batch, records):
+            for waiter in save.waiters:
+                if not waiter.done():
+                    waiter.set_result(record)
+
+
+async def _settle(pipeline_id: Optional[str] = None) -> None:
+    """Read-your-writes: flush first if a queued or in-flight save could make this read stale."""
+    if _FLUSH_LOCK.locked() or (pipeline_id in _PENDING if pipeline_id is not None else _PENDING):
+        await flush_saves()
+
+
+def _encode_graphs(graphs: List[Tuple[list, list]]) -> List[Tuple[dict, bytes, str]]:
+    """(canonical graph, stored blob, search text) for each (nodes, edges)."""
+    prepared = []
+    for nodes, edges in graphs:
+        graph = storage_codec.canonical_graph(nodes, edges)
+        prepared.append((graph, storage_codec.encode_value(graph), searchable_text(nodes)))
+    return prepared
+
+
+async def _encode_batch(graphs: List[Tuple[list, list]]) -> List[Tuple[dict, bytes, str]]:
+    if sum(len(nodes) + len(edges) for nodes, edges in graphs) >= OFFLOAD_ENCODE_ELEMENTS:
+        return await asyncio.to_thread(_encode_graphs, graphs)
+    return _encode_graphs(graphs)
+
+
+async def _write_row(
+    db: aiosqlite.Connection, pipeline_id: str, name: str, created_at: str, updated_at: str,
+    graph: dict, blob: bytes, body: str,
+) -> Tuple[int, str]:
+    """
+    Upsert one record (an existing row keeps its created_at) and append a
+    revision: a delta against the previous save, or a periodic snapshot.
+    Returns (rev, created_at).
+    """
+    rev = await _append_revision(db, pipeline_id, name, updated_at, graph, blob)
+    async with db.execute(_SQL_UPSERT, (pipeline_id, name, created_at, updated_at, blob)) as cur:
+        rowid, created_at = await cur.fetchone()
+    await db.execute(_SQL_FTS_UPSERT, (rowid, name, body))
+    return rev, created_at
+
+
+async def _write_saves(batch: List[Tuple[str, _PendingSave]]) -> List[dict]:
+    """Write a batch of queued saves in one transaction; returns the stored records."""
+    prepared = await _encode_batch([(save.nodes, save.edges) for _, save in batch])
+    records, heads = [], []
+    async with _writer() as db:
+        for (pipeline_id, save), (graph, blob, body) in zip(batch, prepared):
+            now = save.updated_at
+            rev, created_at = await _write_row(db, pipeline_id, save.name, save.created_at or now, now, graph, blob, body)
+            save.created_at = created_at        # saves queued behind this one inherit the stored value
+            records.append({"id": pipeline_id, "name": save.name, "created_at": created_at, "updated_at": now, "rev": rev})
+            heads.append((pipeline_id, rev, graph))
+        await db.commit()
+    for pipeline_id, rev, graph in heads:
+        pipeline_cache.invalidate(pipeline_id)
+        _HEADS[pipeline_id] = (rev, graph)
+        _HEADS.move_to_end(pipeline_id)
+    while len(_HEADS) > HEAD_CACHE_SIZE:
+        _HEADS.popitem(last=False)
+    return records
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+
+async def _append_revision(db: aiosqlite.Connection, pipeline_id: str, name: str, now: str, graph: dict, blob: bytes) -> int:
+    """Write the revision row for a save (called under the writer lock); returns its number."""
+    async with db.execute(_SQL_LAST_REVISION, (pipeline_id,)) as cur:
+        last = await cur.fetchone()
+    if last is None:
+        # First save, or a pipeline saved before history existed: start with a snapshot
+        await db.execute(_SQL_INSERT_REVISION, (pipeline_id, 1, 1, revisions.KIND_SNAPSHOT, name, now, blob))
+        return 1
+
+    last_rev, base_rev, last_name = last
+    cached = _HEADS.get(pipeline_id)
+    if cached is not None and cached[0] == last_rev:
+        previous = cached[1]
+    else:
+        async with db.execute(_SQL_HEAD_DATA, (pipeline_id,)) as cur:
+            row = await cur.fetchone()
+        previous = storage_codec.decode(row[0]) if row else None
+
+    delta = revisions.diff(previous, graph) if previous is not None else None
+    if delta == {} and name == last_name:
+        return last_rev
+
+    rev = last_rev + 1
+    if delta is not None and rev - base_rev < revisions.SNAPSHOT_EVERY:
+        delta_blob = storage_codec.encode_value(delta)
+        if len(delta_blob) <= revisions.MAX_DELTA_RATIO * len(blob):
+            await db.execute(_SQL_INSERT_REVISION, (pipeline_id, rev, base_rev, revisions.KIND_DELTA, name, now, delta_blob))
+            return rev
+    await db.execute(_SQL_INSERT_REVISION, (pipeline_id, rev, rev, revisions.KIND_SNAPSHOT, name, now, blob))
+    return rev
+
+
+async def list_revisions(pipeline_id: str, limit: int, before: Optional[int] = None) -> List[dict]:
+    """Newest-first revision metadata (rev, kind, name, created_at, stored bytes)."""
+    await _settle(pipeline_id)
+    async with _reader() as db:
+        async with db.execute(_SQL_LIST_REVISIONS, (pipeline_id, before or 2 ** 62, limit)) as cur:
+            rows = await cur.fetchall()
+    return [dict(r, kind="snapshot" if r["kind"] == revisions.KIND_SNAPSHOT else "delta") for r in rows]
+
+
+async def get_revision(pipeline_id: str, rev: int) -> Optional[dict]:
+    """Materialise one revision by replaying deltas from its snapshot. None if it does not exist."""
+    await _settle(pipeline_id)
+    async with _reader() as db:
+        async with db.execute(_SQL_REPLAY, (pipeline_id, rev)) as cur:
+            rows = await cur.fetchall()
+    if not rows:
+        return None
+    graph = storage_codec.decode(rows[0]["data"])
+    for row in rows[1:]:
+        graph = revisions.apply(graph, storage_codec.decode(row["data"]))
+    last = rows[-1]
+    return {"id": pipeline_id, "rev": rev, "name": last["name"], "created_at": last["created_at"], "data": graph}
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque keyset cursor pointing just past `row`."""
+    raw = json.dumps([row["updated_at"], row["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, pipeline_id = json.loads(raw)
+    except Exception as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if not isinstance(updated_at, str) or not isinstance(pipeline_id, str):
+        raise ValueError("Invalid cursor.")
+    return updated_at, pipeline_id
+
+
+def _like_prefix(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+async def iter_pipelines(
+    limit: int,
+    after: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    Yield up to `limit` records (id, name, created_at, updated_at), newest
+    first, starting after the `after` cursor. Rows are fetched in batches, so
+    memory stays flat however large the page is.
+    """
+    await _settle()
+    params: list = []
+    if after:
+        params.extend(decode_cursor(after))
+    if name_prefix:
+        params.append(_like_prefix(name_prefix))
+    params.append(limit)
+    async with _reader() as db:
+        async with db.execute(_SQL_LIST[bool(after), bool(name_prefix)], params) as cur:
+            async for row in cur:
+                yield dict(row)
+
+
 async def get_pipeline(pipeline_id: str) -> Optional[dict]:
     """Return the full pipeline (metadata + data). None if not found."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT id, name, created_at, updated_at, data FROM pipelines WHERE id = ?",
-            (pipeline_id,)
-        ) as cur:
+    cached = await load_pipeline(pipeline_id)
+    return pipeline_ir.loads(cached.body) if cached is not None else None
+
+
+async def get_pipeline_json(pipeline_id: str) -> Optional[bytes]:
+    """Same record as get_pipeline(), already serialised as a JSON response body."""
+    cached = await load_pipeline(pipeline_id)
+    return cached.body if cached is not None else None
+
+
+async def load_pipeline(pipeline_id: str):
+    """
+    The pipeline's response body, ETag and updated_at, through pipeline_cache.
+    On a miss the stored graph is decompressed and spliced into the body
+    as-is, never parsed. None if not found.
+    """
+    await _settle(pipeline_id)
+    cached = pipeline_cache.get(pipeline_id)
+    if cached is not None:
+        return cached
+    loaded_at = pipeline_cache.generation()
+    async with _reader() as db:
+        async with db.execute(_SQL_GET, (pipeline_id,)) as cur:
             row = await cur.fetchone()
     if not row:
         return None
-    r = dict(row)
-    r["data"] = json.loads(r["data"])
-    return r
+    return pipeline_cache.put(pipeline_id, row["updated_at"], _record_json(row), loaded_at)
+
+
+def _record_json(row: aiosqlite.Row) -> bytes:
+    """A pipelines row as a JSON object, with the stored graph spliced in as "data"."""
+    graph = storage_codec.decode_json(row["data"])
+    if isinstance(graph, str):
+        graph = graph.encode("utf-8")
+    meta = json.dumps(
+        {key: row[key] for key in ("id", "name", "created_at", "updated_at")},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    return meta[:-1] + b',"data":' + bytes(graph) + b"}"
 
 
 async def delete_pipeline(pipeline_id: str) -> bool:
     """Delete a pipeline. Returns True if a row was deleted."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cur = await db.execute("DELETE FROM pipelines WHERE id = ?", (pipeline_id,))
+    await _settle(pipeline_id)       # a queued save must not resurrect it afterwards
+    async with _writer() as db:
+        async with db.execute(_SQL_DELETE, (pipeline_id,)) as cur:
+            row = await cur.fetchone()
+        if row is not None:
+            await db.execute(_SQL_FTS_DELETE, (row[0],))
+        await db.execute(_SQL_DELETE_REVISIONS, (pipeline_id,))
+        await db.commit()
+    pipeline_cache.invalidate(pipeline_id)
+    _HEADS.pop(pipeline_id, None)
+    return row is not None
+
+
+# ─── Bulk export / import ─────────────────────────────────────────────────────
+
+async def export_pipelines() -> AsyncIterator[bytes]:
+    """
+    Every pipeline as NDJSON, one GET /saved/{id} body per line, read straight
+    off a cursor and yielded in ~EXPORT_CHUNK_BYTES chunks.
+    """
+    await _settle()
+    async with _reader() as db:
+        async with db.execute(_SQL_EXPORT) as cur:
+            chunk: List[bytes] = []
+            size = 0
+            async for row in cur:
+                line = _record_json(row) + b"\n"
+                chunk.append(line)
+                size += len(line)
+                if size >= EXPORT_CHUNK_BYTES:
+                    yield b"".join(chunk)
+                    chunk, size = [], 0
+            if chunk:
+                yield b"".join(chunk)
+
+
+async def import_pipelines(batches: AsyncIterator[List[dict]], on_conflict: str = "skip") -> Dict[str, int]:
+    """
+    Write validated records (id, name, created_at, updated_at, nodes, edges),
+    one transaction per batch. An id that already exists is skipped, overwritten
+    (as a new revision, updated now and keeping its created_at) or imported
+    under a fresh id, per `on_conflict`.
+    Returns counts: imported, overwritten, renamed, skipped.
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}.")
+    await _settle()
+    counts = {"imported": 0, "overwritten": 0, "renamed": 0, "skipped": 0}
+    async for batch in batches:
+        if batch:
+            await _import_batch(batch, on_conflict, counts)
+    return counts
+
+
+async def _import_batch(batch: List[dict], on_conflict: str, counts: Dict[str, int]) -> None:
+    # Encoded before taking the writer, so saves are not held up by compression. The
+    # encoding does not depend on the id, so renamed records reuse it.
+    encoded = await _encode_batch([(r["nodes"], r["edges"]) for r in batch])
+    # Held across the existence check and the write, so a concurrent save cannot slip in between
+    async with _writer() as db:
+        ids = list({record["id"] for record in batch})
+        async with db.execute(
+            f"SELECT id FROM pipelines WHERE id IN ({','.join('?' * len(ids))})", ids,
+        ) as cur:
+            taken = {row[0] async for row in cur}
+
+        fresh, replace = [], []             # (record, encoded graph)
+        for record, prepared in zip(batch, encoded):
+            if record["id"] not in taken:
+                fresh.append((record, prepared))
+                counts["imported"] += 1
+            elif on_conflict == "skip":
+                counts["skipped"] += 1
+                continue
+            elif on_conflict == "rename":
+                record = dict(record, id=str(uuid.uuid4()))
+                fresh.append((record, prepared))
+                counts["renamed"] += 1
+            else:
+                replace.append((record, prepared))
+                counts["overwritten"] += 1
+            taken.add(record["id"])     # a later line with the same id is a conflict too
+
+        now = datetime.now(timezone.utc).isoformat()
+        new_rows, revision_rows = [], []
+        for record, (_, blob, _) in fresh:
+            updated_at = record.get("updated_at") or now
+            created_at = record.get("created_at") or updated_at
+            new_rows.append((record["id"], record["name"], created_at, updated_at, blob))
+            revision_rows.append((record["id"], 1, 1, revisions.KIND_SNAPSHOT, record["name"], updated_at, blob))
+        # New ids need no diffing, so they go in with bulk statements
+        await db.executemany(_SQL_INSERT_NEW, new_rows)
+        await db.executemany(_SQL_INSERT_REVISION, revision_rows)
+        if fresh:
+            new_ids = [record["id"] for record, _ in fresh]
+            async with db.execute(
+                f"SELECT id, rowid FROM pipelines WHERE id IN ({','.join('?' * len(new_ids))})", new_ids,
+            ) as cur:
+                rowids = {row[0]: row[1] async for row in cur}
+            await db.executemany(_SQL_FTS_UPSERT, [
+                (rowids[record["id"]], record["name"], body) for record, (_, _, body) in fresh
+            ])
+        # An overwrite is a new version of a live pipeline: stamp it now, since
+        # updated_at keys the response cache's ETag and the compiled-plan cache
+        for record, (graph, blob, body) in replace:
+            await _write_row(db, record["id"], record["name"], now, now, graph, blob, body)
         await db.commit()
-        return cur.rowcount > 0
+    for record, _ in replace:
+        pipeline_cache.invalidate(record["id"])
+        _HEADS.pop(record["id"], None)
@@ -0,0 +1,60 @@
+# services/plan_cache.py — Compiled execution plans for saved pipelines, keyed by (id, updated_at)
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from domain import pipeline_ir
+from services import pipeline_store
+from services.execution_service import ExecutionPlan, build_plan
+
+MAX_ENTRIES = 64
+OFFLOAD_ELEMENTS = 1500     # nodes + edges; bigger graphs are decoded and compiled off the event loop
+
+# pipeline id → (updated_at, plan)  (LRU). A save changes updated_at, so a stale plan is never served.
+_PLANS: "OrderedDict[str, Tuple[str, ExecutionPlan]]" = OrderedDict()
+_STATS = {"hits": 0, "misses": 0}
+
+
+def _compile(body: bytes) -> ExecutionPlan:
+    data = pipeline_ir.loads(body)["data"]
+    nodes = [pipeline_ir.decode_node(n) for n in data.get("nodes", [])]
+    edges = [pipeline_ir.decode_edge(e) for e in data.get("edges", [])]
+    return build_plan(nodes, edges)
+
+
+async def get_plan(pipeline_id: str) -> Optional[ExecutionPlan]:
+    """
+    The saved pipeline's current plan, compiled on first use of each version.
+    None if the pipeline does not exist; raises PlanError if it cannot run.
+    """
+    cached = await pipeline_store.load_pipeline(pipeline_id)
+    if cached is None:
+        _PLANS.pop(pipeline_id, None)
+        return None
+    entry = _PLANS.get(pipeline_id)
+    if entry is not None and entry[0] == cached.updated_at:
+        _PLANS.move_to_end(pipeline_id)
+        _STATS["hits"] += 1
+        return entry[1]
+
+    _STATS["misses"] += 1
+    # The stored body is ~100 bytes per element; a cheap size check decides where to compile
+    if len(cached.body) > OFFLOAD_ELEMENTS * 100:
+        plan = await run_in_threadpool(_compile, cached.body)
+    else:
+        plan = _compile(cached.body)
+    _PLANS[pipeline_id] = (cached.updated_at, plan)
+    _PLANS.move_to_end(pipeline_id)
+    while len(_PLANS) > MAX_ENTRIES:
+        _PLANS.popitem(last=False)
+    return plan
+
+
+def get_stats() -> dict:
+    return {"entries": len(_PLANS), "max_entries": MAX_ENTRIES, **_STATS}
+
+
+def clear() -> None:
+    _PLANS.clear()
+    _STATS["hits"] = _STATS["misses"] = 0
@@ -0,0 +1,312 @@
+# services/run_history.py — Persisted run timelines, written behind the execution engine
+import asyncio
+import time
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from services import pipeline_store
+
+QUEUE_SIZE = 50_000         # buffered rows; beyond this, rows are dropped rather than slowing a run
+BATCH_ROWS = 1000           # rows per transaction
+FLUSH_INTERVAL = 0.5        # seconds the writer waits to fill a batch
+RESULT_CHARS = 500          # node result preview kept per event
+STATS_MAX_RUNS = 1000
+
+# Recorded run statuses; "running" rows whose stream ended without a terminal event become "aborted"
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_ABORTED = "aborted"
+
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+)
+
+_SQL_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id      TEXT PRIMARY KEY,
+        pipeline_id TEXT,
+        status      TEXT NOT NULL,
+        started_at  REAL NOT NULL,
+        finished_at REAL,
+        error       TEXT,
+        cost        REAL NOT NULL DEFAULT 0,
+        tokens_in   INTEGER NOT NULL DEFAULT 0,
+        tokens_out  INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_runs_pipeline ON runs (pipeline_id, started_at DESC)",
+    """
+    CREATE TABLE IF NOT EXISTS run_node_events (
+        run_id      TEXT NOT NULL,
+        at          REAL NOT NULL,
+        event       TEXT NOT NULL,
+        node_id     TEXT,
+        node_type   TEXT,
+        duration_ms REAL,
+        cost        REAL,
+        tokens_in   INTEGER,
+        tokens_out  INTEGER,
+        detail      TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_run_events_run ON run_node_events (run_id)",
+)
+
+# Queue items are (kind, params); consecutive items of one kind share an executemany
+_SQL_WRITE = {
+    "start": """
+        INSERT INTO runs (run_id, pipeline_id, status, started_at) VALUES (?, ?, 'running', ?)
+        ON CONFLICT(run_id) DO UPDATE SET status = 'running', finished_at = NULL, error = NULL
+    """,
+    "event": "INSERT INTO run_node_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "end": """
+        UPDATE runs SET status = ?, finished_at = ?, error = ?,
+            cost = cost + ?, tokens_in = tokens_in + ?, tokens_out = tokens_out + ?
+        WHERE run_id = ?
+    """,
+}
+_SQL_GET_RUN = "SELECT * FROM runs WHERE run_id = ?"
+_SQL_TIMELINE = """
+    SELECT at, event, node_id, node_type, duration_ms, cost, tokens_in, tokens_out, detail
+    FROM run_node_events WHERE run_id = ? ORDER BY rowid
+"""
+_SQL_LIST_RUNS = "SELECT * FROM runs WHERE pipeline_id = ? ORDER BY started_at DESC LIMIT ?"
+_SQL_NODE_SAMPLES = """
+    SELECT e.node_id, e.node_type, e.duration_ms, e.cost
+    FROM run_node_events e
+    JOIN (SELECT run_id FROM runs WHERE pipeline_id = ? ORDER BY started_at DESC LIMIT ?) r USING (run_id)
+    WHERE e.event = 'node_complete'
+"""
+
+_QUEUE: Optional["asyncio.Queue[Tuple[str, Any]]"] = None
+_TASK: Optional[asyncio.Task] = None
+_DB: Optional[aiosqlite.Connection] = None
+_OPEN_LOCK = asyncio.Lock()
+_STATS = {"written": 0, "dropped": 0}
+
+
+# ─── Recording (execution hot path) ───────────────────────────────────────────
+
+class RunRecorder:
+    """Turns one execution stream's events into queued rows. Never awaits."""
+
+    __slots__ = ("run_id", "node_types", "cost", "tokens_in", "tokens_out", "finished")
+
+    def __init__(self, run_id: str, pipeline_id: Optional[str]):
+        self.run_id = run_id
+        self.node_types: Dict[str, str] = {}
+        self.cost = 0.0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.finished = False
+        _enqueue("start", (run_id, pipeline_id, time.time()))
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        kind = event.get("event")
+        if kind == "node_start":
+            self.node_types[event["node_id"]] = event.get("node_type")
+            self._row(kind, event["node_id"])
+        elif kind == "node_complete":
+            metrics = event.get("metrics") or {}
+            cost = metrics.get("cost") or 0.0
+            tokens_in = metrics.get("tokens_in") or 0
+            tokens_out = metrics.get("tokens_out") or 0
+            self.cost += cost
+            self.tokens_in += tokens_in
+            self.tokens_out += tokens_out
+            node_id = event["node_id"]
+            self._row(kind, node_id, metrics.get("duration_ms"), cost, tokens_in, tokens_out,
+                      (event.get("result") or "")[:RESULT_CHARS])
+            self.node_types.pop(node_id, None)
+        elif kind == "node_paused":
+            self._row(kind, event.get("node_id"))
+            self._finish(STATUS_PAUSED)
+        elif kind == "error":
+            # The node that was running, if any, is the one that failed
+            node_id = next(reversed(self.node_types), None) if self.node_types else None
+            self._row(kind, node_id, detail=event.get("message"))
+            self._finish(STATUS_FAILED, event.get("message"))
+        elif kind == "pipeline_complete":
+            self._finish(STATUS_COMPLETED)
+
+    def close(self) -> None:
+        """End of stream: a run that never reached a terminal event was cut off."""
+        if not self.finished:
+            self._finish(STATUS_ABORTED)
+
+    def _row(self, kind: str, node_id: Optional[str], duration_ms: Optional[float] = None,
+             cost: Optional[float] = None, tokens_in: Optional[int] = None, tokens_out: Optional[int] = None,
+             detail: Optional[str] = None) -> None:
+        _enqueue("event", (self.run_id, time.time(), kind, node_id, self.node_types.get(node_id),
+                           duration_ms, cost, tokens_in, tokens_out, detail))
+
+    def _finish(self, status: str, error: Optional[str] = None) -> None:
+        self.finished = True
+        _enqueue("end", (status, time.time(), error, self.cost, self.tokens_in, self.tokens_out, self.run_id))
+
+
+def _enqueue(kind: str, params: Any) -> None:
+    global _QUEUE, _TASK
+    if _QUEUE is None:
+        _QUEUE = asyncio.Queue(QUEUE_SIZE)
+    if _TASK is None:
+        _TASK = asyncio.get_running_loop().create_task(_writer_loop())
+    try:
+        _QUEUE.put_nowait((kind, params))
+    except asyncio.QueueFull:
+        _STATS["dropped"] += 1
+
+
+# ─── Background writer ────────────────────────────────────────────────────────
+
+async def _open() -> aiosqlite.Connection:
+    # Own connection to the pipeline database; WAL and busy_timeout let it share the file with pipeline_store
+    db = await aiosqlite.connect(pipeline_store.DB_PATH)
+    db.row_factory = aiosqlite.Row
+    for pragma in _PRAGMAS:
+        await db.execute(pragma)
+    for statement in _SQL_SCHEMA:
+        await db.execute(statement)
+    await db.commit()
+    return db
+
+
+async def _connection() -> aiosqlite.Connection:
+    global _DB
+    async with _OPEN_LOCK:
+        if _DB is None:
+            _DB = await _open()
+    return _DB
+
+
+async def _writer_loop() -> None:
+    queue = _QUEUE
+    while True:
+        batch = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + FLUSH_INTERVAL
+        while len(batch) < BATCH_ROWS and batch[-1][0] != "flush":
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        await _write(batch)
+
+
+async def _write(batch: List[Tuple[str, Any]]) -> None:
+    waiters = [params for kind, params in batch if kind == "flush"]
+    rows = [item for item in batch if item[0] != "flush"]
+    try:
+        if rows:
+            db = await _connection()
+            for kind, group in groupby(rows, key=lambda item: item[0]):
+                await db.executemany(_SQL_WRITE[kind], [params for _, params in group])
+            await db.commit()
+            _STATS["written"] += len(rows)
+    except Exception:
+        _STATS["dropped"] += len(rows)     # history is best-effort; the writer keeps going
+    for waiter in waiters:
+        if not waiter.done():
+            waiter.set_result(None)
+
+
+async def flush() -> None:
+    """Wait until everything queued so far is on disk."""
+    if _TASK is None:
+        return
+    waiter = asyncio.get_running_loop().create_future()
+    await _QUEUE.put(("flush", waiter))
+    await waiter
+
+
+async def stop() -> None:
+    """Write what is queued and close the connection (app shutdown)."""
+    global _QUEUE, _TASK, _DB
+    if _TASK is not None:
+        await flush()
+        _TASK.cancel()
+    if _DB is not None:
+        await _DB.close()
+    _QUEUE, _TASK, _DB = None, None, None
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+
+async def get_run(run_id: str) -> Optional[dict]:
+    """A run's summary plus its node event timeline (oldest first). None if unknown."""
+    await flush()
+    db = await _connection()
+    async with db.execute(_SQL_GET_RUN, (run_id,)) as cur:
+        row = await cur.fetchone()
+    if row is None:
+        return None
+    async with db.execute(_SQL_TIMELINE, (run_id,)) as cur:
+        events = [dict(r) for r in await cur.fetchall()]
+    return {**dict(row), "events": events}
+
+
+async def list_runs(pipeline_id: str, limit: int) -> List[dict]:
+    """Newest-first run summaries for a saved pipeline."""
+    await flush()
+    db = await _connection()
+    async with db.execute(_SQL_LIST_RUNS, (pipeline_id, limit)) as cur:
+        return [dict(r) for r in await cur.fetchall()]
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not ordered:
+        return None
+    pos = (len(ordered) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+async def node_stats(pipeline_id: str, last_runs: int = 100) -> List[dict]:
+    """
+    Per node over the pipeline's `last_runs` most recent runs: completion
+    count, p50/p90/p99 latency and cost, and total cost. Slowest p90 first.
+    """
+    await flush()
+    db = await _connection()
+    samples: Dict[str, Tuple[Optional[str], List[float], List[float]]] = {}
+    async with db.execute(_SQL_NODE_SAMPLES, (pipeline_id, min(last_runs, STATS_MAX_RUNS))) as cur:
+        async for node_id, node_type, duration_ms, cost in cur:
+            _, durations, costs = samples.setdefault(node_id, (node_type, [], []))
+            if duration_ms is not None:
+                durations.append(duration_ms)
+            costs.append(cost or 0.0)
+
+    stats = []
+    for node_id, (node_type, durations, costs) in samples.items():
+        durations.sort()
+        costs.sort()
+        stats.append({
+            "node_id": node_id,
+            "node_type": node_type,
+            "runs": len(costs),
+            "latency_ms": {f"p{int(q * 100)}": _percentile(durations, q) for q in (0.5, 0.9, 0.99)},
+            "cost": {f"p{int(q * 100)}": _percentile(costs, q) for q in (0.5, 0.9, 0.99)},
+            "total_cost": sum(costs),
+        })
+    stats.sort(key=lambda s: s["latency_ms"]["p90"] or 0.0, reverse=True)
+    return stats
+
+
+def get_stats() -> dict:
+    return {"queued": _QUEUE.qsize() if _QUEUE is not None else 0, **_STATS}
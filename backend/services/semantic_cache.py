@@ -0,0 +1,194 @@
+# services/semantic_cache.py — Opt-in semantic response cache for LLM-backed nodes
+import hashlib
+import math
+import re
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# ─── Tunables ─────────────────────────────────────────────────────────────────
+
+DEFAULT_THRESHOLD = 0.95     # cosine similarity required for a hit
+MIN_THRESHOLD = 0.9          # hashed bag-of-words similarity below this matches unrelated prompts
+EMBED_DIM = 1 << 18          # hashed feature space
+MAX_PARTITIONS = 512         # distinct (API key, node type, model, system prompt, params) buckets
+MAX_ENTRIES_PER_PARTITION = 256
+MAX_NODE_STATS = 1024        # nodes whose hit/miss counters are kept
+CHUNK_WORDS = 4              # words per replayed node_chunk on a cache hit
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# partition key → OrderedDict[exact text hash → _Entry]  (both kept in LRU order)
+_INDEX: "OrderedDict[str, OrderedDict[str, _Entry]]" = OrderedDict()
+
+# node_id → {"hits": int, "misses": int}  (LRU)
+_NODE_STATS: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+
+
+class _Entry:
+    __slots__ = ("vector", "norm_text", "value")
+
+    def __init__(self, vector: Dict[int, float], norm_text: str, value: Any):
+        self.vector = vector
+        self.norm_text = norm_text
+        self.value = value
+
+
+# ─── Helpers ──────────────────────────────────────────────────────────────────
+
+def is_enabled(data: dict) -> bool:
+    """True if the node opted in via data.semanticCache ('On' / true)."""
+    flag = data.get("semanticCache", False)
+    if isinstance(flag, str):
+        return flag.strip().lower() in ("on", "true", "yes", "1")
+    return bool(flag)
+
+
+def get_threshold(data: dict) -> float:
+    """Read data.cacheThreshold, clamped to [MIN_THRESHOLD, 1.0]."""
+    try:
+        threshold = float(data.get("cacheThreshold", DEFAULT_THRESHOLD) or DEFAULT_THRESHOLD)
+    except (TypeError, ValueError):
+        threshold = DEFAULT_THRESHOLD
+    return min(1.0, max(MIN_THRESHOLD, threshold))
+
+
+def normalize(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different prompts coincide."""
+    return " ".join((text or "").lower().split())
+
+
+def partition_key(api_key: str, node_type: str, model: str, system_prompt: str, *params: Any) -> str:
+    """
+    Stable key for everything that must match exactly for a cached answer to
+    be reusable. The cache is process-wide, so answers are scoped to the
+    caller's API key (by digest; the key itself is never kept).
+    """
+    key_digest = hashlib.sha1(api_key.encode("utf-8")).hexdigest()
+    raw = "\x1f".join([key_digest, node_type, model, normalize(system_prompt)] + [str(p) for p in params])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def embed(norm_text: str) -> Dict[int, float]:
+    """
+    Local, dependency-free embedding: L2-normalised hashed bag of word
+    unigrams, word bigrams and character trigrams.
+    """
+    vec: Dict[int, float] = {}
+    words = _TOKEN_RE.findall(norm_text)
+    features: List[str] = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    padded = f" {norm_text} "
+    features.extend("#" + padded[i:i + 3] for i in range(len(padded) - 2))
+    for feat in features:
+        idx = zlib.crc32(feat.encode("utf-8")) & (EMBED_DIM - 1)
+        vec[idx] = vec.get(idx, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if norm:
+        for k in vec:
+            vec[k] /= norm
+    return vec
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(k, 0.0) for k, w in a.items())
+
+
+def _record(node_id: str, hit: bool) -> None:
+    stats = _NODE_STATS.get(node_id)
+    if stats is None:
+        stats = _NODE_STATS[node_id] = {"hits": 0, "misses": 0}
+        while len(_NODE_STATS) > MAX_NODE_STATS:
+            _NODE_STATS.popitem(last=False)
+    else:
+        _NODE_STATS.move_to_end(node_id)
+    stats["hits" if hit else "misses"] += 1
+
+
+# ─── Public API ───────────────────────────────────────────────────────────────
+
+def lookup(node_id: str, partition: str, text: str, threshold: float) -> Tuple[Optional[Any], float]:
+    """
+    Return (cached_value, similarity) for the nearest stored prompt in the
+    partition, or (None, best_similarity) when nothing clears the threshold.
+    """
+    bucket = _INDEX.get(partition)
+    if not bucket:
+        _record(node_id, False)
+        return None, 0.0
+    _INDEX.move_to_end(partition)
+
+    norm_text = normalize(text)
+    exact_key = hashlib.sha1(norm_text.encode("utf-8")).hexdigest()
+    entry = bucket.get(exact_key)
+    if entry is not None:
+        bucket.move_to_end(exact_key)
+        _record(node_id, True)
+        return entry.value, 1.0
+
+    query = embed(norm_text)
+    best_key, best_sim = None, 0.0
+    for key, candidate in bucket.items():
+        sim = _cosine(query, candidate.vector)
+        if sim > best_sim:
+            best_key, best_sim = key, sim
+    if best_key is not None and best_sim >= threshold:
+        bucket.move_to_end(best_key)
+        _record(node_id, True)
+        return bucket[best_key].value, best_sim
+
+    _record(node_id, False)
+    return None, best_sim
+
+
+def store(partition: str, text: str, value: Any) -> None:
+    """Insert a completion, evicting the least-recently-used entries when full."""
+    norm_text = normalize(text)
+    exact_key = hashlib.sha1(norm_text.encode("utf-8")).hexdigest()
+    bucket = _INDEX.get(partition)
+    if bucket is None:
+        bucket = _INDEX[partition] = OrderedDict()
+        while len(_INDEX) > MAX_PARTITIONS:
+            _INDEX.popitem(last=False)
+    _INDEX.move_to_end(partition)
+    bucket[exact_key] = _Entry(embed(norm_text), norm_text, value)
+    bucket.move_to_end(exact_key)
+    while len(bucket) > MAX_ENTRIES_PER_PARTITION:
+        bucket.popitem(last=False)
+
+
+def iter_chunks(text: str, words_per_chunk: int = CHUNK_WORDS) -> Iterator[str]:
+    """Split a cached completion into stream-sized pieces (whitespace preserved)."""
+    pieces = re.split(r"(\s+)", text)
+    buf: List[str] = []
+    words = 0
+    for piece in pieces:
+        buf.append(piece)
+        if piece and not piece.isspace():
+            words += 1
+            if words >= words_per_chunk:
+                yield "".join(buf)
+                buf, words = [], 0
+    if buf and "".join(buf):
+        yield "".join(buf)
+
+
+def get_stats() -> dict:
+    """Per-node hit/miss counters plus index occupancy."""
+    nodes = {}
+    for node_id, s in _NODE_STATS.items():
+        total = s["hits"] + s["misses"]
+        nodes[node_id] = {**s, "hit_rate": round(s["hits"] / total, 4) if total else 0.0}
+    return {
+        "partitions": len(_INDEX),
+        "entries": sum(len(b) for b in _INDEX.values()),
+        "nodes": nodes,
+    }
+
+
+def clear() -> None:
+    """Drop all cached completions and counters."""
+    _INDEX.clear()
+    _NODE_STATS.clear()
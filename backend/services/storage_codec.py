@@ -0,0 +1,117 @@
+# services/storage_codec.py — Versioned, compressed on-disk format for saved pipeline graphs
+import json
+import zlib
+from typing import Any, Dict, List, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Blob layout: MAGIC, format version, compression id, payload.
+# Rows written before the codec existed hold plain JSON TEXT ("version 0").
+MAGIC = b"\xfbP"
+FORMAT_VERSION = 1
+
+_ZLIB = 1
+_ZSTD = 2
+ZLIB_LEVEL = 3          # on a 1.4 MB graph: level 6 is 3x slower to write for blobs ~20% smaller
+ZSTD_LEVEL = 3
+
+# Canvas state that means nothing once the pipeline is closed
+TRANSIENT_NODE_FIELDS = ("selected", "dragging", "positionAbsolute")
+POSITION_DECIMALS = 2
+
+if zstandard is not None:
+    _zstd_compress = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress
+    _zstd_decompress = zstandard.ZstdDecompressor().decompress
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(raw: Union[bytes, str]) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+# ─── Canonical form ───────────────────────────────────────────────────────────
+
+def canonical_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop transient UI fields and unset (None) values; round positions."""
+    out = {key: value for key, value in node.items() if value is not None and key not in TRANSIENT_NODE_FIELDS}
+    position = out.get("position")
+    if isinstance(position, dict):
+        out["position"] = {
+            axis: round(v, POSITION_DECIMALS) if isinstance(v, float) else v for axis, v in position.items()
+        }
+    return out
+
+
+def canonical_edge(edge: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset (None) values."""
+    return {key: value for key, value in edge.items() if value is not None}
+
+
+# ─── Encode / decode ──────────────────────────────────────────────────────────
+
+def canonical_graph(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"nodes": [canonical_node(n) for n in nodes], "edges": [canonical_edge(e) for e in edges]}
+
+
+def encode(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> bytes:
+    """Canonicalise and compress a graph into a versioned blob."""
+    return encode_value(canonical_graph(nodes, edges))
+
+
+def encode_value(value: Any) -> bytes:
+    """Compress any JSON value (a canonical graph, a revision delta) into a versioned blob."""
+    payload = _dumps(value)
+    if zstandard is not None:
+        return MAGIC + bytes((FORMAT_VERSION, _ZSTD)) + _zstd_compress(payload)
+    return MAGIC + bytes((FORMAT_VERSION, _ZLIB)) + zlib.compress(payload, ZLIB_LEVEL)
+
+
+def decode(stored: Union[bytes, str]) -> Any:
+    """The stored value ({"nodes": [...], "edges": [...]} for graphs) from a blob of any format version."""
+    return _loads(decode_json(stored))
+
+
+def decode_json(stored: Union[bytes, str]) -> Union[bytes, str]:
+    """The graph as JSON text, without parsing it — for splicing into a response body."""
+    if isinstance(stored, str):
+        return stored                               # version 0: plain JSON text
+    version, compression, body = _split(stored)
+    if compression == _ZLIB:
+        return zlib.decompress(body)
+    if compression == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Pipeline was stored with zstd, but the zstandard package is not installed.")
+        return _zstd_decompress(body)
+    raise ValueError(f"Unknown pipeline blob compression id {compression} (format v{version}).")
+
+
+def is_current(stored: Union[bytes, str]) -> bool:
+    """False for rows that migrate_row() should rewrite."""
+    return isinstance(stored, bytes) and stored[:2] == MAGIC and stored[2] == FORMAT_VERSION
+
+
+def migrate_row(stored: Union[bytes, str]) -> bytes:
+    """Re-encode a blob of any older version in the current format."""
+    data = decode(stored)
+    return encode(data.get("nodes", []), data.get("edges", []))
+
+
+def _split(blob: bytes) -> Tuple[int, int, bytes]:
+    if blob[:2] != MAGIC or len(blob) < 4:
+        raise ValueError("Not a pipeline blob.")
+    if blob[2] > FORMAT_VERSION:
+        raise ValueError(f"Pipeline blob format v{blob[2]} is newer than this server (v{FORMAT_VERSION}).")
+    return blob[2], blob[3], memoryview(blob)[4:]
@@ -0,0 +1,122 @@
+# services/summarization.py — Chunked map-reduce summarisation for inputs larger than the model context
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+# (system_prompt, user_text) → (content, tokens_in, tokens_out)
+CompleteFn = Callable[[str, str], Awaitable[Tuple[str, int, int]]]
+
+CHARS_PER_TOKEN = 4          # conservative estimate for English text and code
+CONTEXT_FILL_RATIO = 0.5     # leave room for the system prompt and the completion
+MIN_CHUNK_TOKENS = 512
+MAX_CHUNK_TOKENS = 6000      # keeps each map call short even on very large-context models
+MAX_CONCURRENCY = 4          # bounded fan-out per summarizer node
+
+# Coarsest boundary first: paragraphs, lines, sentences, words
+_SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+MAP_SYSTEM = (
+    "You are summarizing one section of a longer document. Summarize this section faithfully "
+    "and concisely, keeping names, numbers and key facts. Output only the summary."
+)
+REDUCE_SYSTEM = (
+    "Combine these partial summaries of consecutive sections of one document into a single "
+    "coherent summary, keeping key facts. Output only the summary."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def chunk_budget(context_length: int) -> int:
+    """Tokens of input per map call for a model with the given context window."""
+    return max(MIN_CHUNK_TOKENS, min(MAX_CHUNK_TOKENS, int(context_length * CONTEXT_FILL_RATIO)))
+
+
+def needs_chunking(text: str, context_length: int) -> bool:
+    return estimate_tokens(text) > chunk_budget(context_length)
+
+
+def _split(text: str, max_chars: int, separators: List[str]) -> List[str]:
+    if len(text) <= max_chars:
+        return [text]
+    if not separators:
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+    sep, finer = separators[0], separators[1:]
+    chunks: List[str] = []
+    current = ""
+    for piece in text.split(sep):
+        candidate = piece if not current else current + sep + piece
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        if len(piece) > max_chars:
+            chunks.extend(_split(piece, max_chars, finer))
+            current = ""
+        else:
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Split at the coarsest natural boundary that keeps every chunk within max_tokens."""
+    return [c for c in _split(text, max_tokens * CHARS_PER_TOKEN, _SEPARATORS) if c.strip()]
+
+
+def _group(summaries: List[str], max_tokens: int) -> List[List[str]]:
+    """Pack consecutive summaries into groups whose joined size fits one reduce call."""
+    groups: List[List[str]] = []
+    size = 0
+    for s in summaries:
+        tokens = estimate_tokens(s)
+        if groups and size + tokens <= max_tokens:
+            groups[-1].append(s)
+            size += tokens
+        else:
+            groups.append([s])
+            size = tokens
+    if len(groups) == len(summaries):
+        # Every partial is too large to pair under budget — pair them anyway so each level halves.
+        groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+    return groups
+
+
+async def map_reduce_summarize(
+    complete: CompleteFn,
+    text: str,
+    final_system: str,
+    context_length: int,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> Tuple[str, int, int, int]:
+    """
+    Summarize each chunk concurrently, merge partial summaries level by level
+    until they fit one call, then apply the node's own style prompt.
+    Returns (summary, tokens_in, tokens_out, num_chunks).
+    """
+    budget = chunk_budget(context_length)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    totals = [0, 0]
+
+    async def run(system: str, user: str) -> str:
+        async with semaphore:
+            content, t_in, t_out = await complete(system, user)
+        totals[0] += t_in
+        totals[1] += t_out
+        return (content or "").strip()
+
+    async def reduce_group(group: List[str]) -> str:
+        return group[0] if len(group) == 1 else await run(REDUCE_SYSTEM, "\n\n".join(group))
+
+    chunks = split_text(text, budget)
+    level = list(await asyncio.gather(*(run(MAP_SYSTEM, c) for c in chunks)))
+
+    while len(level) > 1 and estimate_tokens("\n\n".join(level)) > budget:
+        level = list(await asyncio.gather(*(reduce_group(g) for g in _group(level, budget))))
+
+    summary = await run(final_system, "\n\n".join(level))
+    return summary, totals[0], totals[1], len(chunks)
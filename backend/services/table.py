@@ -0,0 +1,212 @@
+# services/table.py — Columnar NumPy table value for csvParser → calculator / filter data paths
+import ast
+import csv
+import io
+import json
+import operator
+import re
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from simpleeval import DEFAULT_OPERATORS, SimpleEval, safe_add, safe_mult, safe_power
+
+PREVIEW_ROWS = 20
+_IDENT_RE = re.compile(r"\W")
+
+
+def _identifier(name: str) -> str:
+    """Expression-safe variable name for a column header ('unit price' → 'unit_price')."""
+    ident = _IDENT_RE.sub("_", name.strip()) or "col"
+    return f"c_{ident}" if ident[0].isdigit() else ident
+
+
+class ColumnarTable:
+    """
+    Rectangular table held as one NumPy array per column.
+
+    Parsed columns keep their original text (so serialised output is byte-for-byte
+    what the CSV contained); numeric views are inferred on first use and cached.
+    Serialisation to the legacy {"rows": [...], "count": n} shape happens lazily.
+    """
+    __slots__ = ("names", "columns", "has_header", "_typed", "_json")
+
+    def __init__(self, names: List[str], columns: Dict[str, "np.ndarray"], has_header: bool = True):
+        self.names = names
+        self.columns = columns
+        self.has_header = has_header
+        self._typed: Dict[str, "np.ndarray"] = {}
+        self._json: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.columns[self.names[0]]) if self.names else 0
+
+    # ── Typed access ──────────────────────────────────────────────────────────
+
+    def typed(self, name: str) -> "np.ndarray":
+        """Column as int64/float64 when every value parses, else the original array."""
+        arr = self._typed.get(name)
+        if arr is None:
+            arr = self.columns[name]
+            if arr.dtype.kind == "U":
+                for dtype in (np.int64, np.float64):
+                    try:
+                        arr = arr.astype(dtype)
+                        break
+                    except (ValueError, OverflowError):
+                        continue
+            self._typed[name] = arr
+        return arr
+
+    def expression_names(self) -> "_ColumnNames":
+        """Typed columns keyed by identifier-safe names for simpleeval (typed only when referenced)."""
+        return _ColumnNames(self)
+
+    # ── Derivation ────────────────────────────────────────────────────────────
+
+    def with_column(self, name: str, values: "np.ndarray") -> "ColumnarTable":
+        names = self.names if name in self.columns else self.names + [name]
+        out = ColumnarTable(names, {**self.columns, name: values}, self.has_header)
+        out._typed = {k: v for k, v in self._typed.items() if k != name}
+        return out
+
+    def take(self, mask: "np.ndarray") -> "ColumnarTable":
+        out = ColumnarTable(self.names, {n: c[mask] for n, c in self.columns.items()}, self.has_header)
+        out._typed = {n: c[mask] for n, c in self._typed.items()}
+        return out
+
+    # ── Serialisation ─────────────────────────────────────────────────────────
+
+    def to_rows(self, limit: Optional[int] = None) -> list:
+        cols = [self.columns[n][:limit].tolist() for n in self.names]
+        if self.has_header:
+            return [dict(zip(self.names, vals)) for vals in zip(*cols)]
+        return [list(vals) for vals in zip(*cols)]
+
+    def to_json(self) -> str:
+        """Full {"rows", "count"} JSON — computed once, only when a consumer needs text."""
+        if self._json is None:
+            self._json = json.dumps({"rows": self.to_rows(), "count": len(self)})
+        return self._json
+
+    def preview_json(self) -> str:
+        """Cheap summary for node_complete events."""
+        n = len(self)
+        return json.dumps({
+            "columns": self.names, "count": n,
+            "rows": self.to_rows(PREVIEW_ROWS), "truncated": n > PREVIEW_ROWS,
+        })
+
+
+class _ColumnNames(dict):
+    """simpleeval names mapping that types a column the first time an expression reads it."""
+
+    def __init__(self, table: ColumnarTable):
+        super().__init__()
+        self._table = table
+        self._idents = {_identifier(n if table.has_header else f"col{n}"): n for n in table.names}
+
+    def __missing__(self, key: str) -> "np.ndarray":
+        name = self._idents[key]
+        value = self[key] = self._table.typed(name)
+        return value
+
+
+def parse_csv(text: str, delimiter: str, has_header: bool) -> Optional[ColumnarTable]:
+    """
+    Single streaming pass over the CSV into per-column buffers.
+    Returns None when the data is not rectangular (or NumPy is missing) so the
+    caller can fall back to the row-oriented representation.
+    """
+    if np is None:
+        return None
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+    header: Optional[List[str]] = None
+    if has_header:
+        header = next(reader, None)
+        if not header or len(set(header)) != len(header):
+            return None
+    buffers: Optional[List[List[str]]] = [[] for _ in header] if header else None
+    width = len(header) if header else -1
+    for row in reader:
+        if has_header and not row:
+            continue  # csv.DictReader skips blank lines too
+        if buffers is None:
+            width = len(row)
+            buffers = [[] for _ in row]
+        if len(row) != width:
+            return None
+        for buf, value in zip(buffers, row):
+            buf.append(value)
+    if not buffers or not buffers[0]:
+        return None
+    names = header if header else [str(i) for i in range(width)]
+    return ColumnarTable(names, {n: np.array(b, dtype=str) for n, b in zip(names, buffers)}, has_header)
+
+
+# ─── Vectorised expression evaluation ─────────────────────────────────────────
+
+def _elementwise(array_op, safe_op):
+    """
+    The raw operator when an operand is a column, else simpleeval's guarded one.
+    The safe_* guards call len()/abs() on operands, which is ambiguous for arrays;
+    array work is bounded by the column length, but scalar operands such as
+    9**9**8 or "x" * 10**9 must still be rejected.
+    """
+    def op(a, b):
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            return array_op(a, b)
+        return safe_op(a, b)
+    return op
+
+
+def _vector_operators() -> dict:
+    ops = dict(DEFAULT_OPERATORS)
+    ops.update({
+        ast.Add: _elementwise(operator.add, safe_add),
+        ast.Mult: _elementwise(operator.mul, safe_mult),
+        ast.Pow: _elementwise(operator.pow, safe_power),
+        ast.Not: lambda x: np.logical_not(x),
+    })
+    return ops
+
+
+class VectorEval(SimpleEval):
+    """simpleeval over whole NumPy columns: and/or/not, chained comparisons and if-else are element-wise."""
+
+    def __init__(self):
+        super().__init__(operators=_vector_operators(), functions={
+            "abs": np.abs, "round": np.round, "sqrt": np.sqrt, "log": np.log, "exp": np.exp,
+            "min": np.minimum, "max": np.maximum,
+            "float": lambda x: np.asarray(x, dtype=np.float64),
+            "int": lambda x: np.asarray(x, dtype=np.float64).astype(np.int64),
+        })
+
+    def _eval_boolop(self, node):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = self._eval(node.values[0])
+        for value in node.values[1:]:
+            result = combine(result, self._eval(value))
+        return result
+
+    def _eval_compare(self, node):
+        left = self._eval(node.left)
+        result = True
+        for op, comp in zip(node.ops, node.comparators):
+            right = self._eval(comp)
+            result = np.logical_and(result, self.operators[type(op)](left, right))
+            left = right
+        return result
+
+    def _eval_ifexp(self, node):
+        return np.where(self._eval(node.test), self._eval(node.body), self._eval(node.orelse))
+
+
+def to_python(value: Any) -> Any:
+    """Unwrap NumPy scalars so results stay JSON-serialisable."""
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    return value
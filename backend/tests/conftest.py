@@ -0,0 +1,5 @@
+# tests/conftest.py — Make the backend's top-level packages importable when pytest runs from any directory
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,31 @@
+# tests/test_graph_session.py — Sessions open on any graph /parse accepts
+from domain.pipeline_ir import Edge, Node
+from services.graph_service import analyze_pipeline
+from services.graph_session import open_session
+
+NODES = [
+    Node("in", "customInput", {"inputName": "q"}),
+    Node("t", "text", {"text": "{{q}}"}),
+    Node("in", "customInput", {"inputName": "renamed"}),     # duplicate id: last data wins
+    Node("out", "customOutput", {"outputName": "a"}),
+]
+EDGES = [
+    Edge("e1", "in", "t"),
+    Edge("e2", "t", "out"),
+    Edge("e3", "t", "missing"),         # dangling: dropped
+    Edge("e1", "t", "out"),             # repeated edge id: first kept
+]
+
+
+def test_dangling_edges_and_duplicate_ids_collapse_like_compact_graph():
+    metrics = open_session(NODES, EDGES).snapshot()["metrics"]
+    analysis = analyze_pipeline(NODES, EDGES)
+    assert metrics["num_nodes"] == len(analysis.graph) == 3
+    assert metrics["num_edges"] == analysis.graph.num_edges == 2
+    assert metrics["execution_plan"] == ["in", "t", "out"]
+
+
+def test_duplicate_node_keeps_first_position_and_last_data():
+    session = open_session(NODES, EDGES)
+    assert list(session.nodes) == ["in", "t", "out"]
+    assert session.nodes["in"].data == {"inputName": "renamed"}
@@ -0,0 +1,98 @@
+# tests/test_pipeline_revisions.py — diff/apply round-trips of revision deltas
+import copy
+import random
+
+import pytest
+
+from services import pipeline_revisions as revisions
+from services.storage_codec import canonical_graph
+
+
+def _node(node_id, text="hi", **extra):
+    return {"id": node_id, "type": "textInput", "position": {"x": 0, "y": 0}, "data": {"text": text}, **extra}
+
+
+def _edge(source, target):
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+BASE = canonical_graph(
+    [_node("a"), _node("b", width=120), _node("c")],
+    [_edge("a", "b"), _edge("b", "c")],
+)
+
+
+def _round_trip(old, new):
+    snapshot = copy.deepcopy(old)
+    delta = revisions.diff(old, new)
+    assert delta is not None
+    assert revisions.apply(old, delta) == new
+    assert old == snapshot                  # apply must not modify its input
+    return delta
+
+
+def test_equal_graphs_give_empty_delta():
+    assert _round_trip(BASE, copy.deepcopy(BASE)) == {}
+
+
+@pytest.mark.parametrize("new", [
+    pytest.param({"nodes": BASE["nodes"] + [_node("d")], "edges": BASE["edges"]}, id="add"),
+    pytest.param({"nodes": [BASE["nodes"][0], _node("b", "changed", width=120), BASE["nodes"][2]],
+                  "edges": BASE["edges"]}, id="patch"),
+    pytest.param({"nodes": [BASE["nodes"][0], _node("b"), BASE["nodes"][2]], "edges": BASE["edges"]},
+                 id="remove-key"),
+    pytest.param({"nodes": BASE["nodes"][:2], "edges": BASE["edges"][:1]}, id="remove"),
+    pytest.param({"nodes": list(reversed(BASE["nodes"])), "edges": BASE["edges"]}, id="reorder"),
+    pytest.param({"nodes": [_node("d"), BASE["nodes"][0]], "edges": []}, id="add-before-existing"),
+])
+def test_round_trip(new):
+    _round_trip(BASE, canonical_graph(new["nodes"], new["edges"]))
+
+
+def test_removed_key_is_patched_to_none():
+    new = {"nodes": [BASE["nodes"][0], _node("b"), BASE["nodes"][2]], "edges": BASE["edges"]}
+    delta = _round_trip(BASE, new)
+    assert delta == {"nodes": {"patch": [{"id": "b", "width": None}]}}
+
+
+def test_order_only_when_replay_differs():
+    added = {"nodes": BASE["nodes"] + [_node("d")], "edges": BASE["edges"]}
+    assert "order" not in revisions.diff(BASE, added)["nodes"]
+    swapped = {"nodes": [BASE["nodes"][1], BASE["nodes"][0], BASE["nodes"][2]], "edges": BASE["edges"]}
+    assert revisions.diff(BASE, swapped)["nodes"]["order"] == ["b", "a", "c"]
+
+
+def test_duplicate_ids_need_a_snapshot():
+    duplicated = {"nodes": BASE["nodes"] + [_node("a")], "edges": BASE["edges"]}
+    assert revisions.diff(BASE, duplicated) is None
+    assert revisions.diff(duplicated, BASE) is None
+
+
+def test_random_edit_chains_replay_to_the_final_graph():
+    rng = random.Random(45)
+    graph, history = BASE, [BASE]
+    for step in range(200):
+        nodes = [dict(n) for n in graph["nodes"]]
+        action = rng.randrange(4)
+        if action == 0 or not nodes:
+            nodes.insert(rng.randrange(len(nodes) + 1), _node(f"n{step}", str(step)))
+        elif action == 1:
+            nodes.pop(rng.randrange(len(nodes)))
+        elif action == 2:
+            node = nodes[rng.randrange(len(nodes))]
+            node["data"] = {"text": f"edit {step}"}
+            if "width" in node:
+                del node["width"]
+            else:
+                node["width"] = step
+        else:
+            rng.shuffle(nodes)
+        ids = [n["id"] for n in nodes]
+        edges = [_edge(s, t) for s, t in zip(ids, ids[1:])]
+        graph = canonical_graph(nodes, edges)
+        history.append(graph)
+
+    replayed = history[0]
+    for old, new in zip(history, history[1:]):
+        replayed = revisions.apply(replayed, revisions.diff(old, new))
+    assert replayed == history[-1]
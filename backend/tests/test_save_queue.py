@@ -0,0 +1,105 @@
+# tests/test_save_queue.py — Write-behind saves: coalescing, acks and retry after a failed flush
+import asyncio
+
+import pytest
+
+from services import pipeline_store
+
+NODES = [{"id": "n1", "type": "textInput", "position": {"x": 0, "y": 0}, "data": {"text": "hi"}}]
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_store, "DB_PATH", tmp_path / "pipelines.db")
+    monkeypatch.setattr(pipeline_store, "COALESCE_WINDOW", 0.01)
+    monkeypatch.setattr(pipeline_store, "_RETRY_DELAY", 0.01)
+    # Each test runs its own event loop; a contended lock stays bound to the loop that used it
+    monkeypatch.setattr(pipeline_store, "_FLUSH_LOCK", asyncio.Lock())
+    monkeypatch.setattr(pipeline_store, "_OPEN_LOCK", asyncio.Lock())
+    yield
+    asyncio.run(pipeline_store.close_db())
+
+
+def _run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await pipeline_store.close_db()
+    return asyncio.run(main())
+
+
+def test_queued_ack_has_record_keys():
+    async def scenario():
+        first = await pipeline_store.save_pipeline("p1", "one", NODES, [], durable=True)
+        queued = await pipeline_store.save_pipeline("p1", "two", NODES, [])
+        await pipeline_store.flush_saves()
+        return first, queued, await pipeline_store.get_pipeline("p1")
+
+    first, queued, stored = _run(scenario())
+    assert set(queued) == set(first) | {"queued"}
+    assert queued["created_at"] is None and queued["rev"] is None     # not known without a read
+    assert stored["name"] == "two" and stored["created_at"] == first["created_at"]
+
+
+def test_concurrent_durable_saves_all_resolve():
+    async def scenario():
+        saves = [pipeline_store.save_pipeline("p1", f"v{i}", NODES, [], durable=True) for i in range(3)]
+        return await asyncio.wait_for(asyncio.gather(*saves), 2)
+
+    records = _run(scenario())
+    assert [r["name"] for r in records] == ["v2"] * 3     # coalesced into the last save
+
+
+def test_failed_flush_is_retried(monkeypatch):
+    write = pipeline_store._write_saves
+    calls = []
+
+    async def flaky(batch):
+        calls.append([pipeline_id for pipeline_id, _ in batch])
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        return await write(batch)
+
+    monkeypatch.setattr(pipeline_store, "_write_saves", flaky)
+
+    async def scenario():
+        ack = await pipeline_store.save_pipeline("p1", "draft", NODES, [])
+        for _ in range(100):                    # no further save or read triggers the retry
+            if len(calls) >= 2 and not pipeline_store._PENDING:
+                break
+            await asyncio.sleep(0.01)
+        return ack, await pipeline_store.get_pipeline("p1")
+
+    ack, stored = _run(scenario())
+    assert calls == [["p1"], ["p1"]]
+    assert ack["queued"] and stored is not None and stored["name"] == "draft"
+    assert pipeline_store._RETRY_DELAY == pipeline_store.COALESCE_WINDOW
+
+
+def test_durable_save_gets_the_error_and_queued_edit_survives(monkeypatch):
+    write = pipeline_store._write_saves
+    calls = []
+
+    async def flaky(batch):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        return await write(batch)
+
+    monkeypatch.setattr(pipeline_store, "_write_saves", flaky)
+
+    async def scenario():
+        durable = asyncio.create_task(pipeline_store.save_pipeline("p1", "manual", NODES, [], durable=True))
+        await asyncio.sleep(0)
+        await pipeline_store.save_pipeline("p1", "autosave", NODES, [])   # inherits the durable waiter
+        with pytest.raises(RuntimeError):
+            await durable
+        for _ in range(100):
+            if len(calls) >= 2 and not pipeline_store._PENDING:
+                break
+            await asyncio.sleep(0.01)
+        return await pipeline_store.get_pipeline("p1")
+
+    stored = _run(scenario())
+    assert stored is not None and stored["name"] == "autosave"
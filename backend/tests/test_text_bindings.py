@@ -0,0 +1,46 @@
+# tests/test_text_bindings.py — Text node templates rendering upstream results
+import asyncio
+import json
+
+import pytest
+
+from domain.schemas import BaseNodeSchema, EdgeSchema
+from services import execution_service, pipeline_store, run_history
+
+CSV = "price,qty\n1.5,2\n2.0,3\n"
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_store, "DB_PATH", tmp_path / "pipelines.db")
+
+
+def _run(nodes, edges) -> dict:
+    async def main():
+        try:
+            return [json.loads(chunk[len("data: "):]) async for chunk in execution_service.execute_dag_stream(nodes, edges)]
+        finally:
+            await run_history.stop()
+    events = asyncio.run(main())
+    return {e["node_id"]: e.get("result") for e in events if e["event"] == "node_complete"}
+
+
+def _node(node_id, node_type, **data):
+    return BaseNodeSchema(id=node_id, type=node_type, position={"x": 0, "y": 0}, data=data)
+
+
+def test_csv_table_renders_as_json_in_template():
+    nodes = [
+        _node("src", "text", text=CSV),
+        _node("csv", "csvParser", csvDelimiter="Comma", hasHeader="Yes"),
+        _node("out", "text", text="Rows: {{table}}"),
+    ]
+    edges = [
+        EdgeSchema(id="e1", source="src", target="csv"),
+        EdgeSchema(id="e2", source="csv", target="out", targetHandle="out-table"),
+    ]
+    rendered = _run(nodes, edges)["out"]
+    assert rendered.startswith("Rows: ")
+    assert json.loads(rendered[len("Rows: "):]) == {
+        "rows": [{"price": "1.5", "qty": "2"}, {"price": "2.0", "qty": "3"}], "count": 2,
+    }
@@ -0,0 +1,43 @@
+# tests/test_vector_eval.py — Guards of the column-wise expression evaluator
+import numpy as np
+import pytest
+from simpleeval import IterableTooLong, NumberTooHigh
+
+from services.node_compiler import CompiledExpression
+from services.table import parse_csv
+
+CSV = "price,qty,label\n1.5,2,a\n2.0,3,b\n4.0,1,c\n"
+
+
+def _names():
+    table = parse_csv(CSV, ",", True)
+    assert table is not None
+    return table.expression_names()
+
+
+def test_column_arithmetic_is_elementwise():
+    result = CompiledExpression("price * qty + 1").evaluate_vectorized(_names())
+    assert np.allclose(result, [4.0, 7.0, 5.0])
+
+
+def test_column_power_uses_ufunc():
+    result = CompiledExpression("price ** 2").evaluate_vectorized(_names())
+    assert np.allclose(result, [2.25, 4.0, 16.0])
+
+
+def test_scalar_power_is_guarded():
+    with pytest.raises(NumberTooHigh):
+        CompiledExpression("price + 9**9**8").evaluate_vectorized(_names())
+
+
+def test_scalar_string_repeat_is_guarded():
+    with pytest.raises(IterableTooLong):
+        CompiledExpression('label + "x" * 10**9').evaluate_vectorized(_names())
+
+
+def test_scalar_path_matches_simpleeval():
+    expression = CompiledExpression("9**9**8")
+    with pytest.raises(NumberTooHigh):
+        expression.evaluate({})
+    with pytest.raises(NumberTooHigh):
+        expression.evaluate_vectorized(_names())
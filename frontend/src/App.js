@@ -36,9 +36,11 @@ function App() {
   const [isHelpOpen, setIsHelpOpen] = useState(false);
   const [isGalleryOpen, setIsGalleryOpen] = useState(false);
   const [isLoadModalOpen, setIsLoadModalOpen] = useState(false);
+  const [loadSearch, setLoadSearch] = useState('');
+  const [searchResults, setSearchResults] = useState(null);   // null = not searching
   const navigate = useNavigate();
   const reactFlowInstanceRef = useRef(null);
-  const { isSaving, isLoading: isPipelinesLoading, savedPipelines, savePipeline, fetchSavedPipelines, loadPipeline, deletePipelineById } = usePipelineStorage();
+  const { isSaving, isLoading: isPipelinesLoading, savedPipelines, hasMoreSavedPipelines, savePipeline, fetchSavedPipelines, fetchMoreSavedPipelines, searchSavedPipelines, loadPipeline, deletePipelineById } = usePipelineStorage();
 
   // Store selectors
   const nodes = useStore((s) => s.nodes);
@@ -155,9 +157,25 @@ function App() {
   // Open load modal
   const handleOpenLoad = useCallback(async () => {
     setIsLoadModalOpen(true);
+    setLoadSearch('');
+    setSearchResults(null);
     await fetchSavedPipelines();
   }, [fetchSavedPipelines]);
 
+  // Debounced server-side search in the load modal
+  useEffect(() => {
+    const query = loadSearch.trim();
+    if (!query) { setSearchResults(null); return; }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const results = await searchSavedPipelines(query);
+      if (!cancelled) setSearchResults(results);
+    }, 200);
+    return () => { cancelled = true; clearTimeout(timer); };
+  }, [loadSearch, searchSavedPipelines]);
+
+  const listedPipelines = searchResults ?? savedPipelines;
+
   // Load a pipeline from the list
   const handleLoadSaved = useCallback(async (id) => {
     const record = await loadPipeline(id);
@@ -343,24 +361,36 @@ function App() {
               </h2>
               <button onClick={() => setIsLoadModalOpen(false)} className="p-1.5 rounded-lg text-slate-400 hover:text-slate-600 dark:hover:text-slate-200 hover:bg-slate-100 dark:hover:bg-slate-700 transition-colors"><X className="w-4 h-4" /></button>
             </div>
+            <div className="px-4 pt-4">
+              <input
+                type="search"
+                value={loadSearch}
+                onChange={e => setLoadSearch(e.target.value)}
+                placeholder="Search names, prompts, URLs…"
+                className="w-full px-3 py-2 rounded-xl text-sm bg-slate-50 dark:bg-slate-900/40 border border-slate-200 dark:border-slate-700 text-slate-800 dark:text-slate-100 placeholder-slate-400 focus:outline-none focus:border-sky-400"
+              />
+            </div>
             <div className="flex-1 overflow-y-auto p-4 space-y-2">
               {isPipelinesLoading ? (
                 <div className="flex items-center justify-center py-12"><Loader2 className="w-6 h-6 animate-spin text-sky-500" /></div>
-              ) : savedPipelines.length === 0 ? (
+              ) : searchResults && searchResults.length === 0 ? (
+                <p className="text-sm text-center py-12 text-slate-400 dark:text-slate-500">No pipelines match “{loadSearch.trim()}”.</p>
+              ) : listedPipelines.length === 0 ? (
                 <div className="flex flex-col items-center justify-center py-12 text-slate-400 dark:text-slate-500 gap-2">
                   <FolderOpen className="w-10 h-10 opacity-30" />
                   <p className="text-sm">No saved pipelines yet.</p>
                   <p className="text-xs">Click <strong>Save</strong> to persist your current pipeline.</p>
                 </div>
               ) : (
-                savedPipelines.map(p => (
+                listedPipelines.map(p => (
                   <div key={p.id} className="flex items-center gap-3 p-3 rounded-xl border border-slate-200 dark:border-slate-700 bg-slate-50 dark:bg-slate-900/40 hover:border-sky-300 dark:hover:border-sky-600 transition-colors group">
                     <div className="flex-1 min-w-0 cursor-pointer" onClick={() => handleLoadSaved(p.id)}>
                       <p className="text-sm font-semibold text-slate-800 dark:text-slate-100 truncate">{p.name}</p>
                       <p className="text-xs text-slate-400 dark:text-slate-500 mt-0.5">{new Date(p.updated_at).toLocaleString()}</p>
+                      {p.snippet && <p className="text-xs text-slate-500 dark:text-slate-400 mt-0.5 truncate">{p.snippet.replace(/\n/g, ' · ')}</p>}
                     </div>
                     <button
-                      onClick={() => deletePipelineById(p.id, p.name)}
+                      onClick={async () => { if (await deletePipelineById(p.id, p.name)) setSearchResults(r => r && r.filter(x => x.id !== p.id)); }}
                       className="opacity-0 group-hover:opacity-100 p-1.5 rounded-lg text-slate-400 hover:text-red-500 hover:bg-red-50 dark:hover:bg-red-900/30 transition-all"
                       title="Delete"
                     ><Trash className="w-3.5 h-3.5" /></button>
@@ -371,6 +401,12 @@ function App() {
                   </div>
                 ))
               )}
+              {!isPipelinesLoading && !searchResults && hasMoreSavedPipelines && (
+                <button
+                  onClick={fetchMoreSavedPipelines}
+                  className="w-full py-2 rounded-xl text-xs font-bold text-slate-500 dark:text-slate-400 border border-dashed border-slate-300 dark:border-slate-600 hover:text-sky-600 hover:border-sky-300 dark:hover:border-sky-600 transition-colors"
+                >Load more</button>
+              )}
             </div>
           </div>
         </div>
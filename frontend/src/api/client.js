@@ -24,6 +24,27 @@ apiClient.interceptors.response.use(
     }
 );
 
+// ─── Conditional requests ─────────────────────────────────────────────────────
+
+// url → { etag, data } from the last successful response of an ETag-aware endpoint
+const etagCache = new Map();
+
+/**
+ * POST that revalidates with If-None-Match; a 304 reuses the previous body.
+ * The server ignores UI-only fields (positions, selection) when computing ETags.
+ */
+const postWithEtag = async (url, body) => {
+    const cached = etagCache.get(url);
+    const response = await apiClient.post(url, body, {
+        headers: cached ? { 'If-None-Match': cached.etag } : {},
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+    if (response.status === 304 && cached) return cached.data;
+    const etag = response.headers.etag;
+    if (etag) etagCache.set(url, { etag, data: response.data });
+    return response.data;
+};
+
 // ─── API functions ────────────────────────────────────────────────────────────
 
 /**
@@ -31,14 +52,43 @@ apiClient.interceptors.response.use(
  * @returns {Promise<ParseResponse>}
  */
 export const parsePipeline = (nodes, edges, name = 'Untitled Pipeline') =>
-    apiClient.post('/api/v1/pipelines/parse', { nodes, edges, name }).then((r) => r.data);
+    postWithEtag('/api/v1/pipelines/parse', { nodes, edges, name });
 
 /**
  * Deep-validate a pipeline — returns field-level errors and warnings.
  * @returns {Promise<ValidateResponse>}
  */
 export const validatePipeline = (nodes, edges, name = 'Untitled Pipeline') =>
-    apiClient.post('/api/v1/pipelines/validate', { nodes, edges, name }).then((r) => r.data);
+    postWithEtag('/api/v1/pipelines/validate', { nodes, edges, name });
+
+/**
+ * Parse, validate and/or lay out a pipeline in one request — the graph is analysed once server-side.
+ * @param {string[]} include  subset of 'metrics' | 'validation' | 'layout'
+ * @param {'LR'|'TB'} direction  layout direction (only used when 'layout' is included)
+ * @returns {Promise<{metrics?: ParseResponse, validation?: ValidateResponse, layout?: AutoLayoutResponse}>}
+ */
+export const analyzePipeline = (nodes, edges, name = 'Untitled Pipeline', include = ['metrics', 'validation'], direction = 'LR') =>
+    apiClient
+        .post(`/api/v1/pipelines/analyze?include=${include.join(',')}&direction=${direction}`, { nodes, edges, name })
+        .then((r) => r.data);
+
+/**
+ * Open an incremental graph session — uploads the full graph once.
+ * @returns {Promise<{session_id: string, version: number, metrics: ParseResponse, validation: ValidateResponse}>}
+ */
+export const openGraphSession = (nodes, edges) =>
+    apiClient.post('/api/v1/pipelines/sessions', { nodes, edges }).then((r) => r.data);
+
+/**
+ * Send node/edge changes to a graph session; the response only contains what changed.
+ * @param {{base_version?: number, add_nodes?: Array, update_nodes?: Array, remove_nodes?: string[], add_edges?: Array, remove_edges?: string[]}} delta
+ */
+export const applyGraphDelta = (sessionId, delta) =>
+    apiClient.post(`/api/v1/pipelines/sessions/${sessionId}/delta`, delta).then((r) => r.data);
+
+/** Close a graph session (best effort). */
+export const closeGraphSession = (sessionId) =>
+    apiClient.delete(`/api/v1/pipelines/sessions/${sessionId}`).then((r) => r.data);
 
 /**
  * Fetch the server-side node-type registry.
@@ -55,6 +105,17 @@ export const fetchNodeTypes = () =>
 export const computeLayout = (nodes, edges, direction = 'LR') =>
     apiClient.post(`/api/v1/pipelines/auto-layout?direction=${direction}`, { nodes, edges }).then((r) => r.data);
 
+/**
+ * Place new or edited nodes without moving the rest of the canvas.
+ * @param {string[]} changed  IDs of nodes to (re)place; every other node stays where it is
+ * @returns {Promise<{mode: 'incremental'|'full', nodes: Array<{id: string, position: {x: number, y: number}}>}>}
+ *          only nodes whose position changed
+ */
+export const computeIncrementalLayout = (nodes, edges, changed, direction = 'LR') =>
+    apiClient
+        .post(`/api/v1/pipelines/auto-layout/incremental?direction=${direction}`, { nodes, edges, changed })
+        .then((r) => r.data);
+
 /**
  * Health check ping.
  * @returns {Promise<{Ping: string, status: string, version: string}>}
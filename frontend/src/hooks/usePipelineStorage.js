@@ -9,12 +9,16 @@ export const usePipelineStorage = () => {
     const [isSaving, setIsSaving] = useState(false);
     const [isLoading, setIsLoading] = useState(false);
     const [savedPipelines, setSavedPipelines] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
 
-    /** Save the current canvas state to the backend */
-    const savePipeline = useCallback(async (pipelineId, name, nodes, edges) => {
+    /**
+     * Save the current canvas state to the backend. Explicit saves wait for
+     * the commit; pass { durable: false } (autosave) to return once queued.
+     */
+    const savePipeline = useCallback(async (pipelineId, name, nodes, edges, { durable = true } = {}) => {
         setIsSaving(true);
         try {
-            const res = await fetch(`${getBaseUrl()}/api/v1/pipelines/save`, {
+            const res = await fetch(`${getBaseUrl()}/api/v1/pipelines/save?durable=${durable}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ id: pipelineId, name, nodes, edges }),
@@ -31,7 +35,7 @@ export const usePipelineStorage = () => {
         }
     }, []);
 
-    /** Fetch the list of saved pipelines */
+    /** Fetch the first page of saved pipelines (newest first) */
     const fetchSavedPipelines = useCallback(async () => {
         setIsLoading(true);
         try {
@@ -39,16 +43,47 @@ export const usePipelineStorage = () => {
             if (!res.ok) throw new Error(`Server error ${res.status}`);
             const data = await res.json();
             setSavedPipelines(data.pipelines || []);
+            setNextCursor(data.next_cursor || null);
             return data.pipelines || [];
         } catch (err) {
             toast.error(`Load list failed: ${err.message}`);
             setSavedPipelines([]);
+            setNextCursor(null);
             return [];
         } finally {
             setIsLoading(false);
         }
     }, []);
 
+    /** Append the next page, if the last fetch reported one */
+    const fetchMoreSavedPipelines = useCallback(async () => {
+        if (!nextCursor) return [];
+        try {
+            const res = await fetch(`${getBaseUrl()}/api/v1/pipelines/saved?after=${encodeURIComponent(nextCursor)}`);
+            if (!res.ok) throw new Error(`Server error ${res.status}`);
+            const data = await res.json();
+            setSavedPipelines(prev => [...prev, ...(data.pipelines || [])]);
+            setNextCursor(data.next_cursor || null);
+            return data.pipelines || [];
+        } catch (err) {
+            toast.error(`Load list failed: ${err.message}`);
+            return [];
+        }
+    }, [nextCursor]);
+
+    /** Full-text search over names and node content; best matches first */
+    const searchSavedPipelines = useCallback(async (query) => {
+        try {
+            const res = await fetch(`${getBaseUrl()}/api/v1/pipelines/saved/search?q=${encodeURIComponent(query)}`);
+            if (!res.ok) throw new Error(`Server error ${res.status}`);
+            const data = await res.json();
+            return data.results || [];
+        } catch (err) {
+            toast.error(`Search failed: ${err.message}`);
+            return [];
+        }
+    }, []);
+
     /** Load a single pipeline by ID */
     const loadPipeline = useCallback(async (id) => {
         setIsLoading(true);
@@ -86,8 +121,11 @@ export const usePipelineStorage = () => {
         isSaving,
         isLoading,
         savedPipelines,
+        hasMoreSavedPipelines: nextCursor !== null,
         savePipeline,
         fetchSavedPipelines,
+        fetchMoreSavedPipelines,
+        searchSavedPipelines,
         loadPipeline,
         deletePipelineById,
     };
@@ -58,6 +58,8 @@ export const setupRegistry = () => {
             { key: 'temperature', label: 'Temperature', type: 'number', placeholder: '0.7', min: 0, max: 2, step: 0.1 },
             { key: 'maxTokens', label: 'Max Tokens', type: 'number', placeholder: '1024', min: 1, max: 128000 },
             { key: 'systemPrompt', label: 'System Prompt', type: 'textarea', placeholder: 'You are a helpful assistant...' },
+            { key: 'semanticCache', label: 'Semantic Cache', type: 'select', options: ['Off', 'On'] },
+            { key: 'cacheThreshold', label: 'Cache Similarity', type: 'number', placeholder: '0.95', min: 0.9, max: 1, step: 0.01 },
         ],
     });
 
@@ -95,6 +97,8 @@ export const setupRegistry = () => {
         fields: [
             { key: 'classifierModel', label: 'Model', type: 'modelSelect' },
             { key: 'labels', label: 'Labels (comma-separated)', type: 'text', placeholder: 'positive, negative, neutral' },
+            { key: 'semanticCache', label: 'Semantic Cache', type: 'select', options: ['Off', 'On'] },
+            { key: 'cacheThreshold', label: 'Cache Similarity', type: 'number', placeholder: '0.95', min: 0.9, max: 1, step: 0.01 },
         ],
     });
 
@@ -108,6 +112,9 @@ export const setupRegistry = () => {
             { key: 'summaryModel', label: 'Model', type: 'modelSelect' },
             { key: 'summaryStyle', label: 'Style', type: 'select', options: ['Concise', 'Bullet Points', 'Detailed', 'ELI5'] },
             { key: 'summaryLength', label: 'Target Length', type: 'select', options: ['1 Sentence', 'Short', 'Medium', 'Long'] },
+            { key: 'chunking', label: 'Long Input Chunking', type: 'select', options: ['Auto', 'Off', 'Always'] },
+            { key: 'semanticCache', label: 'Semantic Cache', type: 'select', options: ['Off', 'On'] },
+            { key: 'cacheThreshold', label: 'Cache Similarity', type: 'number', placeholder: '0.95', min: 0.9, max: 1, step: 0.01 },
         ],
     });
 
@@ -4,7 +4,7 @@ import { createPortal } from 'react-dom';
 import { useStore } from './store';
 import { useSettingsStore } from './store/useSettingsStore';
 import { shallow } from 'zustand/shallow';
-import { parsePipeline, validatePipeline } from './api/client';
+import { analyzePipeline } from './api/client';
 import {
     Play, Activity, Server, LayoutTemplate, Link2, Route,
     X, CheckCircle2, XCircle, AlertTriangle, Info,
@@ -264,16 +264,13 @@ export const SubmitButton = () => {
         setExecutionState(false, []);
 
         try {
-            // Run both in parallel
-            const [analysisData, validationData] = await toast.promise(
-                Promise.all([
-                    parsePipeline(nodes, edges, pipelineName),
-                    validatePipeline(nodes, edges, pipelineName),
-                ]),
+            // Metrics + validation from a single server-side analysis
+            const { metrics: analysisData, validation: validationData } = await toast.promise(
+                analyzePipeline(nodes, edges, pipelineName, ['metrics', 'validation']),
                 {
                     loading: 'Analysing pipeline…',
-                    success: (results) =>
-                        `Graph OK — ${results[0].num_nodes} nodes · starting execution…`,
+                    success: (result) =>
+                        `Graph OK — ${result.metrics.num_nodes} nodes · starting execution…`,
                     error: 'Analysis failed — check backend connection.',
                 }
             );